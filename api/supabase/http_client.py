@@ -0,0 +1,163 @@
+"""
+Shared HTTP connection pools for the Supabase clients.
+
+Each supabase-py client otherwise opens its own httpx pool with default
+limits, so the anon, service-role and admin clients each pay their own
+TCP and TLS handshakes. Here every sync client shares one pool and every
+async client shares another, with pool limits, keep-alive expiry, HTTP/2
+and timeouts taken from settings. GoTrue sends the full URL and headers
+on every request, so one httpx client can serve all of them.
+
+Swapping the pool in and reading its connections for the stats both reach
+into private attributes: GoTrue's `_http_client` (gotrue 2.11) and httpx's
+`_transport._pool` (httpx 0.27, httpcore 1.0), pinned in requirements.txt.
+Either is looked up with getattr, so after an upgrade that renames them the
+clients keep their own pools and the pool gauges read 0 instead of failing.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from ..v1.utils.config import settings
+from ..v1.utils.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class TransportStats:
+    """Requests sent versus connections and TLS handshakes opened, from httpcore's trace events."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connects = 0
+        self.tls_handshakes = 0
+
+    def trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self.connects += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    async def atrace(self, event: str, info: dict):
+        self.trace(event, info)
+
+    def on_request(self, request: "httpx.Request"):
+        self.requests += 1
+        request.extensions["trace"] = self.trace
+
+    async def aon_request(self, request: "httpx.Request"):
+        self.requests += 1
+        request.extensions["trace"] = self.atrace
+
+
+sync_stats = TransportStats()
+async_stats = TransportStats()
+
+_sync_client: Optional["httpx.Client"] = None
+_async_client: Optional["httpx.AsyncClient"] = None
+
+
+def _client_kwargs() -> dict:
+    import httpx
+
+    return {
+        "http2": settings.SUPABASE_HTTP2,
+        "limits": httpx.Limits(
+            max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            settings.SUPABASE_HTTP_TIMEOUT,
+            connect=settings.SUPABASE_HTTP_CONNECT_TIMEOUT,
+            pool=settings.SUPABASE_HTTP_POOL_TIMEOUT,
+        ),
+        "follow_redirects": True,
+    }
+
+
+def get_sync_http_client() -> "httpx.Client":
+    global _sync_client
+    import httpx
+
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(event_hooks={"request": [sync_stats.on_request]}, **_client_kwargs())
+    return _sync_client
+
+
+def get_async_http_client() -> "httpx.AsyncClient":
+    global _async_client
+    import httpx
+
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(event_hooks={"request": [async_stats.aon_request]}, **_client_kwargs())
+    return _async_client
+
+
+def share_http_client(client, http_client):
+    """
+    Points a supabase client's GoTrue and GoTrue admin APIs at `http_client`.
+    supabase-py does not take an http client in its options, so the one
+    GoTrue built for itself is swapped out before it has opened anything.
+    """
+    apis = (client.auth, getattr(client.auth, "admin", None))
+    if not all(hasattr(api, "_http_client") for api in apis):
+        logger.warning("GoTrue has no _http_client to replace, its clients keep their own connection pools")
+        return client
+    for api in apis:
+        api._http_client = http_client
+    return client
+
+
+async def close_http_clients():
+    """Closes both shared pools, once at shutdown after the clients are done with them."""
+    global _sync_client, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+def _connections(client) -> list:
+    if client is None or client.is_closed:
+        return []
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    return connections if isinstance(connections, list) else []
+
+
+def _is_idle(connection) -> bool:
+    is_idle = getattr(connection, "is_idle", None)
+    return bool(is_idle()) if callable(is_idle) else False
+
+
+def _is_http2(connection) -> bool:
+    info = getattr(connection, "info", None)
+    return "HTTP/2" in info() if callable(info) else False
+
+
+def _pool_snapshot(client, stats: TransportStats, prefix: str) -> dict:
+    connections = _connections(client)
+    return {
+        f"{prefix}_connections": len(connections),
+        f"{prefix}_idle_connections": sum(1 for connection in connections if _is_idle(connection)),
+        f"{prefix}_http2_connections": sum(1 for connection in connections if _is_http2(connection)),
+        f"{prefix}_requests_total": stats.requests,
+        f"{prefix}_connects_total": stats.connects,
+        f"{prefix}_tls_handshakes_total": stats.tls_handshakes,
+    }
+
+
+def snapshot() -> dict:
+    return {
+        **_pool_snapshot(_sync_client, sync_stats, "sync"),
+        **_pool_snapshot(_async_client, async_stats, "async"),
+    }
+
+
+REGISTRY.add_collector("supabase_http", snapshot)
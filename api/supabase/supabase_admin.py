@@ -1,10 +1,45 @@
-from supabase import create_client
-from supabase.lib.client_options import ClientOptions
+import asyncio
+from typing import TYPE_CHECKING, Optional
 
-from .supabase_client import service_key, url
+from .supabase_client import _create_async_client, _create_sync_client, _sync_lock, service_key
 
+if TYPE_CHECKING:
+    from gotrue import AsyncGoTrueAdminAPI, SyncGoTrueAdminAPI
+    from supabase import AsyncClient, Client
 
-supabase = create_client(url, service_key, options=ClientOptions(auto_refresh_token=False, persist_session=False,))
 
-# Access auth admin api
-admin_auth_client = supabase.auth.admin
+# Service-role client for the auth admin api, built on first use
+_admin_supabase: Optional["Client"] = None
+
+
+def get_admin_auth_client() -> "SyncGoTrueAdminAPI":
+    """Returns the sync auth admin api, creating the service-role client on first call."""
+    global _admin_supabase
+    if _admin_supabase is None:
+        with _sync_lock:
+            if _admin_supabase is None:
+                _admin_supabase = _create_sync_client(service_key, auto_refresh_token=False, persist_session=False)
+    return _admin_supabase.auth.admin
+
+
+# Async service-role client, built on first use inside the event loop
+_async_admin_supabase: Optional["AsyncClient"] = None
+_async_admin_lock = asyncio.Lock()
+
+
+async def get_async_admin_client() -> "AsyncGoTrueAdminAPI":
+    """
+    Returns the async auth admin api, creating the service-role client on first call.
+    """
+    global _async_admin_supabase
+    if _async_admin_supabase is None:
+        async with _async_admin_lock:
+            if _async_admin_supabase is None:
+                _async_admin_supabase = await _create_async_client(service_key)
+    return _async_admin_supabase.auth.admin
+
+
+async def close_async_admin_client():
+    """Drops the async service-role client; its pool is closed by `close_http_clients`."""
+    global _async_admin_supabase
+    _async_admin_supabase = None
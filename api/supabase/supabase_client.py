@@ -1,16 +1,119 @@
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Optional
 
+from ..v1.utils.config import settings
 
-load_dotenv()
+if TYPE_CHECKING:
+    from gotrue import AsyncGoTrueClient
+    from supabase import AsyncClient, Client
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+url: str = settings.SUPABASE_URL
+key: str = settings.SUPABASE_KEY
+service_key: str = settings.SUPABASE_SERVICE_KEY
 
-url: str = SUPABASE_URL
-key: str = SUPABASE_KEY
-service_key: str = SUPABASE_SERVICE_KEY
-supabase: Client = create_client(url, key)
-service_client: Client = create_client(url, service_key)
\ No newline at end of file
+# Clients are built on first use rather than at import, so importing the app
+# (every worker, every test run, every script) does not pay for supabase-py
+# and for constructing clients it may never call. The sync clients share one
+# lock; both, and the admin client, send their auth calls through one
+# shared connection pool.
+_supabase: Optional["Client"] = None
+_service_client: Optional["Client"] = None
+_sync_lock = threading.Lock()
+
+
+def _create_sync_client(client_key: str, **options) -> "Client":
+    from supabase import create_client
+    from supabase.lib.client_options import ClientOptions
+
+    from .http_client import get_sync_http_client, share_http_client
+
+    client_options = ClientOptions(**options) if options else None
+    return share_http_client(create_client(url, client_key, options=client_options), get_sync_http_client())
+
+
+def get_supabase() -> "Client":
+    """Returns the worker's sync anon-key client, creating it on first call."""
+    global _supabase
+    if _supabase is None:
+        with _sync_lock:
+            if _supabase is None:
+                _supabase = _create_sync_client(key)
+    return _supabase
+
+
+def get_service_client() -> "Client":
+    """Returns the worker's sync service-role client, creating it on first call."""
+    global _service_client
+    if _service_client is None:
+        with _sync_lock:
+            if _service_client is None:
+                _service_client = _create_sync_client(service_key)
+    return _service_client
+
+
+# The async client can only be built inside a running event loop, so it is
+# created on first use and shared by every request on this worker afterwards.
+_async_supabase: Optional["AsyncClient"] = None
+_async_supabase_lock = asyncio.Lock()
+
+
+async def _create_async_client(client_key: str) -> "AsyncClient":
+    from supabase import acreate_client, AsyncClientOptions
+
+    from .http_client import get_async_http_client, share_http_client
+
+    return share_http_client(
+        await acreate_client(
+            url,
+            client_key,
+            options=AsyncClientOptions(auto_refresh_token=False, persist_session=False),
+        ),
+        get_async_http_client(),
+    )
+
+
+async def get_async_supabase() -> "AsyncClient":
+    """
+    Returns the worker's async Supabase client, creating it on first call.
+    Auth calls made through it are awaited instead of blocking the event loop.
+    """
+    global _async_supabase
+    if _async_supabase is None:
+        async with _async_supabase_lock:
+            if _async_supabase is None:
+                _async_supabase = await _create_async_client(key)
+    return _async_supabase
+
+
+async def get_user_auth_client(access_token: str) -> "AsyncGoTrueClient":
+    """
+    Returns a GoTrue client signed in as the caller, for calls GoTrue must
+    make on the user's own behalf, such as an email change, which sends a
+    confirmation mail. It is built per call so the shared client's session
+    stays empty, and it uses the worker's shared connection pool.
+    """
+    from gotrue import AsyncGoTrueClient
+
+    from .http_client import get_async_http_client
+
+    shared = await get_async_supabase()
+    client = AsyncGoTrueClient(
+        url=shared.auth_url,
+        headers=dict(shared.options.headers),
+        http_client=get_async_http_client(),
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+    # No refresh token: the access token has just been verified and is not expired.
+    await client.set_session(access_token, "")
+    return client
+
+
+async def close_async_supabase():
+    """
+    Drops the async client. Its connection pool is shared with the admin
+    client and is closed by `close_http_clients` once both are done.
+    """
+    global _async_supabase
+    _async_supabase = None
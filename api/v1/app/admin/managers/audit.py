@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.audit_model import admin_audit_log
+from ..models.enums import AuditAction
+from ....utils.config import settings
+from ....utils.metrics import REGISTRY
+from ....utils.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Longest target the column holds; user ids and emails from requests are not length checked.
+TARGET_MAX_LENGTH = admin_audit_log.c.target.type.length
+# SQLSTATE classes of errors caused by the entries themselves: data exceptions, constraint violations
+REJECTED_SQLSTATE_CLASSES = ("22", "23")
+
+
+def _is_rejected_entry(error: Exception) -> bool:
+    """Whether the database refused the entries themselves, rather than being unreachable."""
+    if isinstance(error, sqlalchemy.exc.DBAPIError):
+        return (getattr(error.orig, "sqlstate", None) or "")[:2] in REJECTED_SQLSTATE_CLASSES
+    # Raised before anything was sent, e.g. details that do not serialize to JSON
+    return isinstance(error, sqlalchemy.exc.StatementError)
+
+
+class AuditLog:
+    """
+    Buffers admin audit entries in memory and writes them in batches from a
+    background task, so recording one costs an admin call a list append.
+    A batch is written once batch_size entries are waiting or every
+    flush_seconds, whichever comes first. Entries of a write that failed
+    because the database could not be reached are kept and retried with the
+    next batch. A batch the database refuses is written again one entry at a
+    time, and only the entries it still refuses are dropped and counted.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._full = asyncio.Event()
+        self._session_factory = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_flush_seconds = 0.0
+
+    def record(
+        self,
+        action: AuditAction,
+        actor_id: str,
+        target: Optional[str] = None,
+        error: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        """Queue one entry; never blocks and never raises."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append({
+            "created_at": datetime.utcnow(), "actor_id": actor_id, "action": action.value,
+            "target": target[:TARGET_MAX_LENGTH] if target else target, "succeeded": error is None, "error": error, "details": details,
+        })
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    @contextmanager
+    def audited(
+        self,
+        action: AuditAction,
+        actor_id: str,
+        target: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        """Record the wrapped block as succeeded, or as failed with its exception, which is re-raised."""
+        try:
+            yield
+        except Exception as e:
+            self.record(action, actor_id, target, error=str(e), details=details)
+            raise
+        self.record(action, actor_id, target, details=details)
+
+    def start(self, session_factory):
+        """Start writing batches with sessions from `session_factory`; called from the app's lifespan."""
+        self._session_factory = session_factory
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write what is still waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every waiting entry, one batch_size insert at a time."""
+        if self._session_factory is None:
+            return
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            start = time.perf_counter()
+            try:
+                await self._insert(batch)
+            except asyncio.CancelledError:
+                self._pending[:0] = batch
+                raise
+            except Exception as e:
+                if not _is_rejected_entry(e):
+                    self._write_failed(batch, e)
+                    return
+                # Retrying the same batch would fail forever; find the entries at fault.
+                if not await self._insert_one_by_one(batch):
+                    return
+            else:
+                self.written += len(batch)
+            self.last_flush_seconds = time.perf_counter() - start
+
+    async def _insert(self, entries: List[dict]):
+        async with self._session_factory() as db:
+            await db.execute(admin_audit_log.insert(), entries)
+            await db.commit()
+
+    async def _insert_one_by_one(self, batch: List[dict]) -> bool:
+        """Write `batch` an entry per insert, dropping the refused ones; False if the database became unreachable."""
+        for n, entry in enumerate(batch):
+            try:
+                await self._insert([entry])
+            except asyncio.CancelledError:
+                self._pending[:0] = batch[n:]
+                raise
+            except Exception as e:
+                if not _is_rejected_entry(e):
+                    self._write_failed(batch[n:], e)
+                    return False
+                self.rejected += 1
+                logger.error("Dropped an admin audit entry the database refused (%s on %s): %s",
+                             entry["action"], entry["target"], e)
+                continue
+            self.written += 1
+        return True
+
+    def _write_failed(self, entries: List[dict], error: Exception):
+        """Put `entries` back in front of the queue for the next flush."""
+        self.failures += 1
+        logger.error("Writing %d admin audit entries failed: %s", len(entries), error)
+        self._pending[:0] = entries
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            # Keep the oldest entries, the newest are dropped as record() would have.
+            del self._pending[-overflow:]
+            self.dropped += overflow
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "written_total": self.written,
+            "dropped_total": self.dropped,
+            "write_failures_total": self.failures,
+            "rejected_total": self.rejected,
+            "last_flush_seconds": round(self.last_flush_seconds, 6),
+        }
+
+
+audit_log = AuditLog(settings.AUDIT_LOG_BATCH_SIZE, settings.AUDIT_LOG_FLUSH_SECONDS, settings.AUDIT_LOG_MAX_PENDING)
+REGISTRY.add_collector("admin_audit", audit_log.stats)
+
+
+class AuditLogManager:
+    """This class reads the admin audit log"""
+
+    @staticmethod
+    async def list_logs(
+        db: AsyncSession,
+        actor_id: Optional[str] = None,
+        action: Optional[AuditAction] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> dict:
+        """
+        List audit entries, newest first, with keyset pagination. Each filter
+        combination is served by one of the table's (..., created_at, id) indexes.
+        Entries still waiting in a worker's buffer show up once written.
+        :param db:
+        :param actor_id: only this admin's actions
+        :param action: only this kind of action
+        :param since: entries at or after this time (UTC)
+        :param until: entries before this time (UTC)
+        :param cursor:
+        :param limit:
+        :return a page of entries and the cursor of the next page:
+        """
+        # created_at is naive UTC, like the other timestamps
+        since, until = (
+            moment.astimezone(timezone.utc).replace(tzinfo=None) if moment and moment.tzinfo else moment
+            for moment in (since, until)
+        )
+        query = sqlalchemy.select(*admin_audit_log.c)
+        if actor_id is not None:
+            query = query.where(admin_audit_log.c.actor_id == actor_id)
+        if action is not None:
+            query = query.where(admin_audit_log.c.action == action.value)
+        if since is not None:
+            query = query.where(admin_audit_log.c.created_at >= since)
+        if until is not None:
+            query = query.where(admin_audit_log.c.created_at < until)
+        if cursor:
+            created_at, entry_id = decode_cursor(cursor)
+            query = query.where(
+                sqlalchemy.tuple_(admin_audit_log.c.created_at, admin_audit_log.c.id)
+                < sqlalchemy.tuple_(created_at, entry_id)
+            )
+        result = await db.execute(
+            query.order_by(admin_audit_log.c.created_at.desc(), admin_audit_log.c.id.desc()).limit(limit + 1)
+        )
+        rows = [dict(row) for row in result.mappings()]
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+        return {"items": page, "next_cursor": next_cursor}
@@ -1,40 +1,58 @@
 #!/usr/bin/python3
 
+import asyncio
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
 from fastapi import HTTPException, status
 import re
-from .....supabase.supabase_admin import admin_auth_client
-from ..schemas.requests.admin import AdminRegister, AdminSignIn, AdminUpdateProfile
+from .....supabase.supabase_admin import get_admin_auth_client, get_async_admin_client
+from .audit import audit_log
+from ..models.enums import AuditAction
+from ..schemas.requests.admin import AdminRegister, AdminSignIn, AdminUpdateProfile, AdminBulkUpdateItem
+from ....utils.config import settings
+from ....utils.metrics import track_supabase
+
+if TYPE_CHECKING:
+    from gotrue.types import User
+
+USERS_STREAM_PAGE_SIZE = 500
 
 
 class AdminAuthManager:
 
     @staticmethod
-    async def create_user(user_data):
+    async def create_user(user_data, actor_id: str):
         """
         This function is going to register a new admin
         :param user_data:
+        :param actor_id: the calling admin, for the audit log
         :return a user object after a successful registration:
         """
         try:
-            if not re.match(r'^\+[1-9]\d{1,14}$', user_data["phone"]):
-                raise ValueError("Phone number must be in E.164 format.")
-            response = admin_auth_client.create_user(
-                {
-                    "email": user_data["email"],
-                    "password": user_data["password"],
-                    "phone": user_data["phone"],
-                    "email_confirm": True,
-                    "phone_confirm": True,
-                    "user_metadata":
-                    {
-                        "first_name": user_data["first_name"],
-                        "last_name": user_data["last_name"],
-                        "role": user_data["role"],
-                        "phone": user_data["phone"],
-                        "location": user_data["location"]
-                    } 
-                }
-            )
+            with audit_log.audited(AuditAction.create_user, actor_id, user_data["email"], {"role": user_data["role"]}):
+                if not re.match(r'^\+[1-9]\d{1,14}$', user_data["phone"]):
+                    raise ValueError("Phone number must be in E.164 format.")
+                with track_supabase("admin.create_user"):
+                    response = get_admin_auth_client().create_user(
+                        {
+                            "email": user_data["email"],
+                            "password": user_data["password"],
+                            "phone": user_data["phone"],
+                            "email_confirm": True,
+                            "phone_confirm": True,
+                            # The role the app trusts; user_metadata is editable by the user.
+                            "app_metadata": {"role": user_data["role"]},
+                            "user_metadata":
+                            {
+                                "first_name": user_data["first_name"],
+                                "last_name": user_data["last_name"],
+                                "role": user_data["role"],
+                                "phone": user_data["phone"],
+                                "location": user_data["location"]
+                            } 
+                        }
+                    )
             return response
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -48,69 +66,198 @@ class AdminAuthManager:
         """
         try:
 
-            response = admin_auth_client.get_user_by_id(_id)
+            with track_supabase("admin.get_user_by_id"):
+                response = get_admin_auth_client().get_user_by_id(_id)
 
             return response
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     @staticmethod
-    async def get_all_users():
+    async def get_all_users(page: Optional[int] = None, per_page: Optional[int] = None):
         """
         This will help get the list of users from the database
+        :param page: Supabase page number, starting at 1
+        :param per_page: users per page
         :return a list of users:
         """
         try:
-            response = admin_auth_client.list_users()
+            admin = await get_async_admin_client()
+            with track_supabase("admin.list_users"):
+                response = await admin.list_users(page=page, per_page=per_page)
 
             return response
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     @staticmethod
-    async def delete_user(user_id):
+    async def iter_users(per_page: int = USERS_STREAM_PAGE_SIZE) -> AsyncIterator[List["User"]]:
+        """
+        This walks every Supabase user page lazily, fetching the next page only
+        after the previous one was consumed, so one page is held at a time
+        :param per_page: users per page
+        :return an async iterator of user pages:
+        """
+        admin = await get_async_admin_client()
+        page = 1
+        while True:
+            with track_supabase("admin.list_users"):
+                users = await admin.list_users(page=page, per_page=per_page)
+            if users:
+                yield users
+            if len(users) < per_page:
+                return
+            page += 1
+
+    @staticmethod
+    async def delete_user(user_id, actor_id: str):
         """
         This will help delete user from the database
         :param user_id:
+        :param actor_id: the calling admin, for the audit log
         :return:
         """
         try:
-            response = admin_auth_client.delete_user(user_id, should_soft_delete=True)
+            with audit_log.audited(AuditAction.delete_user, actor_id, user_id), track_supabase("admin.delete_user"):
+                response = get_admin_auth_client().delete_user(user_id, should_soft_delete=True)
             return response
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     @staticmethod
-    async def invite_a_user(user_email):
+    async def invite_a_user(user_email, actor_id: str):
         """
         This will allow an admin to invite people to register on the platform via thier email
         :param user_email:
+        :param actor_id: the calling admin, for the audit log
         :return:
         """
         try:
-            response = admin_auth_client.invite_user_by_email(user_email)
+            with audit_log.audited(AuditAction.invite_user, actor_id, user_email), \
+                    track_supabase("admin.invite_user_by_email"):
+                response = get_admin_auth_client().invite_user_by_email(user_email)
 
             return response
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     @staticmethod
-    async def update_a_user_by_id(_id, user_data: AdminUpdateProfile):
+    async def update_a_user_by_id(_id, user_data: AdminUpdateProfile, actor_id: str):
 
         """
         This will allow an admin to update user's details
         :param _id:
         :param user_data:
+        :param actor_id: the calling admin, for the audit log
         :return:
         """
-        print(user_data.dict())
         try:
-            response = admin_auth_client.update_user_by_id(
-                _id,
-                {"user_metadata": user_data.model_dump()}
-            )
+            with audit_log.audited(AuditAction.update_user, actor_id, _id, {"role": user_data.role.value}), \
+                    track_supabase("admin.update_user_by_id"):
+                response = get_admin_auth_client().update_user_by_id(
+                    _id,
+                    {"user_metadata": user_data.model_dump(), "app_metadata": {"role": user_data.role.value}}
+                )
 
             return response
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
+    @staticmethod
+    async def _fan_out(
+        items: Dict[str, Any],
+        operation: Callable[[Any], Awaitable[Any]],
+        concurrency: Optional[int] = None,
+        action: Optional[AuditAction] = None,
+        actor_id: Optional[str] = None,
+    ) -> dict:
+        """
+        This runs `operation` for every item with at most `concurrency` GoTrue calls
+        in flight, and collects a result per item instead of stopping at the first error
+        :param items: result key -> argument passed to `operation`
+        :param operation:
+        :param concurrency: defaults to ADMIN_BULK_CONCURRENCY
+        :param action: audit log action recorded per item, with the result key as target
+        :param actor_id: the calling admin, for the audit log
+        :return a summary with per-item results:
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.ADMIN_BULK_CONCURRENCY)
+
+        async def run(key, argument):
+            async with semaphore:
+                try:
+                    audited = audit_log.audited(action, actor_id, key, {"bulk": True}) if action else nullcontext()
+                    with audited, track_supabase(f"admin.{operation.__name__}"):
+                        await operation(argument)
+                    return {"item": key, "ok": True}
+                except Exception as e:
+                    return {"item": key, "ok": False, "error": str(e)}
+
+        results = await asyncio.gather(*(run(key, argument) for key, argument in items.items()))
+        succeeded = sum(1 for result in results if result["ok"])
+        return {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+        }
+
+    @staticmethod
+    async def bulk_invite_users(
+        emails: List[str], actor_id: str, concurrency: Optional[int] = None
+    ) -> dict:
+        """
+        This will invite many people at once via their emails
+        :param emails: duplicates are only invited once
+        :param actor_id: the calling admin, for the audit log
+        :param concurrency:
+        :return a summary with per-email results:
+        """
+        admin = await get_async_admin_client()
+        return await AdminAuthManager._fan_out(
+            {email: email for email in emails}, admin.invite_user_by_email, concurrency,
+            AuditAction.invite_user, actor_id,
+        )
+
+    @staticmethod
+    async def bulk_delete_users(
+        user_ids: List[str], actor_id: str, concurrency: Optional[int] = None
+    ) -> dict:
+        """
+        This will soft delete many users at once
+        :param user_ids: duplicates are only deleted once
+        :param actor_id: the calling admin, for the audit log
+        :param concurrency:
+        :return a summary with per-user results:
+        """
+        admin = await get_async_admin_client()
+
+        async def delete_user(user_id):
+            return await admin.delete_user(user_id, should_soft_delete=True)
+
+        return await AdminAuthManager._fan_out(
+            {user_id: user_id for user_id in user_ids}, delete_user, concurrency, AuditAction.delete_user, actor_id
+        )
+
+    @staticmethod
+    async def bulk_update_users(
+        users: List[AdminBulkUpdateItem], actor_id: str, concurrency: Optional[int] = None
+    ) -> dict:
+        """
+        This will update the metadata of many users at once
+        :param users: a later entry for the same user wins
+        :param actor_id: the calling admin, for the audit log
+        :param concurrency:
+        :return a summary with per-user results:
+        """
+        admin = await get_async_admin_client()
+
+        async def update_user_by_id(user: AdminBulkUpdateItem):
+            return await admin.update_user_by_id(user.user_id, {
+                "user_metadata": user.user_data.model_dump(),
+                "app_metadata": {"role": user.user_data.role.value},
+            })
+
+        return await AdminAuthManager._fan_out(
+            {user.user_id: user for user in users}, update_user_by_id, concurrency, AuditAction.update_user, actor_id
+        )
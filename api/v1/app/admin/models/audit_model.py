@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+
+
+import sqlalchemy
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ....database.db import metadata
+
+
+# One row per admin action on a user, written in batches by the audit log writer.
+# Append-only: the migration installs a trigger rejecting UPDATE, DELETE and TRUNCATE.
+# created_at is when the action ran, not when its batch was written.
+admin_audit_log = sqlalchemy.Table(
+    "admin_audit_log",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.BigInteger, primary_key=True),
+    sqlalchemy.Column("created_at", sqlalchemy.DateTime, server_default=sqlalchemy.text("timezone('UTC', now())"), nullable=False),
+    # The admin's user id; admin routes require an admin token.
+    sqlalchemy.Column("actor_id", sqlalchemy.UUID, nullable=False),
+    sqlalchemy.Column("action", sqlalchemy.String(64), nullable=False),
+    # The user id or email acted on.
+    sqlalchemy.Column("target", sqlalchemy.String(255), nullable=True),
+    sqlalchemy.Column("succeeded", sqlalchemy.Boolean, nullable=False),
+    sqlalchemy.Column("error", sqlalchemy.Text, nullable=True),
+    sqlalchemy.Column("details", JSONB, nullable=True),
+    # Newest first, alone or filtered by actor or action; all keyset paginated on (created_at, id).
+    sqlalchemy.Index("ix_admin_audit_log_created_at_id", "created_at", "id"),
+    sqlalchemy.Index("ix_admin_audit_log_actor_id_created_at_id", "actor_id", "created_at", "id"),
+    sqlalchemy.Index("ix_admin_audit_log_action_created_at_id", "action", "created_at", "id"),
+)
@@ -7,3 +7,10 @@ from enum import Enum
 class AdminType(Enum):
     supper_admin = "supper"
     regular_admin = "admin"
+
+
+class AuditAction(str, Enum):
+    create_user = "user.create"
+    update_user = "user.update"
+    delete_user = "user.delete"
+    invite_user = "user.invite"
@@ -1,37 +1,90 @@
-from fastapi import APIRouter
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import EmailStr
-from ..schemas.requests.admin import AdminRegister, AdminSignIn, AdminUpdateProfile
-from ..managers.auth import AdminAuthManager
+from ..schemas.requests.admin import (
+    AdminRegister, AdminSignIn, AdminUpdateProfile, AdminBulkInvite, AdminBulkDelete, AdminBulkUpdate,
+)
+from ..schemas.responses.admin import AdminBulkResult
+from ..managers.auth import AdminAuthManager, USERS_STREAM_PAGE_SIZE
+from ....utils.security import AuthContext, get_admin_context
 
 router = APIRouter(prefix="/admin/auth", tags=["Admin Endpoints"])
+logger = logging.getLogger(__name__)
+
+
+async def _users_as_ndjson(per_page: int):
+    """Encode each Supabase page as NDJSON lines and hand it to the client as soon as it arrives."""
+    try:
+        async for users in AdminAuthManager.iter_users(per_page=per_page):
+            yield "".join(user.model_dump_json() + "\n" for user in users)
+    except Exception as e:
+        # Headers are already sent, so the failure is reported in-band as the last line.
+        logger.error("Streaming users failed: %s", e)
+        yield json.dumps({"error": str(e)}) + "\n"
+
 
 @router.post("/user")
-async def create_user(user_data: AdminRegister):
+async def create_user(user_data: AdminRegister, auth: AuthContext = Depends(get_admin_context)):
 
-    return await AdminAuthManager.create_user(user_data.model_dump())
+    return await AdminAuthManager.create_user(user_data.model_dump(mode="json"), actor_id=auth.user_id)
 
 @router.put("/user/{user_id}")
-async def update_user(user_id: str, user_data_to_update: AdminUpdateProfile):
-    print(user_data_to_update.dict())
+async def update_user(
+    user_id: str,
+    user_data_to_update: AdminUpdateProfile,
+    auth: AuthContext = Depends(get_admin_context),
+):
 
-    return await AdminAuthManager.update_a_user_by_id(user_id, user_data_to_update)
+    return await AdminAuthManager.update_a_user_by_id(user_id, user_data_to_update, actor_id=auth.user_id)
 
 @router.delete("/user/{user_id}")
-async def delete_user(user_id):
+async def delete_user(user_id, auth: AuthContext = Depends(get_admin_context)):
 
-    return await AdminAuthManager.delete_user(user_id)
+    return await AdminAuthManager.delete_user(user_id, actor_id=auth.user_id)
 
 @router.post("/user/invite")
-async def invite_user(email: EmailStr):
+async def invite_user(email: EmailStr, auth: AuthContext = Depends(get_admin_context)):
 
-    return await AdminAuthManager.invite_a_user(email)
+    return await AdminAuthManager.invite_a_user(email, actor_id=auth.user_id)
 
 @router.get("/user/{user_id}")
-async def get_user_by_id(user_id: str):
+async def get_user_by_id(user_id: str, auth: AuthContext = Depends(get_admin_context)):
 
     return await AdminAuthManager.get_user_by_id(_id=user_id)
 
 @router.get("/users")
-async def get_all_users():
+async def get_all_users(
+    page: Optional[int] = Query(None, ge=1),
+    per_page: Optional[int] = Query(None, ge=1, le=1000),
+    stream: bool = Query(False, description="Stream every user as NDJSON, page by page."),
+    auth: AuthContext = Depends(get_admin_context),
+):
+    if stream:
+        return StreamingResponse(
+            _users_as_ndjson(per_page or USERS_STREAM_PAGE_SIZE),
+            media_type="application/x-ndjson",
+        )
+
+    return await AdminAuthManager.get_all_users(page=page, per_page=per_page)
+
+
+@router.post("/users/bulk/invite", response_model=AdminBulkResult)
+async def bulk_invite_users(payload: AdminBulkInvite, auth: AuthContext = Depends(get_admin_context)):
+
+    return await AdminAuthManager.bulk_invite_users(payload.emails, actor_id=auth.user_id)
+
+
+@router.post("/users/bulk/delete", response_model=AdminBulkResult)
+async def bulk_delete_users(payload: AdminBulkDelete, auth: AuthContext = Depends(get_admin_context)):
+
+    return await AdminAuthManager.bulk_delete_users(payload.user_ids, actor_id=auth.user_id)
+
+
+@router.put("/users/bulk/update", response_model=AdminBulkResult)
+async def bulk_update_users(payload: AdminBulkUpdate, auth: AuthContext = Depends(get_admin_context)):
 
-    return await AdminAuthManager.get_all_users()
+    return await AdminAuthManager.bulk_update_users(payload.users, actor_id=auth.user_id)
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..managers.audit import AuditLogManager
+from ..models.enums import AuditAction
+from ..schemas.responses.admin import AuditLogPage
+from ....database.db import get_async_db
+from ....utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ....utils.security import AuthContext, get_admin_context
+
+
+router = APIRouter(prefix="/api/admin", tags=["Admin Endpoints"])
+
+
+@router.get("/logs", response_model=AuditLogPage)
+async def list_audit_logs(
+    actor_id: Optional[UUID] = Query(None, description="Only this admin's actions."),
+    action: Optional[AuditAction] = None,
+    since: Optional[datetime] = Query(None, description="Entries at or after this time, UTC when naive."),
+    until: Optional[datetime] = Query(None, description="Entries before this time, UTC when naive."),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_admin_context),
+):
+    """The admin audit log, newest first (Admin only)."""
+    return await AuditLogManager.list_logs(
+        db, actor_id=actor_id, action=action, since=since, until=until, cursor=cursor, limit=limit
+    )
@@ -1,9 +1,12 @@
 #!/usr/bin/python3
 
 
-from pydantic import BaseModel, EmailStr
+from typing import List
+
+from pydantic import BaseModel, EmailStr, Field
 
 from ....models.enums import RoleType
+from .....utils.config import settings
 
 
 class AdminRegister(BaseModel):
@@ -12,7 +15,7 @@ class AdminRegister(BaseModel):
     email: EmailStr
     password: str
     photo_url: str
-    role: str
+    role: RoleType
     phone: str
     location: str
 
@@ -30,3 +33,19 @@ class AdminUpdateProfile(BaseModel):
     role: RoleType
     location: str
 
+
+class AdminBulkInvite(BaseModel):
+    emails: List[EmailStr] = Field(..., min_length=1, max_length=settings.ADMIN_BULK_MAX_ITEMS)
+
+
+class AdminBulkDelete(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=settings.ADMIN_BULK_MAX_ITEMS)
+
+
+class AdminBulkUpdateItem(BaseModel):
+    user_id: str
+    user_data: AdminUpdateProfile
+
+
+class AdminBulkUpdate(BaseModel):
+    users: List[AdminBulkUpdateItem] = Field(..., min_length=1, max_length=settings.ADMIN_BULK_MAX_ITEMS)
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class AdminBulkItemResult(BaseModel):
+    item: str
+    ok: bool
+    error: Optional[str] = None
+
+
+class AdminBulkResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[AdminBulkItemResult]
+
+
+class AuditLogEntry(BaseModel):
+    id: int
+    created_at: datetime
+    actor_id: Optional[UUID] = None
+    action: str
+    target: Optional[str] = None
+    succeeded: bool
+    error: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogEntry]
+    next_cursor: Optional[str] = None
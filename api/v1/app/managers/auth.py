@@ -1,15 +1,16 @@
-import os
 from fastapi import HTTPException, status
-from ....supabase.supabase_client import supabase
-from dotenv import load_dotenv
+from ....supabase.supabase_admin import get_async_admin_client
+from ....supabase.supabase_client import get_async_supabase, get_user_auth_client
+from ..models.enums import RoleType
+from ...utils.config import settings
+from ...utils.metrics import track_supabase
+from ...utils.security import AuthContext, update_cached_claims
 import logging
 
-# Load environment variables
-load_dotenv()
-EMAIL_SIGN_UP_REDIRECT_URL = f"{os.getenv('SITE_HOST')}:{os.getenv('SITE_PORT')}"
+EMAIL_SIGN_UP_REDIRECT_URL = f"{settings.SITE_HOST}:{settings.SITE_PORT}"
+# Tries at setting the role of a new account before it is deleted again
+SIGN_UP_ROLE_ATTEMPTS = 3
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AuthManager:
@@ -19,8 +20,10 @@ class AuthManager:
         Helper method to handle Supabase Auth requests.
         """
         try:
-            method = getattr(supabase.auth, method_name)
-            response = method(*args, **kwargs)
+            client = await get_async_supabase()
+            method = getattr(client.auth, method_name)
+            with track_supabase(method_name):
+                response = await method(*args, **kwargs)
 
             # Convert response to dictionary for JSON serialization
             if hasattr(response, "user") or hasattr(response, "session"):
@@ -28,75 +31,99 @@ class AuthManager:
                     "user": response.user.__dict__ if response.user else None,
                     "session": response.session.__dict__ if response.session else None
                 }
-                logger.info(f"AuthManager.{method_name} successful.")
+                logger.info("AuthManager.%s successful.", method_name, extra={"sampled": True})
                 return response_dict
 
             # If response is already a dict or primitive, return as is
             return response
 
         except Exception as e:
-            logger.error(f"AuthManager.{method_name} failed: {str(e)}")
+            logger.error("AuthManager.%s failed: %s", method_name, e)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     @staticmethod
     async def create_user(user_data: dict) -> dict:
         """
         Creates a new user in Supabase Auth.
+        The role goes to `app_metadata` through the service role, so it is
+        set here once and cannot be changed by the user afterwards.
         """
         try:
-            auth_table = supabase.auth.sign_up({
-                "email": user_data["email"],
-                "password": user_data["hashed_password"],
-                "phone": user_data["phone"],
-                "options": {
-                    "data": {
-                        "first_name": user_data.get("first_name"),
-                        "last_name": user_data.get("last_name"),
-                        "location": user_data.get("location"),
-                        "phone": user_data.get("phone"),
-                        "role": user_data.get("role", "buyer")
+            role = RoleType(user_data.get("role") or RoleType.buyer).value
+            client = await get_async_supabase()
+            with track_supabase("sign_up"):
+                auth_table = await client.auth.sign_up({
+                    "email": user_data["email"],
+                    "password": user_data["hashed_password"],
+                    "phone": user_data["phone"],
+                    "options": {
+                        "data": {
+                            "first_name": user_data.get("first_name"),
+                            "last_name": user_data.get("last_name"),
+                            "location": user_data.get("location"),
+                            "phone": user_data.get("phone"),
+                        }
                     }
-                }
-            })
+                })
             
             if not auth_table.user:
                 raise HTTPException(status_code=400, detail="Failed to create user in Supabase Auth.")
 
+            await AuthManager._set_sign_up_role(auth_table.user.id, role)
+
             return {
                 "message": "User created successfully",
-                "user_data": auth_table.user.user_metadata
+                "user_data": {**auth_table.user.user_metadata, "role": role}
             }
         except Exception as e:
-            logger.error(f"Error creating user: {str(e)}")
+            logger.error("Error creating user: %s", e)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
     @staticmethod
-    async def get_and_update_user(user_id: str, data_to_update: dict = None) -> dict:
+    async def _set_sign_up_role(user_id: str, role: str):
+        """
+        Sets the role of a just signed-up account, retrying a few times. An account
+        left without a role could never be used, so if every attempt fails it is
+        deleted, letting the sign-up be retried, and the last error is raised.
+        """
+        admin = await get_async_admin_client()
+        for attempt in range(SIGN_UP_ROLE_ATTEMPTS):
+            try:
+                with track_supabase("admin.update_user_by_id"):
+                    await admin.update_user_by_id(user_id, {"app_metadata": {"role": role}})
+                return
+            except Exception as e:
+                logger.warning("Setting the role of new user %s failed (attempt %d): %s", user_id, attempt + 1, e)
+                error = e
+        with track_supabase("admin.delete_user"):
+            await admin.delete_user(user_id)
+        raise error
+
+    @staticmethod
+    async def get_and_update_user(auth: AuthContext, data_to_update: dict = None) -> dict:
         """
         Fetches current user data and optionally updates their profile in Supabase Auth.
         If `data_to_update` is None, returns the current user data. If fields in `data_to_update`
-        are missing or empty, retains the current values.
+        are missing or empty, retains the current values. The role is read
+        from the token and is not something the user can update.
+        The caller is identified from their verified access token, so reading the
+        profile needs no Supabase round trip. The update is made on the user's own
+        session, so a new email only takes effect once confirmed from that address.
         """
         try:
-            # Fetch current user data
-            current_user = supabase.auth.get_user()
-            if not current_user:
-                raise HTTPException(status_code=404, detail="User not found.")
-    
-            # Extract current data
+            # Extract current data from the verified token claims
             current_data = {
-                "email": current_user.user.email,
-                "first_name": current_user.user.user_metadata.get("first_name", ""),
-                "last_name": current_user.user.user_metadata.get("last_name", ""),
-                "location": current_user.user.user_metadata.get("location", ""),
-                "photo_url": current_user.user.user_metadata.get("photo_url", ""),
-                "phone": current_user.user.user_metadata.get("phone", ""),
-                "role": current_user.user.user_metadata.get("role", None),
+                "email": auth.email,
+                "first_name": auth.user_metadata.get("first_name", ""),
+                "last_name": auth.user_metadata.get("last_name", ""),
+                "location": auth.user_metadata.get("location", ""),
+                "photo_url": auth.user_metadata.get("photo_url", ""),
+                "phone": auth.user_metadata.get("phone", ""),
             }
     
             # If no update data is provided, return the current user data
             if data_to_update is None:
-                return current_data
+                return {**current_data, "role": auth.role}
     
             # Merge current data with the update data, preserving existing values
             updated_data = {
@@ -105,27 +132,35 @@ class AuthManager:
             }
     
             # Proceed to update user data
-            response = supabase.auth.update_user({
-                "email": updated_data["email"],
-                "data": {
-                    "first_name": updated_data["first_name"],
-                    "last_name": updated_data["last_name"],
-                    "location": updated_data["location"],
-                    "photo_url": updated_data["photo_url"],
-                    "phone": updated_data["phone"],
-                    "role": updated_data["role"],
-                }
-            })
+            with track_supabase("update_user"):
+                client = await get_user_auth_client(auth.access_token)
+                response = await client.update_user({
+                    "email": updated_data["email"],
+                    "data": {
+                        "first_name": updated_data["first_name"],
+                        "last_name": updated_data["last_name"],
+                        "location": updated_data["location"],
+                        "photo_url": updated_data["photo_url"],
+                        "phone": updated_data["phone"],
+                    }
+                })
     
             if not response.user:
                 raise HTTPException(status_code=400, detail="Failed to update user in Supabase Auth.")
     
+            update_cached_claims(
+                auth.access_token,
+                email=response.user.email,
+                user_metadata=response.user.user_metadata,
+            )
             return {
                 "message": "User updated successfully",
-                "user_data": response.user.user_metadata
+                "user_data": {**response.user.user_metadata, "role": auth.role}
             }
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error in get_and_update_user: {str(e)}")
+            logger.error("Error in get_and_update_user: %s", e)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
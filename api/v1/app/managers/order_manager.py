@@ -1,5 +1,459 @@
 #!/usr/bin/python3
 
 
+from collections import Counter
+from typing import Dict, List, Optional
+
+import sqlalchemy
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .product_manager import product_cache
+from .sales_manager import SalesManager
+from ..models.enums import OrderStatus, ProductStatus
+from ..models.order_model import order, order_item
+from ..models.product_model import product
+from ..schemas.requests.order import OrderCreate, OrderItemCreate
+from ..schemas.responses.custom_responses import (
+    INSUFFICIENT_STOCK, ORDER_CONTENDED, ORDER_ITEM_NOT_FOUND, ORDER_NOT_CANCELABLE, ORDER_NOT_DELETABLE,
+    ORDER_NOT_COMPLETABLE, ORDER_NOT_EDITABLE, ORDER_NOT_FOUND, PRODUCT_NOT_FOUND, PRODUCT_UNAVAILABLE,
+)
+from ...utils.config import settings
+from ...utils.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+from ...utils.security import AuthContext
+
+# Postgres SQLSTATE raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = "55P03"
+
+ORDER_ITEM_COLUMNS = [order_item.c.product_id, order_item.c.quantity, order_item.c.unit_price]
+
+# Item mutations run as one statement each: stock, line items and orders.amount
+# change together, and orders.amount is adjusted by the delta, never re-summed.
+APPEND_ITEMS_SQL = sqlalchemy.text("""
+    WITH requested AS (
+        SELECT * FROM unnest(CAST(:product_ids AS integer[]), CAST(:quantities AS integer[]))
+            AS r(product_id, quantity)
+    ), reserved AS (
+        UPDATE products SET quantity = products.quantity - requested.quantity,
+                            updated_at = timezone('UTC', now())
+        FROM requested
+        WHERE products.id = requested.product_id
+          AND products.quantity >= requested.quantity
+          AND products.status != 'unavailable'
+        RETURNING products.id AS product_id, products.amount AS unit_price, requested.quantity
+    ), upserted AS (
+        INSERT INTO order_items (order_id, product_id, quantity, unit_price)
+        SELECT CAST(:order_id AS integer), product_id, quantity, unit_price FROM reserved
+        ON CONFLICT (order_id, product_id)
+            DO UPDATE SET quantity = order_items.quantity + excluded.quantity
+        RETURNING product_id, unit_price
+    )
+    UPDATE orders SET amount = orders.amount + coalesce((
+        SELECT sum(reserved.quantity * upserted.unit_price)
+        FROM reserved JOIN upserted USING (product_id)
+    ), 0)
+    WHERE orders.id = :order_id
+    RETURNING (SELECT count(*) FROM reserved) AS reserved
+""")
+
+UPDATE_ITEM_SQL = sqlalchemy.text("""
+    WITH current AS (
+        SELECT quantity, unit_price FROM order_items
+        WHERE order_id = :order_id AND product_id = :product_id
+    ), reserved AS (
+        UPDATE products SET quantity = products.quantity - (:quantity - current.quantity),
+                            updated_at = timezone('UTC', now())
+        FROM current
+        WHERE products.id = :product_id AND products.quantity >= :quantity - current.quantity
+        RETURNING products.id
+    ), changed AS (
+        UPDATE order_items SET quantity = :quantity
+        FROM reserved
+        WHERE order_items.order_id = :order_id AND order_items.product_id = reserved.id
+        RETURNING order_items.product_id
+    )
+    UPDATE orders SET amount = orders.amount + (:quantity - current.quantity) * current.unit_price
+    FROM current, changed
+    WHERE orders.id = :order_id
+    RETURNING orders.amount
+""")
+
+REMOVE_ITEM_SQL = sqlalchemy.text("""
+    WITH removed AS (
+        DELETE FROM order_items
+        WHERE order_id = :order_id AND product_id = :product_id
+        RETURNING product_id, quantity, unit_price
+    ), restocked AS (
+        UPDATE products SET quantity = products.quantity + removed.quantity,
+                            updated_at = timezone('UTC', now())
+        FROM removed
+        WHERE products.id = removed.product_id
+        RETURNING products.id
+    )
+    UPDATE orders SET amount = orders.amount - removed.quantity * removed.unit_price
+    FROM removed
+    WHERE orders.id = :order_id
+    RETURNING orders.amount
+""")
+
+
 class OrderManager:
-    pass
+    """This class handles order placement, stock reservation and the buyer's orders"""
+
+    @staticmethod
+    async def _set_lock_timeout(db: AsyncSession):
+        """
+        Bound how long this transaction queues behind other buyers' row locks,
+        so a hot product sheds load instead of building a lock convoy.
+        """
+        await db.execute(
+            sqlalchemy.select(sqlalchemy.func.set_config("lock_timeout", f"{settings.ORDER_LOCK_TIMEOUT_MS}ms", True))
+        )
+
+    @staticmethod
+    def _raise_if_contended(error: DBAPIError):
+        """Turn an expired lock_timeout into a retryable 503."""
+        if getattr(error.orig, "sqlstate", None) == LOCK_NOT_AVAILABLE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=ORDER_CONTENDED,
+                headers={"Retry-After": "1"},
+            )
+
+    @staticmethod
+    async def _lock_products(db: AsyncSession, product_ids: List[int]) -> Dict[int, dict]:
+        """
+        Lock the given products with SELECT ... FOR UPDATE, always in ascending id
+        order so two orders sharing products can never deadlock on each other.
+        """
+        await OrderManager._set_lock_timeout(db)
+        result = await db.execute(
+            sqlalchemy.select(product.c.id, product.c.amount, product.c.quantity, product.c.status)
+            .where(product.c.id.in_(sorted(product_ids)))
+            .order_by(product.c.id)
+            .with_for_update()
+        )
+        return {row["id"]: dict(row) for row in result.mappings()}
+
+    @staticmethod
+    async def _items_by_order(db: AsyncSession, order_ids: List[int]) -> Dict[int, List[dict]]:
+        items = {order_id: [] for order_id in order_ids}
+        if not order_ids:
+            return items
+        result = await db.execute(
+            sqlalchemy.select(order_item.c.order_id, *ORDER_ITEM_COLUMNS)
+            .where(order_item.c.order_id.in_(order_ids))
+            .order_by(order_item.c.order_id, order_item.c.product_id)
+        )
+        for row in result.mappings():
+            row = dict(row)
+            items[row.pop("order_id")].append(row)
+        return items
+
+    @staticmethod
+    async def _get_owned_order(db: AsyncSession, auth: AuthContext, order_id: int, for_update: bool = False) -> dict:
+        query = sqlalchemy.select(*order.c).where(order.c.id == order_id, order.c.buyer_id == auth.user_id)
+        if for_update:
+            query = query.with_for_update()
+        row = (await db.execute(query)).mappings().first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=ORDER_NOT_FOUND)
+        return dict(row)
+
+    @staticmethod
+    async def _lock_editable_order(
+        db: AsyncSession, auth: AuthContext, order_id: int, product_ids: List[int]
+    ) -> Dict[int, dict]:
+        """Lock one of the caller's pending orders, then the products it touches, which are returned."""
+        found = await OrderManager._get_owned_order(db, auth, order_id, for_update=True)
+        if found["status"] != OrderStatus.pending:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_NOT_EDITABLE)
+        return await OrderManager._lock_products(db, product_ids)
+
+    @staticmethod
+    async def _discard_cached_products(product_ids):
+        """Stock moved, so cached product details would show the old quantity."""
+        await product_cache.discard(*(product_cache.key("item", product_id) for product_id in product_ids))
+
+    @staticmethod
+    async def create_order(db: AsyncSession, auth: AuthContext, order_data: OrderCreate) -> dict:
+        """
+        Place an order in a single transaction: lock the products, check and
+        reserve stock, then write the order and its line items.
+        The amount is computed from the locked product prices, never from the client.
+        :param db:
+        :param auth: the buyer
+        :param order_data:
+        :return the created order:
+        """
+        quantities = Counter()
+        for item in order_data.items:
+            quantities[item.product_id] += item.quantity
+
+        try:
+            products = await OrderManager._lock_products(db, list(quantities))
+            if len(products) != len(quantities):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=PRODUCT_NOT_FOUND)
+            for product_id, quantity in quantities.items():
+                if products[product_id]["status"] == ProductStatus.unavailable:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=PRODUCT_UNAVAILABLE)
+                if products[product_id]["quantity"] < quantity:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=INSUFFICIENT_STOCK)
+
+            reserved = sorted(quantities.items())
+            await db.execute(
+                product.update()
+                .where(product.c.id == sqlalchemy.bindparam("reserved_id"))
+                .values(quantity=product.c.quantity - sqlalchemy.bindparam("reserved_quantity")),
+                [{"reserved_id": product_id, "reserved_quantity": quantity} for product_id, quantity in reserved],
+            )
+
+            amount = sum(products[product_id]["amount"] * quantity for product_id, quantity in reserved)
+            result = await db.execute(
+                order.insert()
+                .values(description=order_data.description, amount=round(amount, 2), buyer_id=auth.user_id)
+                .returning(*order.c)
+            )
+            created = dict(result.mappings().one())
+            items = [
+                {"product_id": product_id, "quantity": quantity, "unit_price": products[product_id]["amount"]}
+                for product_id, quantity in reserved
+            ]
+            await db.execute(order_item.insert(), [{"order_id": created["id"], **item} for item in items])
+            await SalesManager.apply_order(db, created["id"], placed=1)
+            await db.commit()
+            await OrderManager._discard_cached_products(quantities)
+        except HTTPException:
+            await db.rollback()
+            raise
+        except DBAPIError as e:
+            await db.rollback()
+            OrderManager._raise_if_contended(e)
+            raise
+
+        return {**created, "items": items}
+
+    @staticmethod
+    async def get_order(db: AsyncSession, auth: AuthContext, order_id: int) -> dict:
+        """
+        Get one of the caller's orders with its line items.
+        :param db:
+        :param auth:
+        :param order_id:
+        :return:
+        """
+        found = await OrderManager._get_owned_order(db, auth, order_id)
+        items = await OrderManager._items_by_order(db, [order_id])
+        return {**found, "items": items[order_id]}
+
+    @staticmethod
+    async def list_orders(
+        db: AsyncSession, auth: AuthContext, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> dict:
+        """
+        List the caller's orders, newest first, with keyset pagination.
+        Line items for the whole page are loaded with a single query.
+        :param db:
+        :param auth:
+        :param cursor:
+        :param limit:
+        :return a page of orders and the cursor of the next page:
+        """
+        query = sqlalchemy.select(*order.c).where(order.c.buyer_id == auth.user_id)
+        if cursor:
+            created_at, order_id = decode_cursor(cursor)
+            query = query.where(sqlalchemy.tuple_(order.c.created_at, order.c.id) < sqlalchemy.tuple_(created_at, order_id))
+        result = await db.execute(query.order_by(order.c.created_at.desc(), order.c.id.desc()).limit(limit + 1))
+        rows = [dict(row) for row in result.mappings()]
+
+        page = rows[:limit]
+        items = await OrderManager._items_by_order(db, [row["id"] for row in page])
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+        return {"items": [{**row, "items": items[row["id"]]} for row in page], "next_cursor": next_cursor}
+
+    @staticmethod
+    async def append_order_items(
+        db: AsyncSession, auth: AuthContext, order_id: int, items_to_add: List[OrderItemCreate]
+    ) -> dict:
+        """
+        Add products to a pending order, or raise their quantity if already on it.
+        :param db:
+        :param auth:
+        :param order_id:
+        :param items_to_add:
+        :return the updated order:
+        """
+        quantities = Counter()
+        for item in items_to_add:
+            quantities[item.product_id] += item.quantity
+        product_ids = sorted(quantities)
+
+        try:
+            products = await OrderManager._lock_editable_order(db, auth, order_id, product_ids)
+            # Told apart here as create_order does; the statement alone only sees rows it could not reserve.
+            if len(products) != len(product_ids):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=PRODUCT_NOT_FOUND)
+            if any(found["status"] == ProductStatus.unavailable for found in products.values()):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=PRODUCT_UNAVAILABLE)
+            await SalesManager.apply_order(db, order_id, placed=-1)
+            reserved = (await db.execute(APPEND_ITEMS_SQL, {
+                "order_id": order_id,
+                "product_ids": product_ids,
+                "quantities": [quantities[product_id] for product_id in product_ids],
+            })).scalar()
+            if reserved != len(product_ids):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=INSUFFICIENT_STOCK)
+            await SalesManager.apply_order(db, order_id, placed=1)
+            await db.commit()
+            await OrderManager._discard_cached_products(product_ids)
+        except HTTPException:
+            await db.rollback()
+            raise
+        except DBAPIError as e:
+            await db.rollback()
+            OrderManager._raise_if_contended(e)
+            raise
+
+        return await OrderManager.get_order(db, auth, order_id)
+
+    @staticmethod
+    async def update_order_item(db: AsyncSession, auth: AuthContext, order_id: int, new_item: OrderItemCreate) -> dict:
+        """
+        Set the quantity of a product already on a pending order.
+        :param db:
+        :param auth:
+        :param order_id:
+        :param new_item: the product and its new quantity
+        :return the updated order:
+        """
+        try:
+            await OrderManager._lock_editable_order(db, auth, order_id, [new_item.product_id])
+            await SalesManager.apply_order(db, order_id, placed=-1)
+            changed = (await db.execute(UPDATE_ITEM_SQL, {
+                "order_id": order_id, "product_id": new_item.product_id, "quantity": new_item.quantity,
+            })).first()
+            if changed is None:
+                on_order = await db.scalar(
+                    sqlalchemy.select(order_item.c.id).where(
+                        order_item.c.order_id == order_id, order_item.c.product_id == new_item.product_id
+                    )
+                )
+                if on_order is None:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=ORDER_ITEM_NOT_FOUND)
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=INSUFFICIENT_STOCK)
+            await SalesManager.apply_order(db, order_id, placed=1)
+            await db.commit()
+            await OrderManager._discard_cached_products([new_item.product_id])
+        except HTTPException:
+            await db.rollback()
+            raise
+        except DBAPIError as e:
+            await db.rollback()
+            OrderManager._raise_if_contended(e)
+            raise
+
+        return await OrderManager.get_order(db, auth, order_id)
+
+    @staticmethod
+    async def remove_order_item(db: AsyncSession, auth: AuthContext, order_id: int, product_id: int) -> dict:
+        """
+        Take a product off a pending order and return its stock.
+        :param db:
+        :param auth:
+        :param order_id:
+        :param product_id:
+        :return the updated order:
+        """
+        try:
+            await OrderManager._lock_editable_order(db, auth, order_id, [product_id])
+            await SalesManager.apply_order(db, order_id, placed=-1)
+            removed = (await db.execute(REMOVE_ITEM_SQL, {"order_id": order_id, "product_id": product_id})).first()
+            if removed is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=ORDER_ITEM_NOT_FOUND)
+            await SalesManager.apply_order(db, order_id, placed=1)
+            await db.commit()
+            await OrderManager._discard_cached_products([product_id])
+        except HTTPException:
+            await db.rollback()
+            raise
+        except DBAPIError as e:
+            await db.rollback()
+            OrderManager._raise_if_contended(e)
+            raise
+
+        return await OrderManager.get_order(db, auth, order_id)
+
+    @staticmethod
+    async def cancel_order(db: AsyncSession, auth: AuthContext, order_id: int) -> dict:
+        """
+        Cancel a pending or processing order and return its stock, in one transaction.
+        :param db:
+        :param auth:
+        :param order_id:
+        :return the canceled order:
+        """
+        try:
+            found = await OrderManager._get_owned_order(db, auth, order_id, for_update=True)
+            if found["status"] not in (OrderStatus.pending, OrderStatus.processing):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_NOT_CANCELABLE)
+
+            items = (await OrderManager._items_by_order(db, [order_id]))[order_id]
+            await OrderManager._lock_products(db, [item["product_id"] for item in items])
+            await db.execute(
+                product.update()
+                .where(product.c.id == order_item.c.product_id, order_item.c.order_id == order_id)
+                .values(quantity=product.c.quantity + order_item.c.quantity)
+            )
+            await db.execute(order.update().where(order.c.id == order_id).values(status=OrderStatus.cancel))
+            await SalesManager.apply_order(db, order_id, placed=-1, canceled=1)
+            await db.commit()
+            await OrderManager._discard_cached_products([item["product_id"] for item in items])
+        except HTTPException:
+            await db.rollback()
+            raise
+        except DBAPIError as e:
+            await db.rollback()
+            OrderManager._raise_if_contended(e)
+            raise
+
+        return {**found, "status": OrderStatus.cancel, "items": items}
+
+    @staticmethod
+    async def complete_order(db: AsyncSession, auth: AuthContext, order_id: int) -> dict:
+        """
+        Mark a pending or processing order as completed once the buyer has received it.
+        :param db:
+        :param auth:
+        :param order_id:
+        :return the completed order:
+        """
+        found = await OrderManager._get_owned_order(db, auth, order_id, for_update=True)
+        if found["status"] not in (OrderStatus.pending, OrderStatus.processing):
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_NOT_COMPLETABLE)
+        await db.execute(order.update().where(order.c.id == order_id).values(status=OrderStatus.completed))
+        await SalesManager.apply_order(db, order_id, completed=1)
+        await db.commit()
+        items = await OrderManager._items_by_order(db, [order_id])
+        return {**found, "status": OrderStatus.completed, "items": items[order_id]}
+
+    @staticmethod
+    async def delete_order(db: AsyncSession, auth: AuthContext, order_id: int) -> None:
+        """
+        Delete one of the caller's canceled orders. Its line items go with it.
+        :param db:
+        :param auth:
+        :param order_id:
+        :return:
+        """
+        found = await OrderManager._get_owned_order(db, auth, order_id, for_update=True)
+        if found["status"] != OrderStatus.cancel:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_NOT_DELETABLE)
+        # Its line items go with it, so take them off the canceled sales first.
+        await SalesManager.apply_order(db, order_id, canceled=-1)
+        await db.execute(order.delete().where(order.c.id == order_id))
+        await db.commit()
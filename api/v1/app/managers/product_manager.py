@@ -1,5 +1,404 @@
 #!/usr/bin/python3
 
 
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional
+
+import sqlalchemy
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.enums import ProductStatus, RoleType
+from ..models.product_model import product
+from ..models.store import store
+from ..schemas.requests.product import ProductCreate, ProductUpdate
+from ..schemas.responses.custom_responses import (
+    DUPLICATE_SKU, PRODUCT_NOT_FOUND, PRODUCT_ON_ORDERS, MERCHANT_ONLY, STORE_NOT_OWNED,
+)
+from ...utils.cache import LRUCacheBackend, ReadThroughCache
+from ...utils.config import settings
+from ...utils.metrics import REGISTRY
+from ...utils.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+from ...utils.security import AuthContext
+from ...utils.streams import Record, StreamFormatError
+
+# Columns returned to clients. The table stores the price as `amount`.
+PRODUCT_COLUMNS = [
+    column for column in product.c if column.name not in ("amount", "search_vector")
+] + [product.c.amount.label("price")]
+
+# Product pages and details served from memory between writes. Set
+# `product_cache.backend` to a shared backend to keep workers consistent.
+product_cache = ReadThroughCache(
+    "products",
+    LRUCacheBackend(max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES),
+    ttl=settings.PRODUCT_CACHE_TTL,
+    enabled=settings.PRODUCT_CACHE_ENABLED,
+)
+REGISTRY.add_collector("product_cache", product_cache.stats)
+
+# Exported rows: the product plus the store it is listed in.
+EXPORT_COLUMNS = PRODUCT_COLUMNS + [
+    store.c[name].label(f"store_{name}") for name in ("description", "photo_url", "speciality", "status", "owner_id")
+]
+
+# Bulk imports COPY validated rows here, then merge them into products with
+# one statement. Temporary and dropped on commit, so concurrent imports
+# never see each other's rows.
+import_staging = sqlalchemy.Table(
+    "product_import_staging",
+    sqlalchemy.MetaData(),
+    sqlalchemy.Column("line", sqlalchemy.Integer),
+    sqlalchemy.Column("name", sqlalchemy.Text),
+    sqlalchemy.Column("description", sqlalchemy.Text),
+    sqlalchemy.Column("photo_url", sqlalchemy.Text),
+    sqlalchemy.Column("quantity", sqlalchemy.Integer),
+    sqlalchemy.Column("amount", sqlalchemy.Float),
+    sqlalchemy.Column("category", sqlalchemy.Text),
+    sqlalchemy.Column("status", sqlalchemy.Text),
+    sqlalchemy.Column("user_store_id", sqlalchemy.Integer),
+    sqlalchemy.Column("sku", sqlalchemy.Text),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+IMPORT_COLUMNS = [
+    "name", "description", "photo_url", "quantity", "amount", "category", "status", "user_id", "user_store_id", "sku",
+]
+# Fields an imported row overwrites on a product with the same store and sku
+IMPORT_UPDATED_COLUMNS = ["name", "description", "photo_url", "quantity", "amount", "category", "status"]
+
+
+def _describe(error: dict) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
 class ProductManager:
-    pass
+    """This class handles the product catalog: listing, search and seller CRUD"""
+
+    @staticmethod
+    def _list_query(
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        category: Optional[str] = None,
+        product_status: Optional[ProductStatus] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        store_id: Optional[int] = None,
+        q: Optional[str] = None,
+    ):
+        """
+        Build the catalog query. Pages are ordered newest first and walked with a
+        keyset on (created_at, id), so page N costs the same as page 1.
+        One extra row is fetched to tell whether another page exists.
+        """
+        query = sqlalchemy.select(*PRODUCT_COLUMNS)
+        if category is not None:
+            query = query.where(product.c.category == category)
+        if product_status is not None:
+            query = query.where(product.c.status == product_status)
+        if min_price is not None:
+            query = query.where(product.c.amount >= float(min_price))
+        if max_price is not None:
+            query = query.where(product.c.amount <= float(max_price))
+        if store_id is not None:
+            query = query.where(product.c.user_store_id == store_id)
+        if q:
+            query = query.where(
+                product.c.search_vector.op("@@")(sqlalchemy.func.websearch_to_tsquery("english", q))
+            )
+        if cursor:
+            created_at, product_id = decode_cursor(cursor)
+            query = query.where(
+                sqlalchemy.tuple_(product.c.created_at, product.c.id) < sqlalchemy.tuple_(created_at, product_id)
+            )
+        return query.order_by(product.c.created_at.desc(), product.c.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def _require_merchant(auth: AuthContext):
+        if auth.role != RoleType.merchant.value:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=MERCHANT_ONLY)
+
+    @staticmethod
+    async def list_products(db: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, **filters) -> dict:
+        """
+        List products with keyset pagination, filtering, and full-text search.
+        :param db:
+        :param limit: page size
+        :param filters: cursor, category, product_status, min_price, max_price, store_id, q
+        :return a page of products and the cursor of the next page:
+        """
+        async def load():
+            result = await db.execute(ProductManager._list_query(limit=limit, **filters))
+            rows = result.mappings().all()
+            items = [dict(row) for row in rows[:limit]]
+            next_cursor = None
+            if len(rows) > limit:
+                last = items[-1]
+                next_cursor = encode_cursor(last["created_at"], last["id"])
+            return {"items": items, "next_cursor": next_cursor}
+
+        key = await product_cache.versioned_key(
+            "list", limit, *(f"{name}={value}" for name, value in sorted(filters.items()))
+        )
+        return await product_cache.get_or_load(key, load)
+
+    @staticmethod
+    async def get_product(db: AsyncSession, product_id: int) -> dict:
+        """
+        Get a single product by id.
+        :param db:
+        :param product_id:
+        :return:
+        """
+        async def load():
+            result = await db.execute(
+                sqlalchemy.select(*PRODUCT_COLUMNS).where(product.c.id == product_id)
+            )
+            row = result.mappings().first()
+            if row is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=PRODUCT_NOT_FOUND)
+            return dict(row)
+
+        return await product_cache.get_or_load(product_cache.key("item", product_id), load)
+
+    @staticmethod
+    async def create_product(db: AsyncSession, auth: AuthContext, product_data: ProductCreate) -> dict:
+        """
+        Create a product in one of the caller's stores.
+        :param db:
+        :param auth: the calling merchant
+        :param product_data:
+        :return the created product:
+        """
+        ProductManager._require_merchant(auth)
+        owns_store = await db.scalar(
+            sqlalchemy.select(store.c.id).where(
+                store.c.id == product_data.user_store_id, store.c.owner_id == auth.user_id
+            )
+        )
+        if owns_store is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=STORE_NOT_OWNED)
+
+        values = product_data.model_dump()
+        values["amount"] = float(values.pop("price"))
+        try:
+            result = await db.execute(
+                product.insert().values(**values, user_id=auth.user_id).returning(*PRODUCT_COLUMNS)
+            )
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=DUPLICATE_SKU)
+        row = result.mappings().one()
+        await db.commit()
+        await product_cache.invalidate()
+        return dict(row)
+
+    @staticmethod
+    async def update_product(db: AsyncSession, auth: AuthContext, product_id: int, product_data: ProductUpdate) -> dict:
+        """
+        Update the provided fields of one of the caller's products.
+        :param db:
+        :param auth: the calling merchant
+        :param product_id:
+        :param product_data:
+        :return the updated product:
+        """
+        ProductManager._require_merchant(auth)
+        values = product_data.model_dump(exclude_unset=True)
+        if "price" in values:
+            values["amount"] = float(values.pop("price"))
+        if not values:
+            return await ProductManager.get_product(db, product_id)
+
+        try:
+            result = await db.execute(
+                product.update()
+                .where(product.c.id == product_id, product.c.user_id == auth.user_id)
+                .values(**values)
+                .returning(*PRODUCT_COLUMNS)
+            )
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=DUPLICATE_SKU)
+        row = result.mappings().first()
+        if row is None:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=PRODUCT_NOT_FOUND)
+        await db.commit()
+        await product_cache.invalidate(product_cache.key("item", product_id))
+        return dict(row)
+
+    @staticmethod
+    async def delete_product(db: AsyncSession, auth: AuthContext, product_id: int) -> None:
+        """
+        Delete one of the caller's products.
+        :param db:
+        :param auth: the calling merchant
+        :param product_id:
+        :return:
+        """
+        ProductManager._require_merchant(auth)
+        try:
+            result = await db.execute(
+                product.delete().where(product.c.id == product_id, product.c.user_id == auth.user_id)
+            )
+        except IntegrityError:
+            # Order lines keep their product; its daily sales go with it.
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=PRODUCT_ON_ORDERS)
+        if result.rowcount == 0:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=PRODUCT_NOT_FOUND)
+        await db.commit()
+        await product_cache.invalidate(product_cache.key("item", product_id))
+
+    @staticmethod
+    async def import_products(db: AsyncSession, auth: AuthContext, records: AsyncIterator[List[Record]]) -> dict:
+        """
+        Load a catalog into the caller's stores. Rows are validated against
+        ProductCreate as they stream in and COPYed to a staging table in
+        batches, then merged into products in one transaction: a row with a
+        sku updates the store's product with that sku or inserts a new one,
+        a row without one is always inserted. When a sku repeats within the
+        upload, its last row wins. Invalid rows are reported and skipped.
+        :param db:
+        :param auth: the calling merchant
+        :param records: batches of (line, row) from one of the utils.streams readers
+        :return counts of received, inserted, updated, superseded and failed rows, and the per-row errors:
+        """
+        ProductManager._require_merchant(auth)
+        owned_stores = set(await db.scalars(sqlalchemy.select(store.c.id).where(store.c.owner_id == auth.user_id)))
+        connection = await db.connection()
+        await connection.run_sync(import_staging.create)
+        copier = (await connection.get_raw_connection()).driver_connection
+
+        report = {
+            "received": 0, "inserted": 0, "updated": 0, "superseded": 0, "failed": 0,
+            "errors": [], "errors_truncated": False,
+        }
+
+        def reject(line: int, errors: List[str]):
+            report["failed"] += 1
+            if len(report["errors"]) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+                report["errors"].append({"line": line, "errors": errors})
+            else:
+                report["errors_truncated"] = True
+
+        async def copy(rows: list):
+            await copier.copy_records_to_table(
+                import_staging.name, records=rows, columns=[column.name for column in import_staging.c]
+            )
+
+        staged = 0
+        batch = []
+        try:
+            async for chunk in records:
+                for line, row in chunk:
+                    report["received"] += 1
+                    if isinstance(row, str):
+                        reject(line, [row])
+                        continue
+                    try:
+                        item = ProductCreate.model_validate(row)
+                    except ValidationError as error:
+                        reject(line, [_describe(detail) for detail in error.errors()])
+                        continue
+                    if item.user_store_id not in owned_stores:
+                        reject(line, [STORE_NOT_OWNED])
+                        continue
+                    batch.append((
+                        line, item.name, item.description, item.photo_url, item.quantity, float(item.price),
+                        item.category, item.status.name, item.user_store_id, item.sku,
+                    ))
+                if len(batch) >= settings.PRODUCT_IMPORT_BATCH_SIZE:
+                    await copy(batch)
+                    staged += len(batch)
+                    batch = []
+        except StreamFormatError as error:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+        if batch:
+            await copy(batch)
+            staged += len(batch)
+
+        if staged:
+            rows = sqlalchemy.select(
+                *(import_staging.c[name] for name in IMPORT_COLUMNS[:6]),
+                sqlalchemy.cast(import_staging.c.status, product.c.status.type),
+                sqlalchemy.cast(sqlalchemy.literal(auth.user_id), postgresql.UUID),
+                import_staging.c.user_store_id,
+                import_staging.c.sku,
+            )
+            latest = (
+                rows.where(import_staging.c.sku.isnot(None))
+                .distinct(import_staging.c.user_store_id, import_staging.c.sku)
+                .order_by(import_staging.c.user_store_id, import_staging.c.sku, import_staging.c.line.desc())
+            )
+            upsert = postgresql.insert(product).from_select(IMPORT_COLUMNS, latest)
+            upserted = upsert.on_conflict_do_update(
+                index_elements=[product.c.user_store_id, product.c.sku],
+                index_where=product.c.sku.isnot(None),
+                set_={
+                    **{name: upsert.excluded[name] for name in IMPORT_UPDATED_COLUMNS},
+                    "updated_at": sqlalchemy.text("timezone('UTC', now())"),
+                },
+            ).returning(
+                # xmax is only set on a row version that an update replaced
+                sqlalchemy.literal_column("xmax = 0", sqlalchemy.Boolean).label("inserted")
+            ).cte("upserted")
+            inserted, updated = (await db.execute(
+                sqlalchemy.select(
+                    sqlalchemy.func.count().filter(upserted.c.inserted),
+                    sqlalchemy.func.count().filter(sqlalchemy.not_(upserted.c.inserted)),
+                )
+            )).one()
+            result = await db.execute(
+                product.insert().from_select(IMPORT_COLUMNS, rows.where(import_staging.c.sku.is_(None)))
+            )
+            report["inserted"] = inserted + result.rowcount
+            report["updated"] = updated
+            report["superseded"] = staged - report["inserted"] - updated
+        await db.commit()
+        if staged:
+            await product_cache.invalidate()
+        return report
+
+    @staticmethod
+    async def export_products(
+        db: AsyncSession, since: Optional[datetime] = None, batch_size: int = settings.PRODUCT_EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Every product joined with its store, read through a server-side cursor
+        and yielded `batch_size` rows at a time, so memory stays flat however
+        large the catalog. The next batch is only fetched once the caller asks
+        for it. With `since`, only products created or updated after it are
+        exported, oldest change first; otherwise rows come in table order.
+
+        updated_at is stamped when a transaction writes the row, not when it
+        commits, so a change committed just after the previous export may carry
+        an earlier time than the newest row that export saw. `since` is moved
+        back by PRODUCT_EXPORT_OVERLAP_SECONDS to pick such rows up; products
+        changed within that margin are sent again, and consumers upsert by id.
+        :param db:
+        :param since: only export products changed after this time, less the overlap
+        :param batch_size: rows per fetch from the cursor
+        :return an async iterator of row batches:
+        """
+        query = sqlalchemy.select(*EXPORT_COLUMNS).select_from(
+            product.join(store, product.c.user_store_id == store.c.id)
+        )
+        if since is not None:
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            since -= timedelta(seconds=settings.PRODUCT_EXPORT_OVERLAP_SECONDS)
+            # Matches ix_products_changed_at_id.
+            changed_at = sqlalchemy.func.coalesce(product.c.updated_at, product.c.created_at)
+            query = query.where(changed_at > since).order_by(changed_at, product.c.id)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.mappings().partitions():
+            yield [dict(row) for row in rows]
@@ -0,0 +1,289 @@
+#!/usr/bin/python3
+
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import sqlalchemy
+from fastapi import HTTPException, status
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.enums import OrderStatus, RoleType
+from ..models.order_model import order, order_item
+from ..models.product_model import product
+from ..models.sales_model import seller_product_sales, seller_sales, seller_sales_reconcile
+from ..schemas.responses.custom_responses import INVALID_DATE_RANGE, SALES_MERCHANT_ONLY
+from ...utils.config import settings
+from ...utils.metrics import REGISTRY
+from ...utils.security import AuthContext
+
+logger = logging.getLogger(__name__)
+
+# Counters summed over a range of days; each order is counted on one day only.
+SALES_COUNTERS = [
+    "orders", "units", "revenue", "completed_orders", "completed_revenue", "canceled_orders", "canceled_revenue",
+]
+
+# Adds one order's line items to (or, with negative signs, takes them off) its
+# sellers' aggregates for the day it was placed. `placed` moves the order in or
+# out of the not-canceled counters, `completed` and `canceled` in or out of theirs.
+# Rows are upserted in seller and product order so concurrent orders cannot deadlock.
+APPLY_ORDER_SQL = sqlalchemy.text("""
+    WITH signs AS (
+        SELECT CAST(:placed AS integer) AS placed, CAST(:completed AS integer) AS completed,
+               CAST(:canceled AS integer) AS canceled
+    ), lines AS (
+        SELECT products.user_id AS seller_id, CAST(orders.created_at AS date) AS day, order_items.product_id,
+               order_items.quantity, order_items.quantity * order_items.unit_price AS revenue
+        FROM orders
+        JOIN order_items ON order_items.order_id = orders.id
+        JOIN products ON products.id = order_items.product_id
+        WHERE orders.id = :order_id
+    ), by_product AS (
+        INSERT INTO seller_product_sales AS sales (seller_id, day, product_id, units, revenue)
+        SELECT seller_id, day, product_id, signs.placed * quantity, signs.placed * revenue
+        FROM lines, signs
+        WHERE signs.placed <> 0
+        ORDER BY seller_id, product_id
+        ON CONFLICT (seller_id, day, product_id) DO UPDATE
+            SET units = sales.units + excluded.units, revenue = sales.revenue + excluded.revenue
+    )
+    INSERT INTO seller_sales AS sales (seller_id, day, orders, units, revenue, completed_orders,
+                                       completed_revenue, canceled_orders, canceled_revenue)
+    SELECT seller_id, day, signs.placed, signs.placed * sum(quantity), signs.placed * sum(revenue),
+           signs.completed, signs.completed * sum(revenue), signs.canceled, signs.canceled * sum(revenue)
+    FROM lines, signs
+    GROUP BY seller_id, day, signs.placed, signs.completed, signs.canceled
+    ORDER BY seller_id
+    ON CONFLICT (seller_id, day) DO UPDATE SET
+        orders = sales.orders + excluded.orders,
+        units = sales.units + excluded.units,
+        revenue = sales.revenue + excluded.revenue,
+        completed_orders = sales.completed_orders + excluded.completed_orders,
+        completed_revenue = sales.completed_revenue + excluded.completed_revenue,
+        canceled_orders = sales.canceled_orders + excluded.canceled_orders,
+        canceled_revenue = sales.canceled_revenue + excluded.canceled_revenue
+""")
+
+# Any number; keeps two rebuilds from running at once.
+RECONCILE_LOCK_ID = 720231
+
+
+class ReconcilerStats:
+    """Counters of the periodic sales reconciler in this worker."""
+
+    def __init__(self):
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_duration_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "reconcile_runs_total": self.runs,
+            "reconcile_skipped_total": self.skipped,
+            "reconcile_failures_total": self.failures,
+            "reconcile_last_duration_seconds": round(self.last_duration_seconds, 6),
+        }
+
+
+reconciler_stats = ReconcilerStats()
+REGISTRY.add_collector("seller_sales", reconciler_stats.snapshot)
+
+
+def _rebuild_queries(since: Optional[date]):
+    """Aggregates of both tables computed from scratch from orders placed on or after `since`."""
+    not_canceled = order.c.status.is_distinct_from(OrderStatus.cancel)
+    completed = order.c.status == OrderStatus.completed
+    canceled = order.c.status == OrderStatus.cancel
+    revenue = order_item.c.quantity * order_item.c.unit_price
+    day = sqlalchemy.cast(order.c.created_at, sqlalchemy.Date).label("day")
+    lines = order.join(order_item, order_item.c.order_id == order.c.id).join(
+        product, product.c.id == order_item.c.product_id
+    )
+
+    def count_orders(where):
+        return sqlalchemy.func.count(sqlalchemy.distinct(order.c.id)).filter(where)
+
+    def total(value, where):
+        return sqlalchemy.func.coalesce(sqlalchemy.func.sum(value).filter(where), 0)
+
+    daily = sqlalchemy.select(
+        product.c.user_id, day,
+        count_orders(not_canceled), total(order_item.c.quantity, not_canceled), total(revenue, not_canceled),
+        count_orders(completed), total(revenue, completed),
+        count_orders(canceled), total(revenue, canceled),
+    ).select_from(lines).group_by(product.c.user_id, day)
+    by_product = sqlalchemy.select(
+        product.c.user_id, day, order_item.c.product_id,
+        sqlalchemy.func.sum(order_item.c.quantity), sqlalchemy.func.sum(revenue),
+    ).select_from(lines).where(not_canceled).group_by(product.c.user_id, day, order_item.c.product_id)
+    if since is not None:
+        started = datetime.combine(since, datetime.min.time())
+        daily = daily.where(order.c.created_at >= started)
+        by_product = by_product.where(order.c.created_at >= started)
+    return daily, by_product
+
+
+class SalesManager:
+    """This class keeps the per-seller sales aggregates and serves the seller dashboard"""
+
+    @staticmethod
+    async def apply_order(db: AsyncSession, order_id: int, placed: int = 0, completed: int = 0, canceled: int = 0):
+        """
+        Move an order's line items in or out of its sellers' daily aggregates,
+        in the caller's transaction. Signs are +1, -1 or 0 per group of counters:
+        placing an order is placed=1, canceling it placed=-1 and canceled=1.
+        Edits to a pending order take the order off before and add it back after.
+        :param db:
+        :param order_id:
+        :param placed: sign for orders, units, revenue and the per-product rows
+        :param completed: sign for the completed counters
+        :param canceled: sign for the canceled counters
+        :return:
+        """
+        await db.execute(APPLY_ORDER_SQL, {
+            "order_id": order_id, "placed": placed, "completed": completed, "canceled": canceled,
+        })
+
+    @staticmethod
+    async def reconcile(db: AsyncSession, since: Optional[date] = None, min_interval: Optional[float] = None) -> bool:
+        """
+        Rebuild the aggregates of the days from `since` on (all days when None)
+        from orders, repairing any drift from the incremental updates.
+        Order writers are held off for the duration, so none of their changes
+        is lost between reading orders and replacing the aggregates. Only one
+        caller rebuilds at a time; the others return False right away. With
+        `min_interval`, so does a caller that comes less than that many seconds
+        after the last rebuild, by whichever worker.
+        :param db:
+        :param since: first day to rebuild
+        :param min_interval: seconds that must have passed since the last rebuild
+        :return whether this call rebuilt the aggregates:
+        """
+        locked = await db.scalar(sqlalchemy.select(sqlalchemy.func.pg_try_advisory_xact_lock(RECONCILE_LOCK_ID)))
+        if locked and min_interval:
+            # Read under the lock: a rebuild that just committed is seen here.
+            recent = await db.scalar(sqlalchemy.select(seller_sales_reconcile.c.reconciled_at).where(
+                seller_sales_reconcile.c.id == 1,
+                seller_sales_reconcile.c.reconciled_at
+                > sqlalchemy.func.timezone("UTC", sqlalchemy.func.now())
+                - sqlalchemy.func.make_interval(0, 0, 0, 0, 0, 0, float(min_interval)),
+            ))
+            locked = recent is None
+        if not locked:
+            await db.rollback()
+            return False
+        await db.execute(
+            sqlalchemy.select(sqlalchemy.func.set_config("lock_timeout", f"{settings.ORDER_LOCK_TIMEOUT_MS}ms", True))
+        )
+        await db.execute(sqlalchemy.text("LOCK TABLE seller_sales, seller_product_sales IN SHARE ROW EXCLUSIVE MODE"))
+
+        daily, by_product = _rebuild_queries(since)
+        clear_sales, clear_product_sales = seller_sales.delete(), seller_product_sales.delete()
+        if since is not None:
+            clear_sales = clear_sales.where(seller_sales.c.day >= since)
+            clear_product_sales = clear_product_sales.where(seller_product_sales.c.day >= since)
+        await db.execute(clear_sales)
+        await db.execute(clear_product_sales)
+        await db.execute(seller_sales.insert().from_select(["seller_id", "day", *SALES_COUNTERS], daily))
+        await db.execute(seller_product_sales.insert().from_select(
+            ["seller_id", "day", "product_id", "units", "revenue"], by_product
+        ))
+        reconciled = postgresql.insert(seller_sales_reconcile).values(
+            id=1, reconciled_at=sqlalchemy.func.timezone("UTC", sqlalchemy.func.now())
+        )
+        await db.execute(reconciled.on_conflict_do_update(
+            index_elements=[seller_sales_reconcile.c.id], set_={"reconciled_at": reconciled.excluded.reconciled_at}
+        ))
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def seller_dashboard(
+        db: AsyncSession,
+        auth: AuthContext,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        top: int = 5,
+    ) -> dict:
+        """
+        The caller's sales per day between `start` and `end` (inclusive), their
+        totals and the best selling products by revenue. Reads one aggregate row
+        per day and per product sold, never the orders themselves.
+        :param db:
+        :param auth: the calling merchant
+        :param start: defaults to SELLER_DASHBOARD_DAYS before `end`
+        :param end: defaults to today (UTC)
+        :param top: number of top products
+        :return:
+        """
+        if auth.role != RoleType.merchant.value:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=SALES_MERCHANT_ONLY)
+        end = end or datetime.utcnow().date()
+        start = start or end - timedelta(days=settings.SELLER_DASHBOARD_DAYS - 1)
+        if start > end or (end - start).days >= settings.SELLER_DASHBOARD_MAX_DAYS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_DATE_RANGE)
+
+        result = await db.execute(
+            sqlalchemy.select(seller_sales.c.day, *(seller_sales.c[name] for name in SALES_COUNTERS))
+            .where(seller_sales.c.seller_id == auth.user_id, seller_sales.c.day.between(start, end))
+            .order_by(seller_sales.c.day)
+        )
+        found = {row["day"]: dict(row) for row in result.mappings()}
+        # Every day of the range, days without sales as zeros.
+        days = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            days.append(found.get(day) or {"day": day, **dict.fromkeys(SALES_COUNTERS, 0)})
+        totals = {name: sum(day[name] for day in days) for name in SALES_COUNTERS}
+
+        revenue = sqlalchemy.func.sum(seller_product_sales.c.revenue).label("revenue")
+        top_products = sqlalchemy.select(
+            seller_product_sales.c.product_id,
+            sqlalchemy.func.sum(seller_product_sales.c.units).label("units"),
+            revenue,
+        ).where(
+            seller_product_sales.c.seller_id == auth.user_id, seller_product_sales.c.day.between(start, end)
+        ).group_by(seller_product_sales.c.product_id).having(
+            sqlalchemy.func.sum(seller_product_sales.c.units) > 0
+        ).order_by(revenue.desc()).limit(top).subquery("top_products")
+        result = await db.execute(
+            sqlalchemy.select(top_products, product.c.name)
+            .join(product, product.c.id == top_products.c.product_id)
+            .order_by(top_products.c.revenue.desc())
+        )
+        return {
+            "start": start, "end": end, "totals": totals, "days": days,
+            "top_products": [dict(row) for row in result.mappings()],
+        }
+
+
+async def reconcile_sales_periodically(session_factory, interval: float, days: int):
+    """
+    Rebuild the last `days` days of sales aggregates every `interval` seconds,
+    for the life of the worker. Started from the app's lifespan in every worker;
+    a worker skips its turn when another rebuilt within the interval, so the
+    aggregates are rebuilt about once per interval whatever the worker count.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        start = time.perf_counter()
+        try:
+            async with session_factory() as db:
+                rebuilt = await SalesManager.reconcile(
+                    db, since=datetime.utcnow().date() - timedelta(days=days - 1), min_interval=interval
+                )
+        except Exception as e:
+            reconciler_stats.failures += 1
+            logger.error("Reconciling seller sales failed: %s", e)
+            continue
+        if rebuilt:
+            reconciler_stats.runs += 1
+            reconciler_stats.last_duration_seconds = time.perf_counter() - start
+        else:
+            reconciler_stats.skipped += 1
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+
+from typing import Optional
+
+import sqlalchemy
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .product_manager import PRODUCT_COLUMNS, product_cache
+from ..models.enums import ProductStatus, StoreStatus
+from ..models.product_model import product
+from ..models.store import store
+from ..schemas.responses.custom_responses import STORE_NOT_FOUND
+from ...utils.pagination import DEFAULT_PAGE_SIZE, decode_id_cursor, encode_cursor, encode_id_cursor
+
+
+def _product_count():
+    # Correlated to the store row; counted from ix_products_user_store_id_status_created_at_id.
+    return (
+        sqlalchemy.select(sqlalchemy.func.count())
+        .where(product.c.user_store_id == store.c.id)
+        .scalar_subquery()
+        .label("product_count")
+    )
+
+
+class StoreManager:
+    """This class handles the store directory and store pages"""
+
+    @staticmethod
+    async def list_stores(db: AsyncSession, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        List active stores newest first, walked with a keyset on id.
+        Product counts come from the same statement, not one query per store.
+        :param db:
+        :param cursor: next_cursor of the previous page
+        :param limit: page size
+        :return a page of stores and the cursor of the next page:
+        """
+        async def load():
+            query = sqlalchemy.select(*store.c, _product_count()).where(store.c.status == StoreStatus.active)
+            if cursor:
+                query = query.where(store.c.id < decode_id_cursor(cursor))
+            result = await db.execute(query.order_by(store.c.id.desc()).limit(limit + 1))
+            rows = result.mappings().all()
+            items = [dict(row) for row in rows[:limit]]
+            next_cursor = encode_id_cursor(items[-1]["id"]) if len(rows) > limit else None
+            return {"items": items, "next_cursor": next_cursor}
+
+        # Product writes bump the cache generation, which keeps product counts fresh.
+        key = await product_cache.versioned_key("stores", limit, cursor)
+        return await product_cache.get_or_load(key, load)
+
+    @staticmethod
+    async def get_store(
+        db: AsyncSession,
+        store_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        product_status: Optional[ProductStatus] = None,
+    ) -> dict:
+        """
+        Get an active store together with the first page of its products, in
+        one statement: the store row is joined laterally to its newest products.
+        :param db:
+        :param store_id:
+        :param limit: products per page
+        :param product_status: only list products in this status
+        :return the store, its products and the cursor of the next product page:
+        """
+        async def load():
+            found = (
+                sqlalchemy.select(*store.c, _product_count())
+                .where(store.c.id == store_id, store.c.status == StoreStatus.active)
+                .subquery("found")
+            )
+            products = sqlalchemy.select(*PRODUCT_COLUMNS).where(product.c.user_store_id == found.c.id)
+            if product_status is not None:
+                products = products.where(product.c.status == product_status)
+            products = (
+                products.order_by(product.c.created_at.desc(), product.c.id.desc())
+                .limit(limit + 1)
+                .lateral("store_products")
+            )
+            result = await db.execute(
+                sqlalchemy.select(
+                    *(column.label(f"store_{column.name}") for column in found.c),
+                    *products.c,
+                )
+                .select_from(found.outerjoin(products, sqlalchemy.true()))
+                .order_by(products.c.created_at.desc(), products.c.id.desc())
+            )
+            rows = result.mappings().all()
+            if not rows:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=STORE_NOT_FOUND)
+
+            found_store = {column.name: rows[0][f"store_{column.name}"] for column in found.c}
+            # A store without products still comes back as one row, with NULL product columns.
+            items = [
+                {column.name: row[column.name] for column in products.c}
+                for row in rows[:limit] if row["id"] is not None
+            ]
+            next_cursor = None
+            if len(rows) > limit:
+                next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+            return {**found_store, "products": items, "next_cursor": next_cursor}
+
+        key = await product_cache.versioned_key("store", store_id, limit, product_status)
+        return await product_cache.get_or_load(key, load)
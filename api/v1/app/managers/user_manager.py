@@ -1,19 +1,25 @@
 #!/usr/bin/python3
 
-from ....supabase.supabase_client import supabase
+from ...utils.security import AuthContext
 
 
 class UserManager:
     """This class is going to handle all user related logic"""
 
     @staticmethod
-    async def get_user_profile():
+    async def get_user_profile(auth: AuthContext):
         """
         This helps to get a logged-in user's profile.
+        The profile comes from the caller's verified access token, no Supabase call is made.
+        :param auth:
         :return:
         """
-        response = supabase.auth.get_user()
-        return response
+        return {
+            "id": auth.user_id,
+            "email": auth.email,
+            "phone": auth.phone,
+            "user_metadata": auth.user_metadata,
+        }
 
     @staticmethod
     async def set_up_preference():
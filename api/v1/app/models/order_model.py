@@ -15,6 +15,23 @@ order = sqlalchemy.Table(
     sqlalchemy.Column("amount", sqlalchemy.Float, nullable=False),
     sqlalchemy.Column("created_at", sqlalchemy.DateTime, server_default=sqlalchemy.text("timezone('UTC', now())"), nullable=True),
     sqlalchemy.Column("status", sqlalchemy.Enum(OrderStatus), server_default=OrderStatus.pending.name, nullable=True),
-    sqlalchemy.Column("buyer_id", sqlalchemy.ForeignKey("users.id"), nullable=False)
+    sqlalchemy.Column("buyer_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    sqlalchemy.Index("ix_orders_buyer_id_created_at_id", "buyer_id", "created_at", "id"),
+    # The sales reconciler rebuilds recent days from the orders placed on them.
+    sqlalchemy.Index("ix_orders_created_at", "created_at"),
 )
 
+
+order_item = sqlalchemy.Table(
+    "order_items",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("order_id", sqlalchemy.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False),
+    sqlalchemy.Column("product_id", sqlalchemy.ForeignKey("products.id"), nullable=False),
+    sqlalchemy.Column("quantity", sqlalchemy.Integer, nullable=False),
+    # Price at the time of ordering, later product price changes do not affect the order.
+    sqlalchemy.Column("unit_price", sqlalchemy.Float, nullable=False),
+    # One row per product per order; also the conflict target for appending items.
+    sqlalchemy.Index("ix_order_items_order_id_product_id", "order_id", "product_id", unique=True),
+    sqlalchemy.Index("ix_order_items_product_id", "product_id"),
+)
@@ -2,6 +2,7 @@
 
 
 import sqlalchemy
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from ...database.db import metadata
 from ..models.enums import ProductStatus
@@ -11,17 +12,33 @@ product = sqlalchemy.Table(
     "products",
     metadata,
     sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("name", sqlalchemy.String(255), nullable=False),
     sqlalchemy.Column("description", sqlalchemy.Text),
     sqlalchemy.Column("photo_url", sqlalchemy.String(250), nullable=False),
     sqlalchemy.Column("quantity", sqlalchemy.Integer, nullable=False),
     sqlalchemy.Column("amount", sqlalchemy.Float, nullable=False),
     sqlalchemy.Column("category", sqlalchemy.Text),
     sqlalchemy.Column("created_at", sqlalchemy.DateTime, server_default=sqlalchemy.text("timezone('UTC', now())"),
-                      nullable=True),
+                      nullable=False),
     sqlalchemy.Column("updated_at", sqlalchemy.DateTime, onupdate=sqlalchemy.text("timezone('UTC', now())"),
                       nullable=True),
     sqlalchemy.Column("status", sqlalchemy.Enum(ProductStatus), server_default=ProductStatus.available.name, nullable=False),
     sqlalchemy.Column("user_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
-    sqlalchemy.Column("user_store_id", sqlalchemy.ForeignKey("stores.id"), nullable=False)
+    sqlalchemy.Column("user_store_id", sqlalchemy.ForeignKey("stores.id"), nullable=False),
+    # Merchant's own stock keeping unit, unique within a store; bulk imports upsert on it.
+    sqlalchemy.Column("sku", sqlalchemy.String(64), nullable=True),
+    # Maintained by Postgres from name and description, used for full-text search.
+    sqlalchemy.Column("search_vector", TSVECTOR, sqlalchemy.Computed(
+        "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))", persisted=True)),
+    # Keyset pagination walks (created_at, id); the filtered variants keep filtered pages index-only.
+    sqlalchemy.Index("ix_products_created_at_id", "created_at", "id"),
+    sqlalchemy.Index("ix_products_category_created_at_id", "category", "created_at", "id"),
+    sqlalchemy.Index("ix_products_status_created_at_id", "status", "created_at", "id"),
+    # A store's page: its products by status, newest first, without touching other stores.
+    sqlalchemy.Index("ix_products_user_store_id_status_created_at_id", "user_store_id", "status", "created_at", "id"),
+    sqlalchemy.Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+    sqlalchemy.Index("ix_products_user_store_id_sku", "user_store_id", "sku", unique=True,
+                     postgresql_where=sqlalchemy.text("sku IS NOT NULL")),
+    # Incremental exports walk products changed since a point in time.
+    sqlalchemy.Index("ix_products_changed_at_id", sqlalchemy.text("coalesce(updated_at, created_at)"), "id"),
 )
-
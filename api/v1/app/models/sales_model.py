@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+
+
+import sqlalchemy
+
+from ...database.db import metadata
+
+
+# Sales of a seller's products per day, by the day the order was placed. Kept
+# current by SalesManager.apply_order as orders are placed, edited, completed,
+# canceled and deleted, and periodically rebuilt from orders by SalesManager.reconcile.
+# orders, units and revenue count every order that is not canceled.
+seller_sales = sqlalchemy.Table(
+    "seller_sales",
+    metadata,
+    sqlalchemy.Column("seller_id", sqlalchemy.ForeignKey("users.id"), primary_key=True),
+    sqlalchemy.Column("day", sqlalchemy.Date, primary_key=True),
+    sqlalchemy.Column("orders", sqlalchemy.Integer, server_default="0", nullable=False),
+    sqlalchemy.Column("units", sqlalchemy.Integer, server_default="0", nullable=False),
+    sqlalchemy.Column("revenue", sqlalchemy.Float, server_default="0", nullable=False),
+    sqlalchemy.Column("completed_orders", sqlalchemy.Integer, server_default="0", nullable=False),
+    sqlalchemy.Column("completed_revenue", sqlalchemy.Float, server_default="0", nullable=False),
+    sqlalchemy.Column("canceled_orders", sqlalchemy.Integer, server_default="0", nullable=False),
+    sqlalchemy.Column("canceled_revenue", sqlalchemy.Float, server_default="0", nullable=False),
+)
+
+
+# Units and revenue per product per day, for a seller's top products; orders that are not canceled.
+# Deleted with their product: the rows outlive the orders they were counted from.
+seller_product_sales = sqlalchemy.Table(
+    "seller_product_sales",
+    metadata,
+    sqlalchemy.Column("seller_id", sqlalchemy.ForeignKey("users.id"), primary_key=True),
+    sqlalchemy.Column("day", sqlalchemy.Date, primary_key=True),
+    sqlalchemy.Column("product_id", sqlalchemy.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+    sqlalchemy.Column("units", sqlalchemy.Integer, server_default="0", nullable=False),
+    sqlalchemy.Column("revenue", sqlalchemy.Float, server_default="0", nullable=False),
+)
+
+
+# One row (id 1): when the aggregates were last rebuilt, so that of all the
+# workers running the periodic reconciler only one rebuilds per interval.
+seller_sales_reconcile = sqlalchemy.Table(
+    "seller_sales_reconcile",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("reconciled_at", sqlalchemy.DateTime, nullable=False),
+)
@@ -17,6 +17,8 @@ store = sqlalchemy.Table(
     sqlalchemy.Column("updated_at", sqlalchemy.DateTime, onupdate=sqlalchemy.text("timezone('UTC', now())"),
                       nullable=True),
     sqlalchemy.Column("status", sqlalchemy.Enum(StoreStatus), server_default=StoreStatus.inactive.name, nullable=False),
-    sqlalchemy.Column("owner_id", sqlalchemy.ForeignKey("users.id"), nullable=False)
+    sqlalchemy.Column("owner_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    # The store directory walks active stores newest first by id.
+    sqlalchemy.Index("ix_stores_status_id", "status", "id"),
 )
 
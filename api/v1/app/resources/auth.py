@@ -1,14 +1,14 @@
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import EmailStr, BaseModel
-from typing import Any
+from typing import Any, Optional
 import logging
 from ..managers.auth import AuthManager
 from ..schemas.requests.user import UserRegister, SignInUser
-from ....supabase.supabase_client import supabase
+from ...utils.rate_limit import reset_password_limiter, sign_in_limiter, sign_up_limiter
+from ...utils.security import AuthContext, get_auth_context
 
 router = APIRouter(prefix="/api", tags=["User Authentication"])
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Pydantic Model for email input (used in sign-in OTP endpoint)
@@ -16,10 +16,11 @@ class EmailInput(BaseModel):
     email: EmailStr
 
 @router.post("/user", status_code=status.HTTP_201_CREATED, summary="Create a new user")
-async def create_user(user_details: UserRegister) -> dict:
+async def create_user(request: Request, user_details: UserRegister) -> dict:
     """
     Create a new user in Supabase Auth.
     """
+    await sign_up_limiter.check(request, email=user_details.email)
     try:
         result = await AuthManager.create_user(user_details.model_dump())
         return result
@@ -28,14 +29,18 @@ async def create_user(user_details: UserRegister) -> dict:
 
 @router.patch("/user/update", status_code=status.HTTP_200_OK, summary="Fetch or update user profile")
 async def update_user_profile(
-    user_id: str,
-    request: Request
+    request: Request,
+    user_id: Optional[str] = None,
+    auth: AuthContext = Depends(get_auth_context)
 ) -> Any:
     """
     Fetch or update the authenticated user's profile.
     - Fetches current user data when called without a body.
     - Updates user data when a body with modified fields is provided.
+    The user is taken from the bearer token; `user_id`, if sent, must match it.
     """
+    if user_id is not None and user_id != auth.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot update another user's profile.")
     try:
         # Try to read the request body, fallback to None if empty
         try:
@@ -44,10 +49,12 @@ async def update_user_profile(
             update_data = None  # No data provided in the request
 
         # Pass the data to the service for fetching/updating
-        result = await AuthManager.get_and_update_user(user_id=user_id, data_to_update=update_data)
+        result = await AuthManager.get_and_update_user(auth=auth, data_to_update=update_data)
         return result
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -56,18 +63,20 @@ async def update_user_profile(
     status_code=status.HTTP_200_OK,
     summary="Sign in using email and password",
 )
-async def sign_in_user_with_password_email(user_details: SignInUser) -> Any:
+async def sign_in_user_with_password_email(request: Request, user_details: SignInUser) -> Any:
     """
     Authenticate a user using email and password.
     """
+    await sign_in_limiter.check(request, email=user_details.email)
     try:
         return await AuthManager.sign_in_user_with_passwd_and_email(user_details.model_dump())
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 @router.post("/user/reset-password", status_code=status.HTTP_200_OK, summary="Reset user password")
-async def reset_password(email: EmailStr) -> Any:
+async def reset_password(request: Request, email: EmailStr) -> Any:
     """
     Send a password reset email to the user.
     """
+    await reset_password_limiter.check(request, email=email)
     return await AuthManager.reset_password(email)
@@ -1,66 +1,119 @@
 #!/usr/bin/python3
 
 
-from fastapi import APIRouter
-from typing import List
-from ..schemas.requests.order import OrderRead
+from typing import List, Optional
+
+from fastapi import APIRouter, Body, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas.requests.order import OrderCreate, OrderItemCreate, OrderRead
+from ..schemas.responses.order import OrderPage
 from ..managers.order_manager import OrderManager
+from ...database.db import get_async_db
+from ...utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ...utils.security import AuthContext, get_auth_context
 
 
-router = APIRouter(prefix="", tags=["Orders Resource"])
+router = APIRouter(prefix="/orders", tags=["Orders Resource"])
 
 
-@router.post("/", response_model=OrderRead)
-async def create_order(order):
+@router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED)
+async def create_order(
+    order: OrderCreate,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """This sends the order data sent from the frontend to the OrderManager for processing and validations"""
-    return await OrderManager.create_order(order)
+    return await OrderManager.create_order(db, auth, order)
 
 
 # Get Order
 @router.get("/{order_id}", response_model=OrderRead)
-async def get_order(order_id):
+async def get_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """Retrieve an order by its ID."""
-    return await OrderManager.get_order(order_id)
+    return await OrderManager.get_order(db, auth, order_id)
 
 
 # List Orders
-@router.get("/", response_model=List[OrderRead])
-async def list_orders():
-    """List all orders."""
-    return await OrderManager.list_orders()
+@router.get("/", response_model=OrderPage)
+async def list_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """List the caller's orders."""
+    return await OrderManager.list_orders(db, auth, cursor=cursor, limit=limit)
 
 
 # Append Items to Order
-@router.patch("/{order_id}/items/append")
-async def append_order_items(order_id, items_to_add):
-    """Append items to the order's items list and recalculate total price."""
-    return await OrderManager.append_order_items(order_id, items_to_add)
+@router.patch("/{order_id}/items/append", response_model=OrderRead)
+async def append_order_items(
+    order_id: int,
+    items_to_add: List[OrderItemCreate] = Body(..., min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """Append items to the order's items list and update the total price."""
+    return await OrderManager.append_order_items(db, auth, order_id, items_to_add)
 
 
 # Update Specific Item in Order
-@router.patch("/{order_id}/items/update")
-async def update_order_item(order_id, old_item_name, new_item):
-    """Update a specific item in the order's items list and recalculate total price."""
-    return await OrderManager.update_order_item(order_id, old_item_name, new_item)
+@router.patch("/{order_id}/items/update", response_model=OrderRead)
+async def update_order_item(
+    order_id: int,
+    new_item: OrderItemCreate,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """Change the quantity of a product on the order and update the total price."""
+    return await OrderManager.update_order_item(db, auth, order_id, new_item)
 
 
 # Remove Specific Item from Order
-@router.patch("/{order_id}/items/remove")
-async def remove_order_item(order_id, item_name):
-    """Remove a specific item from the order's items list and recalculate total price."""
-    return await OrderManager.remove_order_item(order_id, item_name)
+@router.patch("/{order_id}/items/remove", response_model=OrderRead)
+async def remove_order_item(
+    order_id: int,
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """Remove a product from the order and update the total price."""
+    return await OrderManager.remove_order_item(db, auth, order_id, product_id)
 
 
 # Cancel Order
-@router.put("/{order_id}/cancel")
-async def cancel_order(order_id):
+@router.put("/{order_id}/cancel", response_model=OrderRead)
+async def cancel_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """Cancel an order by updating its status."""
-    return await OrderManager.cancel_order(order_id)
+    return await OrderManager.cancel_order(db, auth, order_id)
+
+
+# Complete Order
+@router.put("/{order_id}/complete", response_model=OrderRead)
+async def complete_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """Confirm the order was received, which completes it."""
+    return await OrderManager.complete_order(db, auth, order_id)
 
 
 # Delete Order
-@router.delete("/{order_id}")
-async def delete_order(order_id):
+@router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """Delete an order by its ID."""
-    return await OrderManager.delete_order(order_id)
-
+    await OrderManager.delete_order(db, auth, order_id)
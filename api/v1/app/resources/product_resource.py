@@ -1,44 +1,167 @@
 #!/usr/bin/python3
 
 
-from typing import List
-
-from fastapi import APIRouter, status
-
-from ..managers.product_manager import ProductManager
-from ..schemas.requests.product import ProductRead
-
-router = APIRouter()
-
-
-@router.get("/products", response_model=List[ProductRead])
-async def list_products():
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..managers.product_manager import EXPORT_COLUMNS, ProductManager
+from ..models.enums import ProductStatus
+from ..schemas.requests.product import ProductCreate, ProductRead, ProductUpdate
+from ..schemas.responses.custom_responses import EXPORT_INTERRUPTED, UNSUPPORTED_IMPORT_FORMAT
+from ..schemas.responses.product import ProductImportReport, ProductPage
+from ...database.db import AsyncSessionLocal, get_async_db
+from ...utils.etag import not_modified, page_etag, row_etag
+from ...utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ...utils.security import AuthContext, get_auth_context
+from ...utils.streams import FORMAT_CONTENT_TYPES, READERS, WRITERS, NdjsonWriter, format_for
+
+router = APIRouter(tags=["Products Resource"])
+logger = logging.getLogger(__name__)
+
+
+async def _export_stream(writer, since: Optional[datetime]):
+    """
+    Encode each batch from the export cursor and hand it to the client. The
+    response only pulls the next batch once the previous one was sent, so a
+    slow client slows the cursor down instead of filling memory.
+    """
+    # Dependencies are closed before a streamed body is sent, so the export keeps its own session.
+    async with AsyncSessionLocal() as db:
+        yield writer.header()
+        try:
+            async for rows in ProductManager.export_products(db, since=since):
+                yield writer.encode(rows)
+        except Exception:
+            logger.exception("Exporting products failed")
+            if not isinstance(writer, NdjsonWriter):
+                # Cut the response short, a CSV has no place for the error.
+                raise
+            # Headers are already sent, so the failure is reported in-band as the last line.
+            yield (json.dumps({"error": EXPORT_INTERRUPTED}) + "\n").encode()
+
+
+@router.get("/products", response_model=ProductPage)
+async def list_products(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    category: Optional[str] = None,
+    product_status: Optional[ProductStatus] = Query(None, alias="status"),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    store_id: Optional[int] = None,
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over name and description."),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     List products with pagination, filtering, and search.
+    Pass the returned `next_cursor` back as `cursor` to get the next page.
+    Send the page's ETag back in If-None-Match to get a 304 while it is unchanged.
+    """
+    page = await ProductManager.list_products(
+        db,
+        limit=limit,
+        cursor=cursor,
+        category=category,
+        product_status=product_status,
+        min_price=min_price,
+        max_price=max_price,
+        store_id=store_id,
+        q=q,
+    )
+    etag = page_etag(
+        page["items"], cursor, page["next_cursor"],
+        limit, category, product_status, min_price, max_price, store_id, q,
+    )
+    return not_modified(request, response, etag) or page
+
+
+@router.get("/products/export")
+async def export_products(
+    export_format: str = Query(
+        "ndjson", alias="format", pattern=f"^({'|'.join(WRITERS)})$", description="ndjson or csv.",
+    ),
+    since: Optional[datetime] = Query(None, description="Only products created or updated after this time."),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """
+    Stream every product with its store as NDJSON or CSV, for feeds and search indexers.
+    For an incremental export pass the latest `updated_at` (or `created_at`) seen
+    by the previous one as `since`; rows then come oldest change first. Products
+    changed shortly before `since` are sent again, so upsert them by id.
     """
-    return await ProductManager.list_products()
+    writer = WRITERS[export_format]([column.name for column in EXPORT_COLUMNS])
+    return StreamingResponse(_export_stream(writer, since), media_type=writer.media_type)
 
 
 @router.get("/products/{product_id}", response_model=ProductRead)
-async def get_product(product_id):
-    """Get details of a single product."""
-    return await ProductManager.get_product(product_id)
+async def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get details of a single product. Honours If-None-Match with a 304."""
+    found = await ProductManager.get_product(db, product_id)
+    return not_modified(request, response, row_etag(found)) or found
 
 
 @router.post("/products", response_model=ProductRead, status_code=status.HTTP_201_CREATED)
-async def create_product(product_data):
+async def create_product(
+    product_data: ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """Create a new product (Seller only)."""
-    return ProductManager.create_product(product_data)
+    return await ProductManager.create_product(db, auth, product_data)
+
+
+@router.post("/products/import", response_model=ProductImportReport)
+async def import_products(
+    request: Request,
+    import_format: Optional[str] = Query(
+        None, alias="format", pattern=f"^({'|'.join(FORMAT_CONTENT_TYPES)})$",
+        description="csv or ndjson; taken from Content-Type when left out.",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """
+    Create or update products in bulk from a CSV (with a header row) or NDJSON upload (Seller only).
+    Each row takes the fields of a new product. A row whose sku already exists in its
+    store updates that product. The upload is read as it arrives; invalid rows are
+    skipped and listed by line number in the report.
+    """
+    import_format = import_format or format_for(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=UNSUPPORTED_IMPORT_FORMAT)
+    return await ProductManager.import_products(db, auth, READERS[import_format](request.stream()))
 
 
 @router.put("/products/{product_id}", response_model=ProductRead)
-async def update_product(product_id, product_data):
+async def update_product(
+    product_id: int,
+    product_data: ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """Update product details (Seller only)."""
-    return await ProductManager.update_product(product_id, product_data)
+    return await ProductManager.update_product(db, auth, product_id, product_data)
 
 
 @router.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_product(product_id):
+async def delete_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
     """Delete a product (Seller only)."""
-    return await ProductManager.delete_product(product_id)
-
+    await ProductManager.delete_product(db, auth, product_id)
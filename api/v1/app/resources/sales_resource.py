@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..managers.sales_manager import SalesManager
+from ..schemas.responses.sales import SellerDashboard
+from ...database.db import get_async_db
+from ...utils.security import AuthContext, get_auth_context
+
+
+router = APIRouter(prefix="/api/users", tags=["Seller Dashboard"])
+
+
+@router.get("/seller-dashboard", response_model=SellerDashboard)
+async def seller_dashboard(
+    start: Optional[date] = Query(None, description="First day, defaults to 30 days before `end`."),
+    end: Optional[date] = Query(None, description="Last day, defaults to today (UTC)."),
+    top: int = Query(5, ge=1, le=50, description="Number of best selling products."),
+    db: AsyncSession = Depends(get_async_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """The calling seller's sales per day, their totals and top products by revenue (Seller only)."""
+    return await SalesManager.seller_dashboard(db, auth, start=start, end=end, top=top)
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..managers.store_manager import StoreManager
+from ..models.enums import ProductStatus
+from ..schemas.responses.store import StoreDetail, StorePage
+from ...database.db import get_async_db
+from ...utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter(tags=["Stores Resource"])
+
+
+@router.get("/stores", response_model=StorePage)
+async def list_stores(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List active stores, newest first, with their product counts.
+    Pass the returned `next_cursor` back as `cursor` to get the next page.
+    """
+    return await StoreManager.list_stores(db, cursor=cursor, limit=limit)
+
+
+@router.get("/stores/{store_id}", response_model=StoreDetail)
+async def get_store(
+    store_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    product_status: Optional[ProductStatus] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get an active store with the first page of its products.
+    Further pages come from /products with `store_id`, the same `status`
+    and the returned `next_cursor`.
+    """
+    return await StoreManager.get_store(db, store_id, limit=limit, product_status=product_status)
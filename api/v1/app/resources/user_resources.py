@@ -1,18 +1,19 @@
 #!/usr/bin/python3
 
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from ..managers.user_manager import UserManager
+from ...utils.security import AuthContext, get_auth_context
 
 
 router = APIRouter(prefix="/user", tags=["User Related Endpoints"])
 
 
 @router.get("/user/me")
-async def get_user_profile():
+async def get_user_profile(auth: AuthContext = Depends(get_auth_context)):
 
-    return await UserManager.get_user_profile()
+    return await UserManager.get_user_profile(auth)
 
 
 
@@ -2,12 +2,17 @@
 
 
 from fastapi import APIRouter
-from ..resources import order_resource, product_resource, user_resources, auth
-from ..admin.resources import admin
+from ..resources import order_resource, product_resource, sales_resource, store_resource, user_resources, auth
+from ..admin.resources import admin, audit
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router)
 api_router.include_router(user_resources.router)
+api_router.include_router(product_resource.router)
+api_router.include_router(store_resource.router)
+api_router.include_router(order_resource.router)
+api_router.include_router(sales_resource.router)
 api_router.include_router(admin.router)
+api_router.include_router(audit.router)
 
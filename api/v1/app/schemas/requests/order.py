@@ -1,28 +1,38 @@
 #!/usr/bin/python3
 
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 
 from ...models.order_model import OrderStatus
 
 
 # Pydantic schemas for request and response
-class Item(BaseModel):
-    name: str
-    price: float
+class OrderItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
 
 
 class OrderCreate(BaseModel):
-    customer_id: UUID
-    items: List[Item]  # List of items with name and price
+    description: Optional[str] = None
+    # Prices are looked up server-side, the client only says what and how many.
+    items: List[OrderItemCreate] = Field(..., min_length=1, max_length=100)
+
+
+class OrderItemRead(BaseModel):
+    product_id: int
+    quantity: int
+    unit_price: float
 
 
 class OrderRead(BaseModel):
-    order_id: UUID
-    customer_id: UUID
-    items: List[Item]
-    total_price: float
+    id: int
+    buyer_id: UUID
+    description: Optional[str] = None
+    items: List[OrderItemRead]
+    amount: float
     status: OrderStatus
+    created_at: datetime
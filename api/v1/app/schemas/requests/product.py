@@ -2,9 +2,12 @@
 
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional
 from uuid import UUID
 from decimal import Decimal
+from datetime import datetime
+
+from ...models.enums import ProductStatus
 
 
 class ProductBase(BaseModel):
@@ -13,11 +16,13 @@ class ProductBase(BaseModel):
     price: Decimal = Field(..., ge=0)
     quantity: int = Field(..., ge=0)
     category: Optional[str] = Field(None, max_length=100)
-    images: Optional[List[str]] = []
+    photo_url: str = Field(..., max_length=250)
+    sku: Optional[str] = Field(None, min_length=1, max_length=64)
 
 
 class ProductCreate(ProductBase):
-    pass
+    user_store_id: int
+    status: ProductStatus = ProductStatus.available
 
 
 class ProductUpdate(BaseModel):
@@ -26,13 +31,17 @@ class ProductUpdate(BaseModel):
     price: Optional[Decimal] = Field(None, ge=0)
     quantity: Optional[int] = Field(None, ge=0)
     category: Optional[str] = Field(None, max_length=100)
-    images: Optional[List[str]] = None
+    photo_url: Optional[str] = Field(None, max_length=250)
+    sku: Optional[str] = Field(None, min_length=1, max_length=64)
+    status: Optional[ProductStatus] = None
 
 
 class ProductRead(ProductBase):
-    id: UUID
-    seller_id: UUID
-    is_active: bool
-
-    class Config:
-        from_attribute = True
+    id: int
+    user_id: UUID
+    user_store_id: int
+    status: ProductStatus
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
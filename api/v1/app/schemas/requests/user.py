@@ -28,12 +28,19 @@ class UserRegister(BaseModel):
     last_name: str = Field(..., description="User's last name.")
     location: str = Field(..., description="User's location.")
     phone: Optional[str] = Field(None, description="Optional phone number.")
-    role: str = Field(default=RoleType.buyer.name, description="User role. Defaults to 'buyer'.")
+    role: RoleType = Field(default=RoleType.buyer, description="User role, buyer or merchant. Defaults to 'buyer'.")
 
     @field_validator("hashed_password")
     def validate_password_strength(cls, value):
         return validate_password(value)
 
+    @field_validator("role")
+    def validate_self_assignable_role(cls, value):
+        # Admins are made by an admin, never at sign-up.
+        if value not in (RoleType.buyer, RoleType.merchant):
+            raise ValueError("Role must be buyer or merchant.")
+        return value
+
 
 # Update User Schema
 class UpdateUser(BaseModel):
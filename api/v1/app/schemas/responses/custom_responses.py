@@ -3,4 +3,23 @@
 
 ORDER_NOT_FOUND = "Order not found."
 PRODUCT_NOT_FOUND = "Product not found."
+PRODUCT_ON_ORDERS = "Products that are on orders cannot be deleted, mark them unavailable instead."
 UNEXPECTED_ERROR = "Something unexpected happened."
+INVALID_CURSOR = "Invalid pagination cursor."
+MERCHANT_ONLY = "Only merchants can manage products."
+STORE_NOT_OWNED = "Store not found or not owned by you."
+STORE_NOT_FOUND = "Store not found."
+DUPLICATE_SKU = "A product with this SKU already exists in the store."
+UNSUPPORTED_IMPORT_FORMAT = "Send the catalog as text/csv or application/x-ndjson."
+EXPORT_INTERRUPTED = "The export stopped before the last product, please retry."
+INSUFFICIENT_STOCK = "Not enough stock for one or more products."
+PRODUCT_UNAVAILABLE = "One or more products are unavailable."
+ORDER_CONTENDED = "These products are in high demand, please retry."
+ORDER_NOT_CANCELABLE = "Only pending or processing orders can be canceled."
+ORDER_NOT_DELETABLE = "Only canceled orders can be deleted."
+ORDER_NOT_EDITABLE = "Only pending orders can be changed."
+ORDER_ITEM_NOT_FOUND = "Product is not on this order."
+ORDER_NOT_COMPLETABLE = "Only pending or processing orders can be completed."
+SALES_MERCHANT_ONLY = "Only merchants have a sales dashboard."
+INVALID_DATE_RANGE = "The start date must not be after the end date, nor the range too long."
+PASSWORD_HASHING_BUSY = "Too many sign-ins in progress, please retry."
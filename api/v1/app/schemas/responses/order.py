@@ -1 +1,13 @@
 #!/usr/bin/python3
+
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from ..requests.order import OrderRead
+
+
+class OrderPage(BaseModel):
+    items: List[OrderRead]
+    next_cursor: Optional[str] = None
@@ -1 +1,29 @@
 #!/usr/bin/python3
+
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from ..requests.product import ProductRead
+
+
+class ProductPage(BaseModel):
+    items: List[ProductRead]
+    next_cursor: Optional[str] = None
+
+
+class ProductImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class ProductImportReport(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    # rows replaced by a later row of the same upload with the same store and sku
+    superseded: int
+    failed: int
+    errors: List[ProductImportError]
+    errors_truncated: bool = False
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+
+
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel
+
+
+class SalesCounters(BaseModel):
+    orders: int
+    units: int
+    revenue: float
+    completed_orders: int
+    completed_revenue: float
+    canceled_orders: int
+    canceled_revenue: float
+
+
+class DailySales(SalesCounters):
+    day: date
+
+
+class TopProduct(BaseModel):
+    product_id: int
+    name: str
+    units: int
+    revenue: float
+
+
+class SellerDashboard(BaseModel):
+    """Orders, units and revenue leave canceled orders out; completed orders are counted in them as well."""
+    start: date
+    end: date
+    totals: SalesCounters
+    days: List[DailySales]
+    top_products: List[TopProduct]
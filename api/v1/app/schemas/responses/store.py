@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+
+
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from ..requests.product import ProductRead
+from ...models.enums import StoreStatus
+
+
+class StoreRead(BaseModel):
+    id: int
+    description: Optional[str] = None
+    photo_url: str
+    amount: float
+    speciality: Optional[str] = None
+    status: StoreStatus
+    owner_id: UUID
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    product_count: int
+
+
+class StorePage(BaseModel):
+    items: List[StoreRead]
+    next_cursor: Optional[str] = None
+
+
+class StoreDetail(StoreRead):
+    """A store with the first page of its products; `next_cursor` continues on /products?store_id={id}."""
+    products: List[ProductRead]
+    next_cursor: Optional[str] = None
@@ -1,25 +1,156 @@
 #!/usr/bin/python3
 
-from sqlalchemy import create_engine, MetaData
+import time
+
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from ..utils.config import settings
-from sqlalchemy.orm import declarative_base, sessionmaker
+from ..utils.metrics import REGISTRY, db_query_duration, record
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 DATABASE_URL = settings.DATABASE_URL
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL
 
-# SQLAlchemy engine
+# SQLAlchemy engine, kept for Alembic and scripts
 engine = create_engine(DATABASE_URL)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the request handlers
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args={
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    },
+)
+
+
+
+class PooledSession(Session):
+    """Sync side of the async sessions; carries the pool wait listeners below."""
+
+
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, expire_on_commit=False, autoflush=False, sync_session_class=PooledSession
+)
+
 # Base for models
 Base = declarative_base()
 metadata = MetaData()
 
+
+class PoolMetrics:
+    """Counters for the async engine's connection pool."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float):
+        self.checkout_wait_seconds_total += seconds
+        self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        pool = async_engine.pool
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "connects_total": self.connects,
+            "checkouts_total": self.checkouts,
+            "checkins_total": self.checkins,
+            "invalidations_total": self.invalidations,
+            "checkout_wait_seconds_total": round(self.checkout_wait_seconds_total, 6),
+            "checkout_wait_seconds_max": round(self.checkout_wait_seconds_max, 6),
+        }
+
+
+pool_metrics = PoolMetrics()
+REGISTRY.add_collector("db_pool", pool_metrics.snapshot)
+
+
+@event.listens_for(async_engine.sync_engine.pool, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.connects += 1
+
+
+@event.listens_for(async_engine.sync_engine.pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.checkouts += 1
+
+
+@event.listens_for(async_engine.sync_engine.pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.checkins += 1
+
+
+@event.listens_for(async_engine.sync_engine.pool, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.invalidations += 1
+
+
+# A session takes its connection on its first statement, right after beginning its
+# transaction, so the gap between the two is the wait on the pool (and the pre-ping).
+# Sessions that never reach the database never touch the pool.
+@event.listens_for(PooledSession, "after_transaction_create")
+def _on_transaction_create(session, transaction):
+    if transaction.parent is None:
+        session.info["pool_wait_started_at"] = time.perf_counter()
+
+
+@event.listens_for(PooledSession, "after_begin")
+def _on_session_begin(session, transaction, connection):
+    started = session.info.pop("pool_wait_started_at", None)
+    if started is not None:
+        waited = time.perf_counter() - started
+        pool_metrics.observe_wait(waited)
+        record("db_pool", waited)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    db_query_duration.observe(elapsed)
+    record("db", elapsed)
+
+
+@event.listens_for(async_engine.sync_engine, "handle_error")
+def _on_statement_error(exception_context):
+    started = exception_context.connection is not None and exception_context.connection.info.get("query_started_at")
+    if started:
+        elapsed = time.perf_counter() - started.pop()
+        db_query_duration.observe(elapsed)
+        record("db", elapsed)
+
+
 # Dependency to get the database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -1,8 +1,10 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
-from api.v1.database.db import Base
-from api.v1.app.admin.models.admin_model import user
+from api.v1.database.db import Base, metadata
+from api.v1.app.admin.models.admin_model import User as AdminUser
+from api.v1.app.admin.models import audit_model
 from api.v1.app.models.user_model import User
+from api.v1.app.models import order_model, product_model, sales_model, store
 from api.v1.utils.config import settings
 from alembic import context
 
@@ -13,8 +15,8 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# Set the target metadata for Alembic
-target_metadata = Base.metadata
+# Set the target metadata for Alembic: ORM models and the Core tables
+target_metadata = [Base.metadata, metadata]
 
 # Database URL from settings
 def get_url():
@@ -0,0 +1,28 @@
+"""Index stores and products for the store directory and store pages
+
+Revision ID: 5b8e1f3c9d24
+Revises: e93b14d6c2f7
+Create Date: 2026-10-18 16:42:10.318206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f3c9d24'
+down_revision: Union[str, None] = 'e93b14d6c2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_user_store_id_status_created_at_id', 'products', ['user_store_id', 'status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_stores_status_id', 'stores', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stores_status_id', table_name='stores')
+    op.drop_index('ix_products_user_store_id_status_created_at_id', table_name='products')
@@ -0,0 +1,29 @@
+"""Add a per-store SKU to products for bulk import upserts
+
+Revision ID: 9f4a7c2e61b8
+Revises: 5b8e1f3c9d24
+Create Date: 2026-10-18 17:20:37.554019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f4a7c2e61b8'
+down_revision: Union[str, None] = '5b8e1f3c9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('sku', sa.String(length=64), nullable=True))
+    op.create_index('ix_products_user_store_id_sku', 'products', ['user_store_id', 'sku'], unique=True,
+                    postgresql_where=sa.text('sku IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_user_store_id_sku', table_name='products', postgresql_where=sa.text('sku IS NOT NULL'))
+    op.drop_column('products', 'sku')
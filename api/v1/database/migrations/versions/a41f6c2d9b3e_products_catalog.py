@@ -0,0 +1,68 @@
+"""Products catalog with keyset and full-text indexes
+
+Revision ID: a41f6c2d9b3e
+Revises: 8cb825b7e37e
+Create Date: 2026-10-18 09:12:40.511204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6c2d9b3e'
+down_revision: Union[str, None] = '8cb825b7e37e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('photo_url', sa.String(length=250), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('speciality', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text("timezone('UTC', now())"), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('active', 'inactive', name='storestatus'), server_default='inactive', nullable=False),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('photo_url', sa.String(length=250), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('category', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text("timezone('UTC', now())"), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.Enum('available', 'unavailable', 'limited', name='productstatus'), server_default='available', nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('user_store_id', sa.Integer(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))", persisted=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_category_created_at_id', 'products', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_status_created_at_id', 'products', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_search_vector', table_name='products', postgresql_using='gin')
+    op.drop_index('ix_products_status_created_at_id', table_name='products')
+    op.drop_index('ix_products_category_created_at_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
+    op.drop_table('products')
+    op.drop_table('stores')
+    sa.Enum(name='productstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='storestatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+"""Drop a product's daily sales with the product
+
+Revision ID: b3f9e2a7d415
+Revises: e7a3c9d1f084
+Create Date: 2026-10-18 21:12:47.530216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f9e2a7d415'
+down_revision: Union[str, None] = 'e7a3c9d1f084'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('seller_product_sales_product_id_fkey', 'seller_product_sales', type_='foreignkey')
+    op.create_foreign_key(
+        'seller_product_sales_product_id_fkey', 'seller_product_sales', 'products',
+        ['product_id'], ['id'], ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('seller_product_sales_product_id_fkey', 'seller_product_sales', type_='foreignkey')
+    op.create_foreign_key(
+        'seller_product_sales_product_id_fkey', 'seller_product_sales', 'products', ['product_id'], ['id'],
+    )
@@ -0,0 +1,26 @@
+"""Index products by last change for incremental catalog exports
+
+Revision ID: c4d2a8e7f153
+Revises: 9f4a7c2e61b8
+Create Date: 2026-10-18 18:05:12.906431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d2a8e7f153'
+down_revision: Union[str, None] = '9f4a7c2e61b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_changed_at_id', 'products', [sa.text('coalesce(updated_at, created_at)'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_changed_at_id', table_name='products')
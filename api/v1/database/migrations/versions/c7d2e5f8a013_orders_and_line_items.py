@@ -0,0 +1,49 @@
+"""Orders and order line items
+
+Revision ID: c7d2e5f8a013
+Revises: a41f6c2d9b3e
+Create Date: 2026-10-18 11:47:05.180356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e5f8a013'
+down_revision: Union[str, None] = 'a41f6c2d9b3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text("timezone('UTC', now())"), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'processing', 'completed', 'cancel', name='orderstatus'), server_default='pending', nullable=True),
+    sa.Column('buyer_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['buyer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_buyer_id_created_at_id', 'orders', ['buyer_id', 'created_at', 'id'], unique=False)
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('order_items')
+    op.drop_index('ix_orders_buyer_id_created_at_id', table_name='orders')
+    op.drop_table('orders')
+    sa.Enum(name='orderstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,79 @@
+"""Seller sales aggregates for the seller dashboard
+
+Revision ID: d81e6b3f27a9
+Revises: c4d2a8e7f153
+Create Date: 2026-10-18 18:52:40.617284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81e6b3f27a9'
+down_revision: Union[str, None] = 'c4d2a8e7f153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('seller_sales',
+    sa.Column('seller_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('units', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.Float(), server_default='0', nullable=False),
+    sa.Column('completed_orders', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed_revenue', sa.Float(), server_default='0', nullable=False),
+    sa.Column('canceled_orders', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('canceled_revenue', sa.Float(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('seller_id', 'day')
+    )
+    op.create_table('seller_product_sales',
+    sa.Column('seller_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.Float(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('seller_id', 'day', 'product_id')
+    )
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    # Seed the aggregates from the orders placed so far.
+    op.execute("""
+        INSERT INTO seller_sales (seller_id, day, orders, units, revenue, completed_orders, completed_revenue,
+                                  canceled_orders, canceled_revenue)
+        SELECT products.user_id, CAST(orders.created_at AS date),
+               count(DISTINCT orders.id) FILTER (WHERE orders.status IS DISTINCT FROM 'cancel'),
+               coalesce(sum(order_items.quantity) FILTER (WHERE orders.status IS DISTINCT FROM 'cancel'), 0),
+               coalesce(sum(order_items.quantity * order_items.unit_price)
+                        FILTER (WHERE orders.status IS DISTINCT FROM 'cancel'), 0),
+               count(DISTINCT orders.id) FILTER (WHERE orders.status = 'completed'),
+               coalesce(sum(order_items.quantity * order_items.unit_price) FILTER (WHERE orders.status = 'completed'), 0),
+               count(DISTINCT orders.id) FILTER (WHERE orders.status = 'cancel'),
+               coalesce(sum(order_items.quantity * order_items.unit_price) FILTER (WHERE orders.status = 'cancel'), 0)
+        FROM orders
+        JOIN order_items ON order_items.order_id = orders.id
+        JOIN products ON products.id = order_items.product_id
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO seller_product_sales (seller_id, day, product_id, units, revenue)
+        SELECT products.user_id, CAST(orders.created_at AS date), order_items.product_id,
+               sum(order_items.quantity), sum(order_items.quantity * order_items.unit_price)
+        FROM orders
+        JOIN order_items ON order_items.order_id = orders.id
+        JOIN products ON products.id = order_items.product_id
+        WHERE orders.status IS DISTINCT FROM 'cancel'
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_table('seller_product_sales')
+    op.drop_table('seller_sales')
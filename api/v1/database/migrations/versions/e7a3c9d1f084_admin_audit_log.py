@@ -0,0 +1,58 @@
+"""Append-only audit log of admin actions
+
+Revision ID: e7a3c9d1f084
+Revises: d81e6b3f27a9
+Create Date: 2026-10-18 19:40:03.118592
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9d1f084'
+down_revision: Union[str, None] = 'd81e6b3f27a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('admin_audit_log',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text("timezone('UTC', now())"), nullable=False),
+    sa.Column('actor_id', sa.UUID(), nullable=False),
+    sa.Column('action', sa.String(length=64), nullable=False),
+    sa.Column('target', sa.String(length=255), nullable=True),
+    sa.Column('succeeded', sa.Boolean(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_admin_audit_log_created_at_id', 'admin_audit_log', ['created_at', 'id'], unique=False)
+    op.create_index('ix_admin_audit_log_actor_id_created_at_id', 'admin_audit_log', ['actor_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_admin_audit_log_action_created_at_id', 'admin_audit_log', ['action', 'created_at', 'id'], unique=False)
+    # Entries can be added, never changed or removed.
+    op.execute("""
+        CREATE FUNCTION admin_audit_log_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'admin_audit_log is append-only';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER admin_audit_log_append_only
+        BEFORE UPDATE OR DELETE OR TRUNCATE ON admin_audit_log
+        FOR EACH STATEMENT EXECUTE FUNCTION admin_audit_log_append_only()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER admin_audit_log_append_only ON admin_audit_log")
+    op.execute("DROP FUNCTION admin_audit_log_append_only()")
+    op.drop_index('ix_admin_audit_log_action_created_at_id', table_name='admin_audit_log')
+    op.drop_index('ix_admin_audit_log_actor_id_created_at_id', table_name='admin_audit_log')
+    op.drop_index('ix_admin_audit_log_created_at_id', table_name='admin_audit_log')
+    op.drop_table('admin_audit_log')
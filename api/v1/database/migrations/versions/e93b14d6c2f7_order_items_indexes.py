@@ -0,0 +1,28 @@
+"""Index order_items for set-based item mutations
+
+Revision ID: e93b14d6c2f7
+Revises: c7d2e5f8a013
+Create Date: 2026-10-18 14:05:51.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93b14d6c2f7'
+down_revision: Union[str, None] = 'c7d2e5f8a013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_items_order_id_product_id', 'order_items', ['order_id', 'product_id'], unique=True)
+    op.create_index('ix_order_items_product_id', 'order_items', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_product_id', table_name='order_items')
+    op.drop_index('ix_order_items_order_id_product_id', table_name='order_items')
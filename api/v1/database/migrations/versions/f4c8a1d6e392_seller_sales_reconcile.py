@@ -0,0 +1,30 @@
+"""Record the last sales rebuild so workers take turns
+
+Revision ID: f4c8a1d6e392
+Revises: b3f9e2a7d415
+Create Date: 2026-10-18 21:40:19.084375
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8a1d6e392'
+down_revision: Union[str, None] = 'b3f9e2a7d415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('seller_sales_reconcile',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reconciled_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('seller_sales_reconcile')
@@ -0,0 +1,15 @@
+#!/usr/bin/python3
+"""
+Settings are read at import, so the ones the app cannot start without are
+given test values here, before any test module imports it. Nothing here
+connects to a database or to Supabase.
+"""
+
+import os
+
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_USER", "martplaza")
+os.environ.setdefault("DB_PASSWORD", "martplaza")
+os.environ.setdefault("DB_NAME", "martplaza")
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+
+import asyncio
+import time
+
+import pytest
+
+from api.v1.utils.cache import MISSING, CacheBackend, LRUCacheBackend, ReadThroughCache
+
+
+class FakeCacheBackend(CacheBackend):
+    """A dict standing in for a shared store, counting the calls made to it."""
+
+    def __init__(self):
+        self.entries = {}
+        self.counters = {}
+        self.sets = 0
+
+    async def get(self, key):
+        return self.entries.get(key, MISSING)
+
+    async def set(self, key, value, ttl):
+        self.sets += 1
+        self.entries[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    async def incr(self, key, amount=1):
+        self.counters[key] = self.counters.get(key, 0) + amount
+        return self.counters[key]
+
+
+class Loader:
+    """Counts its calls; each returns the next number unless told to wait or fail."""
+
+    def __init__(self, release: asyncio.Event = None, error: Exception = None):
+        self.calls = 0
+        self.release = release
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.calls
+
+
+def make_cache(**kwargs):
+    return ReadThroughCache("products", FakeCacheBackend(), ttl=60, **kwargs)
+
+
+def test_backends_must_implement_the_whole_interface():
+    class PartialBackend(CacheBackend):
+        async def get(self, key):
+            return MISSING
+
+    with pytest.raises(TypeError):
+        PartialBackend()
+
+
+def test_a_miss_loads_and_stores_then_hits():
+    async def scenario():
+        cache, loader = make_cache(), Loader()
+        assert await cache.get_or_load("products:1", loader) == 1
+        assert await cache.get_or_load("products:1", loader) == 1
+        return cache, loader
+
+    cache, loader = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache, release = make_cache(), asyncio.Event()
+        loader = Loader(release)
+        waiting = [asyncio.create_task(cache.get_or_load("products:1", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return cache, loader, await asyncio.gather(*waiting)
+
+    cache, loader, results = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert results == [1] * 5
+    assert cache.coalesced == 4
+
+
+def test_a_load_overlapping_an_invalidation_is_not_stored():
+    async def scenario():
+        cache, release = make_cache(), asyncio.Event()
+        loading = asyncio.create_task(cache.get_or_load("products:1", Loader(release)))
+        await asyncio.sleep(0)
+        await cache.invalidate("products:1")
+        release.set()
+        return cache, await loading
+
+    cache, value = asyncio.run(scenario())
+    assert value == 1
+    assert cache.backend.entries == {}
+
+
+def test_invalidation_moves_versioned_keys():
+    async def scenario():
+        cache = make_cache()
+        before = await cache.versioned_key("page", 1)
+        await cache.invalidate()
+        return before, await cache.versioned_key("page", 1)
+
+    before, after = asyncio.run(scenario())
+    assert before != after
+
+
+def test_discard_drops_entries_but_keeps_versioned_keys():
+    async def scenario():
+        cache = make_cache()
+        before = await cache.versioned_key("page", 1)
+        await cache.get_or_load("products:1", Loader())
+        await cache.discard("products:1")
+        return cache, before, await cache.versioned_key("page", 1)
+
+    cache, before, after = asyncio.run(scenario())
+    assert before == after
+    assert "products:1" not in cache.backend.entries
+
+
+def test_a_failed_load_reaches_every_waiter_and_is_not_stored():
+    async def scenario():
+        cache, release = make_cache(), asyncio.Event()
+        loader = Loader(release, error=RuntimeError("database down"))
+        waiting = [asyncio.create_task(cache.get_or_load("products:1", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return cache, loader, await asyncio.gather(*waiting, return_exceptions=True)
+
+    cache, loader, results = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.backend.sets == 0
+
+
+def test_a_disabled_cache_always_loads():
+    async def scenario():
+        cache, loader = make_cache(enabled=False), Loader()
+        await cache.get_or_load("products:1", loader)
+        await cache.get_or_load("products:1", loader)
+        return cache, loader
+
+    cache, loader = asyncio.run(scenario())
+    assert loader.calls == 2
+    assert cache.backend.entries == {}
+
+
+def test_lru_backend_evicts_the_least_recently_used_entry():
+    async def scenario():
+        backend = LRUCacheBackend(max_entries=2)
+        await backend.set("a", 1, 60)
+        await backend.set("b", 2, 60)
+        await backend.get("a")
+        await backend.set("c", 3, 60)
+        return backend, [await backend.get(key) for key in ("a", "b", "c")]
+
+    backend, values = asyncio.run(scenario())
+    assert values == [1, MISSING, 3]
+    assert backend.evictions == 1
+
+
+def test_lru_backend_expires_entries(monkeypatch):
+    async def scenario():
+        backend = LRUCacheBackend()
+        await backend.set("a", 1, 30)
+        monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+        return backend, await backend.get("a")
+
+    now = time.monotonic()
+    backend, value = asyncio.run(scenario())
+    assert value is MISSING
+    assert backend.expirations == 1
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request, Response
+
+from api.v1.utils import etag
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def row(row_id, updated_at=None):
+    return {"id": row_id, "created_at": CREATED, "updated_at": updated_at}
+
+
+def request_with(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_row_etag_changes_with_updated_at():
+    assert etag.row_etag(row(1)) == etag.row_etag(row(1))
+    assert etag.row_etag(row(1)) != etag.row_etag(row(1, CREATED + timedelta(seconds=1)))
+
+
+def test_page_etag_changes_with_rows_and_parts():
+    page = [row(1), row(2)]
+    assert etag.page_etag(page, "cursor") == etag.page_etag(list(page), "cursor")
+    assert etag.page_etag(page).startswith('W/"')
+    assert etag.page_etag(page) != etag.page_etag([row(1)])
+    assert etag.page_etag(page) != etag.page_etag([row(1), row(2, CREATED + timedelta(seconds=1))])
+    assert etag.page_etag(page, "cursor") != etag.page_etag(page, "other-cursor")
+    # Filters are parts too: an empty page under two filters must not share a tag
+    assert etag.page_etag([], None, None, "lamps") != etag.page_etag([], None, None, "desks")
+
+
+def test_not_modified_returns_304_for_a_matching_tag():
+    tag = etag.row_etag(row(1))
+    for header in (tag, f"W/{tag}", f'"other", {tag}', "*"):
+        response = etag.not_modified(request_with(header), Response(), tag)
+        assert response.status_code == 304
+        assert response.headers["etag"] == tag
+
+
+def test_not_modified_sets_the_validator_otherwise():
+    tag = etag.row_etag(row(1))
+    for request in (request_with(), request_with('"other"')):
+        response = Response()
+        assert etag.not_modified(request, response, tag) is None
+        assert response.headers["etag"] == tag
+        assert response.headers["cache-control"] == etag.CACHE_CONTROL
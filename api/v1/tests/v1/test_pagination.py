@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from api.v1.utils import pagination
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 4, 5, 6, 7, 890123, tzinfo=timezone.utc)
+    cursor = pagination.encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor) == (created_at, 42)
+
+
+def test_id_cursor_round_trip():
+    assert pagination.decode_id_cursor(pagination.encode_id_cursor(42)) == 42
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", pagination.encode_id_cursor(42), "WyJ4IiwgMV0"])
+def test_tampered_cursors_are_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        pagination.decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", pagination.encode_cursor(datetime.now(timezone.utc), 1)])
+def test_tampered_id_cursors_are_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        pagination.decode_id_cursor(cursor)
+    assert raised.value.status_code == 400
@@ -0,0 +1,19 @@
+#!/usr/bin/python3
+
+import os
+from collections import Counter
+
+from api.v1.utils import profiling
+from api.v1.utils.config import settings
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_MAX_FILES", 3)
+    (tmp_path / "notes.txt").write_text("not a profile")
+    for n in range(5):
+        path = tmp_path / f"{n}.folded"
+        profiling.write_folded(str(path), Counter({"main;handler": n + 1}))
+        os.utime(path, ns=(n * 10**9, n * 10**9))
+    profiling.prune(str(tmp_path), settings.PROFILING_MAX_FILES)
+    assert sorted(os.listdir(tmp_path)) == ["2.folded", "3.folded", "4.folded", "notes.txt"]
+    assert (tmp_path / "4.folded").read_text() == "main;handler 5\n"
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException, Request
+
+from api.v1.utils import rate_limit
+from api.v1.utils.config import settings
+
+
+class Clock:
+    """Stands in for time.monotonic, moved by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = rate_limit.MemoryRateLimitBackend()
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", backend)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    return backend
+
+
+def request_from(host: str = "1.2.3.4") -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (host, 1234)})
+
+
+@pytest.mark.parametrize("limit, parsed", [
+    ("5/minute", (5, 60.0)),
+    ("100/ Hours", (100, 3600.0)),
+    ("5/s", (5, 1.0)),
+    ("5/secs", (5, 1.0)),
+    ("5/min", (5, 60.0)),
+    ("5/hr", (5, 3600.0)),
+    ("5/d", (5, 86400.0)),
+    ("", None),
+])
+def test_parse_limit(limit, parsed):
+    assert rate_limit.parse_limit(limit) == parsed
+
+
+@pytest.mark.parametrize("limit", ["5/ms", "5/fortnight", "five/minute", "0/minute", "5"])
+def test_parse_limit_rejects_what_it_cannot_read(limit):
+    with pytest.raises(ValueError, match="Invalid rate limit"):
+        rate_limit.parse_limit(limit)
+
+
+def test_bucket_empties_then_refills(clock):
+    backend = rate_limit.MemoryRateLimitBackend()
+
+    async def take():
+        return await backend.take([("ip", 2, 0.5)])
+
+    assert asyncio.run(take()) == 0
+    assert asyncio.run(take()) == 0
+    assert asyncio.run(take()) == pytest.approx(2.0)
+    clock.now += 1
+    assert asyncio.run(take()) == pytest.approx(1.0)
+    clock.now += 1
+    assert asyncio.run(take()) == 0
+
+
+def test_backend_evicts_the_least_recently_used_bucket(clock):
+    backend = rate_limit.MemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        asyncio.run(backend.take([(key, 1, 1)]))
+    assert backend.stats() == {"keys": 2, "max_keys": 2, "evictions": 1}
+    assert list(backend._buckets) == ["a", "c"]
+
+
+def test_nothing_is_taken_unless_every_bucket_allows_it(clock):
+    backend = rate_limit.MemoryRateLimitBackend()
+    assert asyncio.run(backend.take([("ip", 5, 1), ("email", 1, 0.25)])) == 0
+    assert asyncio.run(backend.take([("ip", 5, 1), ("email", 1, 0.25)])) == pytest.approx(4.0)
+    assert backend._buckets["ip"][0] == 4
+    clock.now += 4
+    assert asyncio.run(backend.take([("ip", 5, 1), ("email", 1, 0.25)])) == 0
+    assert backend._buckets["ip"][0] == 4
+
+
+def test_check_raises_429_with_retry_after(clock, backend):
+    limiter = rate_limit.RateLimiter("sign_in", per_ip="2/minute")
+    asyncio.run(limiter.check(request_from()))
+    asyncio.run(limiter.check(request_from()))
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(limiter.check(request_from()))
+    assert raised.value.status_code == 429
+    assert raised.value.headers == {"Retry-After": "30"}
+    assert limiter.stats() == {"sign_in_allowed_total": 2, "sign_in_limited_total": 1}
+    # Another address has its own bucket
+    asyncio.run(limiter.check(request_from("5.6.7.8")))
+
+
+def test_email_limit_applies_across_addresses(clock, backend):
+    limiter = rate_limit.RateLimiter("sign_in", per_ip="10/minute", per_email="1/minute")
+    asyncio.run(limiter.check(request_from("1.1.1.1"), "Buyer@Example.com"))
+    with pytest.raises(HTTPException):
+        asyncio.run(limiter.check(request_from("2.2.2.2"), " buyer@example.com"))
+
+
+def test_attempts_rejected_by_the_email_limit_leave_the_ip_bucket_alone(clock, backend):
+    limiter = rate_limit.RateLimiter("sign_in", per_ip="3/minute", per_email="1/minute")
+    asyncio.run(limiter.check(request_from(), "one@example.com"))
+    for _ in range(5):
+        with pytest.raises(HTTPException):
+            asyncio.run(limiter.check(request_from(), "one@example.com"))
+    # Two of the three IP tokens are left for other accounts
+    asyncio.run(limiter.check(request_from(), "two@example.com"))
+    asyncio.run(limiter.check(request_from(), "three@example.com"))
+
+
+def test_check_is_a_no_op_when_disabled(clock, backend, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    limiter = rate_limit.RateLimiter("sign_in", per_ip="1/minute")
+    for _ in range(3):
+        asyncio.run(limiter.check(request_from()))
+    assert backend.stats()["keys"] == 0
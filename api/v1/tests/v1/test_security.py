@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+
+import asyncio
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+
+from api.v1.utils import security
+from api.v1.utils.config import settings
+
+USER_ID = "6c1f0e0e-1111-4222-8333-444455556666"
+
+
+def make_token(expires_in: float = 600, secret: str = None, **claims) -> str:
+    payload = {"sub": USER_ID, "aud": settings.JWT_AUDIENCE, "exp": time.time() + expires_in, **claims}
+    return jwt.encode(payload, secret or settings.JWT_SECRET, algorithm=settings.ALGORITHM)
+
+
+@pytest.fixture(autouse=True)
+def empty_claims_cache():
+    security._claims_cache.clear()
+    security._expiry_heap.clear()
+    yield
+    security._claims_cache.clear()
+    security._expiry_heap.clear()
+
+
+def test_decode_returns_the_verified_claims():
+    claims = security.decode_access_token(make_token(email="buyer@example.com"))
+    assert claims["sub"] == USER_ID
+    assert claims["email"] == "buyer@example.com"
+
+
+@pytest.mark.parametrize("token", [
+    make_token(secret="another-secret"),
+    make_token(expires_in=-10),
+    make_token(aud="someone-else"),
+    "not-a-jwt",
+])
+def test_decode_rejects_invalid_tokens_with_401(token):
+    with pytest.raises(HTTPException) as raised:
+        security.decode_access_token(token)
+    assert raised.value.status_code == 401
+    assert raised.value.headers == {"WWW-Authenticate": "Bearer"}
+
+
+def test_repeat_decodes_skip_the_signature_check(monkeypatch):
+    token = make_token()
+    first = security.decode_access_token(token)
+    calls = []
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(args))
+    assert security.decode_access_token(token) is first
+    assert calls == []
+
+
+def test_expired_cache_entries_are_verified_again():
+    token = make_token(expires_in=-10)
+    # Cached while it was still valid
+    security._claims_cache[security._token_key(token)] = (time.time() - 10, {"sub": USER_ID})
+    with pytest.raises(HTTPException):
+        security.decode_access_token(token)
+    assert security._claims_cache == {}
+
+
+def test_full_cache_evicts_the_tokens_closest_to_expiry(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_CLAIMS_CACHE_SIZE", 10)
+    tokens = [make_token(expires_in=600 + n) for n in range(30)]
+    for token in tokens:
+        security.decode_access_token(token)
+    assert len(security._claims_cache) == 10
+    kept = {security._token_key(token) for token in tokens[-10:]}
+    assert set(security._claims_cache) == kept
+    assert len(security._expiry_heap) == 10
+
+
+def test_role_comes_from_app_metadata_only():
+    assert security.role_from_claims({"app_metadata": {"role": "merchant"}}) == "merchant"
+    assert security.role_from_claims({"user_metadata": {"role": "admin"}}) is None
+    assert security.role_from_claims({}) is None
+
+
+def test_updated_profile_claims_never_change_the_role():
+    token = make_token(app_metadata={"role": "buyer"}, user_metadata={"first_name": "Ada"})
+    security.decode_access_token(token)
+    security.update_cached_claims(
+        token,
+        email="new@example.com",
+        user_metadata={"first_name": "Grace", "role": "admin"},
+        app_metadata={"role": "admin"},
+    )
+    claims = security.decode_access_token(token)
+    assert claims["email"] == "new@example.com"
+    assert claims["user_metadata"]["first_name"] == "Grace"
+    assert security.role_from_claims(claims) == "buyer"
+
+
+def auth_as(role):
+    return security.AuthContext(user_id=USER_ID, role=role, expires_at=time.time() + 600, access_token="")
+
+
+def test_admin_context_lets_admins_through():
+    auth = auth_as("admin")
+    assert asyncio.run(security.get_admin_context(auth)) is auth
+
+
+@pytest.mark.parametrize("role", ["buyer", "merchant", None])
+def test_admin_context_rejects_everyone_else(role):
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(security.get_admin_context(auth_as(role)))
+    assert raised.value.status_code == 403
+
+
+def test_metrics_access_needs_an_admin(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_PUBLIC", False)
+    request = Request({"type": "http", "headers": []})
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(security.get_metrics_access(request, None))
+    assert raised.value.status_code == 401
+    buyer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=make_token(app_metadata={"role": "buyer"}))
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(security.get_metrics_access(request, buyer))
+    assert raised.value.status_code == 403
+    admin = HTTPAuthorizationCredentials(scheme="Bearer", credentials=make_token(app_metadata={"role": "admin"}))
+    assert asyncio.run(security.get_metrics_access(request, admin)).role == "admin"
+
+
+def test_metrics_access_is_open_when_public(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_PUBLIC", True)
+    assert asyncio.run(security.get_metrics_access(Request({"type": "http", "headers": []}), None)) is None
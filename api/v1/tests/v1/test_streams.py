@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from enum import Enum
+
+import pytest
+
+from api.v1.utils import streams
+
+
+async def _chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def read(reader, *chunks):
+    async def collect():
+        return [record async for batch in reader(_chunks(chunks)) for record in batch]
+
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks_are_joined():
+    async def collect():
+        return [lines async for lines in streams.iter_lines(_chunks([b"\xef\xbb\xbfone\r\ntw", b"o\nthr", b"ee"]))]
+
+    assert asyncio.run(collect()) == [["one"], ["two"], ["three"]]
+
+
+def test_a_multibyte_character_split_across_chunks_is_decoded():
+    encoded = '{"name": "café"}\n'.encode()
+    split = encoded.index(b"\xc3") + 1
+    assert read(streams.read_ndjson, encoded[:split], encoded[split:]) == [(1, {"name": "café"})]
+
+
+def test_non_utf8_streams_are_rejected():
+    with pytest.raises(streams.StreamFormatError):
+        read(streams.read_ndjson, b'{"name": "ok"}\n', b'{"name": "\xff"}\n')
+
+
+def test_overlong_lines_are_rejected():
+    async def collect():
+        return [lines async for lines in streams.iter_lines(_chunks([b"x" * 20]), max_line_bytes=10)]
+
+    with pytest.raises(streams.StreamFormatError):
+        asyncio.run(collect())
+
+
+def test_ndjson_reports_bad_lines_and_skips_blank_ones():
+    records = read(streams.read_ndjson, b'{"name": "a"}\n\nnot json\n[1, 2]\n{"name": "b"}')
+    assert records[0] == (1, {"name": "a"})
+    assert records[1][0] == 3 and records[1][1].startswith("Invalid JSON")
+    assert records[2] == (4, "Expected a JSON object.")
+    assert records[3] == (5, {"name": "b"})
+
+
+def test_csv_rows_are_keyed_by_header_and_drop_empty_cells():
+    records = read(streams.read_csv, b"name, price ,stock\r\nLamp,12.50,\r\n", b"Desk,80,3\r\n")
+    assert records == [(2, {"name": "Lamp", "price": "12.50"}), (3, {"name": "Desk", "price": "80", "stock": "3"})]
+
+
+def test_csv_quoted_cells_may_span_lines_and_chunks():
+    records = read(streams.read_csv, b'name,description\n"Lamp","Bright,\n', b'warm"\nDesk,Oak\n')
+    assert records == [(2, {"name": "Lamp", "description": "Bright,\nwarm"}), (4, {"name": "Desk", "description": "Oak"})]
+
+
+def test_csv_reports_wrong_field_counts_and_unterminated_quotes():
+    records = read(streams.read_csv, b'name,price\nLamp\nDesk,80\n"Chair,5\n')
+    assert records == [(2, "Expected 2 fields, got 1."), (3, {"name": "Desk", "price": "80"}), (4, "Unterminated quoted field.")]
+
+
+def test_format_for_ignores_parameters_and_case():
+    assert streams.format_for("Text/CSV; charset=utf-8") == "csv"
+    assert streams.format_for("application/jsonl") == "ndjson"
+    assert streams.format_for("application/json") is None
+    assert streams.format_for(None) is None
+
+
+class Colour(Enum):
+    red = "red"
+
+
+ROW = {
+    "id": 7,
+    "name": 'Lamp, "large"',
+    "price": Decimal("12.50"),
+    "colour": Colour.red,
+    "created_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "description": None,
+}
+
+
+def test_csv_writer():
+    writer = streams.CsvWriter(["id", "name", "price", "colour", "created_at", "description"])
+    assert writer.header() == b"id,name,price,colour,created_at,description\n"
+    assert writer.encode([ROW]) == b'7,"Lamp, ""large""",12.50,red,2026-01-02T03:04:05+00:00,\n'
+
+
+def test_ndjson_writes_rows_the_reader_reads_back():
+    writer = streams.NdjsonWriter(list(ROW))
+    assert writer.header() == b""
+    records = read(streams.read_ndjson, writer.encode([ROW, ROW]))
+    assert [line for line, _ in records] == [1, 2]
+    assert records[0][1] == {
+        "id": 7,
+        "name": 'Lamp, "large"',
+        "price": "12.50",
+        "colour": "red",
+        "created_at": "2026-01-02T03:04:05+00:00",
+        "description": None,
+    }
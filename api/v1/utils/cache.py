@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""
+Read-through cache used in front of hot catalog reads.
+
+ReadThroughCache holds the policy (TTL, single-flight, invalidation, counters)
+and stores entries in a CacheBackend. LRUCacheBackend keeps them in process;
+a shared store (e.g. Redis) can be plugged in by implementing the same four
+coroutines and assigning it to the cache's `backend`.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Storage interface for ReadThroughCache. Values must be treated as read-only."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        """Return the stored value, or MISSING when absent or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store `value` for `ttl` seconds."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Drop the given keys; absent ones are ignored."""
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """Atomically add to a counter that never expires and return the new value."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process backend bounded by entry count, least recently used entries go first."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        self._counters[key] = self._counters.get(key, 0) + amount
+        return self._counters[key]
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class ReadThroughCache:
+    """
+    Serves values from the backend and loads them on a miss.
+
+    Concurrent misses on one key share a single load. Every invalidation bumps
+    a generation counter: keys built with `versioned_key` change with it, and a
+    load that overlapped an invalidation is returned but not stored, so a write
+    can never be overwritten by a value read before it committed.
+    """
+
+    def __init__(self, namespace: str, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._generation_key = f"{namespace}:generation"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def key(self, *parts) -> str:
+        return ":".join([self.namespace, *map(str, parts)])
+
+    async def versioned_key(self, *parts) -> str:
+        """A key that stops matching as soon as anything in the namespace is invalidated."""
+        generation = await self.backend.incr(self._generation_key, 0)
+        return self.key(f"g{generation}", *parts)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await loader()
+        while True:
+            value = await self.backend.get(key)
+            if value is not MISSING:
+                self.hits += 1
+                return value
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only swallow the cancellation of the loading request, not our own.
+                if not pending.cancelled():
+                    raise
+
+        self.misses += 1
+        generation = await self.backend.incr(self._generation_key, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        else:
+            if await self.backend.incr(self._generation_key, 0) == generation:
+                await self.backend.set(key, value, self.ttl)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def invalidate(self, *keys: str) -> None:
+        """Drop the given keys and every versioned key in the namespace."""
+        self.invalidations += 1
+        # Loads already running may have read the old rows, later readers must not join them.
+        self._inflight.clear()
+        await self.backend.incr(self._generation_key)
+        if keys:
+            await self.backend.delete(*keys)
+
+    async def discard(self, *keys: str) -> None:
+        """
+        Drop single entries without touching versioned keys. For frequent side
+        effects such as stock moves, where listings may lag by up to the TTL.
+        """
+        for key in keys:
+            self._inflight.pop(key, None)
+        if keys:
+            await self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            **self.backend.stats(),
+        }
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""
+Gzip response compression as a plain ASGI middleware.
+
+Compared with Starlette's GZipMiddleware this parses Accept-Encoding
+q-values, leaves already-compressed media types alone and flushes every
+streamed chunk, so NDJSON streams reach the client row by row instead of
+sitting in the compressor until it fills.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Media types whose bodies are compressed already, gzip would only cost cpu.
+INCOMPRESSIBLE_TYPES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip",
+    "application/x-bzip2", "application/x-7z-compressed", "application/pdf",
+    "application/octet-stream",
+)
+
+# zlib wbits for a gzip header and trailer instead of a raw deflate stream
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """True unless the client did not list gzip (or *) or gave it q=0."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted.get("gzip", accepted.get("x-gzip", accepted.get("*", 0.0))) > 0
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await _GzipResponder(self.app, self.minimum_size, self.level)(scope, receive, send)
+
+
+class _GzipResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_skip(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "").lower()
+        return "content-encoding" in headers or content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+    def _start_compressing(self, streaming: bool) -> None:
+        headers = MutableHeaders(scope=self.start_message)
+        headers["Content-Encoding"] = "gzip"
+        headers.add_vary_header("Accept-Encoding")
+        if streaming:
+            del headers["Content-Length"]
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The gzip body is a different representation, so the strong validator no longer holds.
+            headers["ETag"] = f"W/{etag}"
+        self.compressor = zlib.compressobj(self.level, zlib.DEFLATED, GZIP_WBITS)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress.
+            self.start_message = message
+            self.passthrough = self._should_skip(Headers(raw=message["headers"]))
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send(message)
+                return
+            self._start_compressing(streaming=more_body)
+
+        if more_body:
+            # Sync flush keeps each streamed chunk decodable on arrival.
+            compressed = self.compressor.compress(body) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            compressed = self.compressor.compress(body) + self.compressor.flush()
+        if self.start_message is not None:
+            if not more_body:
+                MutableHeaders(scope=self.start_message)["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            self.start_message = None
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
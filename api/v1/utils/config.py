@@ -2,9 +2,11 @@
 
 import secrets
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
+# The one read of .env; the Settings defaults below and os.getenv callers see it
 load_dotenv()
 
 DB_PORT = os.getenv("DB_PORT")
@@ -15,12 +17,112 @@ DB_NAME = os.getenv("DB_NAME")
 
 class Settings(BaseSettings):
     DATABASE_URL: str = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode=require"
+    ASYNC_DATABASE_URL: str = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?ssl=require"
+    DB_POOL_SIZE: int = os.getenv("DB_POOL_SIZE", 10)
+    DB_MAX_OVERFLOW: int = os.getenv("DB_MAX_OVERFLOW", 20)
+    DB_POOL_TIMEOUT: float = os.getenv("DB_POOL_TIMEOUT", 30)
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", True)
+    DB_POOL_RECYCLE: int = os.getenv("DB_POOL_RECYCLE", 1800)
+    # asyncpg prepared statement cache per connection; set 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = os.getenv("DB_STATEMENT_CACHE_SIZE", 100)
+    # How long an order waits for product row locks before giving up with a retryable 503
+    ORDER_LOCK_TIMEOUT_MS: int = os.getenv("ORDER_LOCK_TIMEOUT_MS", 2000)
+    # Seller dashboard: default and longest range of days
+    SELLER_DASHBOARD_DAYS: int = os.getenv("SELLER_DASHBOARD_DAYS", 30)
+    SELLER_DASHBOARD_MAX_DAYS: int = os.getenv("SELLER_DASHBOARD_MAX_DAYS", 366)
+    # Rebuild the last N days of sales aggregates from orders every so many seconds; 0 turns it off.
+    # Order writes wait on the rebuild, so keep the window short.
+    SELLER_SALES_RECONCILE_SECONDS: float = os.getenv("SELLER_SALES_RECONCILE_SECONDS", 3600)
+    SELLER_SALES_RECONCILE_DAYS: int = os.getenv("SELLER_SALES_RECONCILE_DAYS", 2)
+    BCRYPT_ROUNDS: int = os.getenv("BCRYPT_ROUNDS", 12)
+    HASH_WORKERS: int = os.getenv("HASH_WORKERS", os.cpu_count() or 1)
+    # Hash/verify jobs allowed in flight per app worker before callers get 503
+    HASH_QUEUE_LIMIT: int = os.getenv("HASH_QUEUE_LIMIT", 64)
+    ADMIN_BULK_MAX_ITEMS: int = os.getenv("ADMIN_BULK_MAX_ITEMS", 1000)
+    ADMIN_BULK_CONCURRENCY: int = os.getenv("ADMIN_BULK_CONCURRENCY", 16)
+    # Admin audit entries are written in batches of up to this many, at least every so many seconds.
+    # Entries beyond AUDIT_LOG_MAX_PENDING waiting to be written (database down) are dropped and counted.
+    AUDIT_LOG_BATCH_SIZE: int = os.getenv("AUDIT_LOG_BATCH_SIZE", 500)
+    AUDIT_LOG_FLUSH_SECONDS: float = os.getenv("AUDIT_LOG_FLUSH_SECONDS", 1)
+    AUDIT_LOG_MAX_PENDING: int = os.getenv("AUDIT_LOG_MAX_PENDING", 50000)
+    # Production server (server.py); WEB_CONCURRENCY=0 means one worker per cpu
+    WEB_CONCURRENCY: int = os.getenv("WEB_CONCURRENCY", 0)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = os.getenv("SERVER_PORT", 8000)
+    SERVER_KEEP_ALIVE: int = os.getenv("SERVER_KEEP_ALIVE", 5)
+    SERVER_BACKLOG: int = os.getenv("SERVER_BACKLOG", 2048)
+    # Connections per worker beyond which new requests get 503; unset for no limit
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = os.getenv("SERVER_LIMIT_CONCURRENCY")
+    SERVER_GRACEFUL_TIMEOUT: int = os.getenv("SERVER_GRACEFUL_TIMEOUT", 30)
+    # Seconds a cached product page may lag behind writes made on other workers
+    PRODUCT_CACHE_ENABLED: bool = os.getenv("PRODUCT_CACHE_ENABLED", True)
+    PRODUCT_CACHE_TTL: float = os.getenv("PRODUCT_CACHE_TTL", 30)
+    PRODUCT_CACHE_MAX_ENTRIES: int = os.getenv("PRODUCT_CACHE_MAX_ENTRIES", 10000)
+    # Bulk product import: rows per COPY batch, and per-row errors kept in the report
+    PRODUCT_IMPORT_BATCH_SIZE: int = os.getenv("PRODUCT_IMPORT_BATCH_SIZE", 5000)
+    PRODUCT_IMPORT_MAX_ERRORS: int = os.getenv("PRODUCT_IMPORT_MAX_ERRORS", 1000)
+    PRODUCT_IMPORT_MAX_LINE_BYTES: int = os.getenv("PRODUCT_IMPORT_MAX_LINE_BYTES", 65536)
+    # Rows fetched from the server-side cursor and encoded per chunk of a catalog export
+    PRODUCT_EXPORT_BATCH_SIZE: int = os.getenv("PRODUCT_EXPORT_BATCH_SIZE", 2000)
+    # Incremental exports re-send products changed this long before `since`, see export_products
+    PRODUCT_EXPORT_OVERLAP_SECONDS: float = os.getenv("PRODUCT_EXPORT_OVERLAP_SECONDS", 60)
+    # Opt in to rendering JSON with orjson (when installed) instead of the stdlib encoder
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", False)
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = os.getenv("COMPRESSION_MINIMUM_SIZE", 1024)
+    COMPRESSION_LEVEL: int = os.getenv("COMPRESSION_LEVEL", 6)
+    # Log records go to stdout from a writer thread, as JSON lines or, for local development, "text"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    # Share of high-volume success records kept, e.g. 0.01; other records are always kept
+    LOG_SUCCESS_SAMPLE_RATE: float = os.getenv("LOG_SUCCESS_SAMPLE_RATE", 0.1)
+    # Records waiting for the writer thread beyond which new ones are dropped
+    LOG_QUEUE_SIZE: int = os.getenv("LOG_QUEUE_SIZE", 10000)
+    # /metrics and its JSON views are admin-only unless set, e.g. for a scraper on a private network
+    METRICS_PUBLIC: bool = os.getenv("METRICS_PUBLIC", False)
+    # Sampling profiler: admins send PROFILING_HEADER to profile a request while enabled
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", False)
+    PROFILING_HEADER: str = os.getenv("PROFILING_HEADER", "X-Profile")
+    PROFILING_INTERVAL_MS: float = os.getenv("PROFILING_INTERVAL_MS", 1)
+    # Share of all requests profiled without the header, e.g. 0.001
+    PROFILING_REQUEST_RATE: float = os.getenv("PROFILING_REQUEST_RATE", 0)
+    # Continuous whole-loop sampling rate, 0 turns it off
+    PROFILING_ALWAYS_ON_HZ: float = os.getenv("PROFILING_ALWAYS_ON_HZ", 0)
+    PROFILING_FLUSH_SECONDS: float = os.getenv("PROFILING_FLUSH_SECONDS", 60)
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+    # Profiles kept in PROFILING_DIR, the oldest are deleted past this
+    PROFILING_MAX_FILES: int = os.getenv("PROFILING_MAX_FILES", 500)
+    # Connection pool shared by the Supabase clients of one worker
+    SUPABASE_HTTP2: bool = os.getenv("SUPABASE_HTTP2", True)
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", 100)
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", 20)
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float = os.getenv("SUPABASE_HTTP_KEEPALIVE_EXPIRY", 60)
+    SUPABASE_HTTP_CONNECT_TIMEOUT: float = os.getenv("SUPABASE_HTTP_CONNECT_TIMEOUT", 3)
+    # Read and write timeout of each call
+    SUPABASE_HTTP_TIMEOUT: float = os.getenv("SUPABASE_HTTP_TIMEOUT", 10)
+    # How long a call waits for a free connection when the pool is full
+    SUPABASE_HTTP_POOL_TIMEOUT: float = os.getenv("SUPABASE_HTTP_POOL_TIMEOUT", 5)
+    # Token buckets on the auth routes as "count/period" (second, minute, hour, day); empty disables one
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", True)
+    RATE_LIMIT_MAX_KEYS: int = os.getenv("RATE_LIMIT_MAX_KEYS", 100000)
+    RATE_LIMIT_SIGN_IN_PER_IP: str = os.getenv("RATE_LIMIT_SIGN_IN_PER_IP", "20/minute")
+    RATE_LIMIT_SIGN_IN_PER_EMAIL: str = os.getenv("RATE_LIMIT_SIGN_IN_PER_EMAIL", "5/minute")
+    RATE_LIMIT_SIGN_UP_PER_IP: str = os.getenv("RATE_LIMIT_SIGN_UP_PER_IP", "10/hour")
+    RATE_LIMIT_SIGN_UP_PER_EMAIL: str = os.getenv("RATE_LIMIT_SIGN_UP_PER_EMAIL", "3/hour")
+    RATE_LIMIT_RESET_PASSWORD_PER_IP: str = os.getenv("RATE_LIMIT_RESET_PASSWORD_PER_IP", "10/hour")
+    RATE_LIMIT_RESET_PASSWORD_PER_EMAIL: str = os.getenv("RATE_LIMIT_RESET_PASSWORD_PER_EMAIL", "3/hour")
+    SUPABASE_URL: Optional[str] = os.getenv("SUPABASE_URL")
+    SUPABASE_KEY: Optional[str] = os.getenv("SUPABASE_KEY")
+    SUPABASE_SERVICE_KEY: Optional[str] = os.getenv("SUPABASE_SERVICE_KEY")
+    SITE_HOST: Optional[str] = os.getenv("SITE_HOST")
+    SITE_PORT: Optional[str] = os.getenv("SITE_PORT")
     SECRET_KEY: str = os.getenv("SECRET_KEY", secrets.token_hex(32))
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)
     JWT_SECRET: str = os.getenv("JWT_SECRET")
+    JWT_AUDIENCE: str = os.getenv("JWT_AUDIENCE", "authenticated")
+    JWT_CLAIMS_CACHE_SIZE: int = os.getenv("JWT_CLAIMS_CACHE_SIZE", 10000)
     class Config:
-        env_file = ".env"
         extra = "allow"
 
 settings = Settings()
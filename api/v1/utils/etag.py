@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+
+# Clients may keep the body but must revalidate before using it.
+CACHE_CONTROL = "no-cache"
+
+
+def _last_modified(row: dict):
+    # updated_at is only set by the first update, until then creation is the last change.
+    return row["updated_at"] or row["created_at"]
+
+
+def row_etag(row: dict) -> str:
+    """Strong ETag of a single row, changes whenever the row's updated_at does."""
+    return f'"{row["id"]}-{_last_modified(row).timestamp():.6f}"'
+
+
+def page_etag(rows: Iterable[dict], *parts) -> str:
+    """
+    Weak ETag of a page: its newest updated_at plus the request's cursor and
+    filters. Row ids are mixed in so rows leaving the page change it as well.
+    """
+    rows = list(rows)
+    newest = max((_last_modified(row) for row in rows), default=None)
+    digest = hashlib.sha256(
+        repr((newest, [row["id"] for row in rows], parts)).encode()
+    ).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Return a 304 when the client already holds `etag`, otherwise put the
+    validator on `response` and return None so the route serializes as usual.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,7 +1,25 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-# Create a CryptContext for password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .config import settings
+from ..app.schemas.responses.custom_responses import PASSWORD_HASHING_BUSY
+
+# Create a CryptContext for password hashing.
+# Hashes below the configured cost are reported as needing an update on verify.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt is CPU bound, so async callers hand it to a process pool sized to the cores.
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
 
 
 def get_password_hash(password: str) -> str:
@@ -31,6 +49,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.HASH_WORKERS)
+    return _executor
+
+
+async def _run_in_pool(func, *args):
+    """
+    Run `func` on the hashing pool without blocking the event loop.
+    Once HASH_QUEUE_LIMIT jobs are in flight, new callers get a 503 straight away
+    instead of queueing behind work that will take seconds to drain.
+    """
+    global _in_flight
+    if _in_flight >= settings.HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=PASSWORD_HASHING_BUSY,
+            headers={"Retry-After": "1"},
+        )
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        _in_flight -= 1
+
+
+async def ahash_password(password: str) -> str:
+    """
+    Async variant of `get_password_hash`, computed on the hashing pool.
+    Args:
+        password (str): Plain-text password.
+    Returns:
+        str: Hashed password.
+    """
+    if not password:
+        raise ValueError("Password cannot be empty.")
+    return await _run_in_pool(get_password_hash, password)
+
+
+async def averify_password(
+    plain_password: str,
+    hashed_password: str,
+    on_rehash: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> bool:
+    """
+    Async variant of `verify_password`, computed on the hashing pool.
+    If the password matches but the stored hash uses an outdated cost,
+    `on_rehash` is awaited with a fresh hash so the caller can store it.
+    Args:
+        plain_password (str): Plain-text password to verify.
+        hashed_password (str): Hashed password to compare against.
+        on_rehash: Optional coroutine function persisting the upgraded hash.
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    if not plain_password or not hashed_password:
+        raise ValueError("Passwords cannot be empty.")
+    valid, new_hash = await _run_in_pool(_verify_and_update, plain_password, hashed_password)
+    if valid and new_hash and on_rehash is not None:
+        await on_rehash(new_hash)
+    return valid
+
+
+def shutdown_hash_pool():
+    """Stop the hashing worker processes, if they were started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
 def simulate_user_flow():
     """
     Simulate user registration and login flow to demonstrate password hashing and verification.
@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+"""
+Process-wide logging: structured records written off the event loop.
+
+`configure_logging` installs, once per process, a QueueHandler on the root
+logger and a QueueListener thread that formats and writes the records, so
+a log call on the loop costs a filter pass and a queue put; the message
+itself (`%`-style arguments included) is only rendered in the writer
+thread. RequestContextMiddleware gives every request an id, taken from
+the X-Request-ID header or generated, and every record logged while
+serving it carries that id and the route template.
+
+Records logged with `extra={"sampled": True}`, meant for high-volume
+success messages, are kept at LOG_SUCCESS_SAMPLE_RATE; everything else is
+kept. When the writer falls LOG_QUEUE_SIZE records behind, new records
+are dropped and counted rather than blocking the loop.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import REGISTRY
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Longer incoming ids are replaced, so a client cannot bloat every record.
+MAX_REQUEST_ID_LENGTH = 128
+# Loggers that uvicorn sets up with handlers of its own
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# (request id, ASGI scope) of the request being served
+_request: ContextVar[Optional[tuple]] = ContextVar("log_request", default=None)
+
+# Attributes every LogRecord has; anything else on a record came in through `extra`.
+# uvicorn's color_message repeats the message with terminal colors.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id", "route", "sampled", "color_message",
+}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the id and route template of the request being served."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _request.get()
+        if current is None:
+            record.request_id = record.route = None
+        else:
+            record.request_id = current[0]
+            # Set by routing, so absent until the request has been matched.
+            record.route = getattr(current[1].get("route"), "path", None)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `sampled` records at `rate`, all others always."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread untouched. QueueHandler.prepare would
+    render the message here, on the loop; the queue never leaves the process,
+    so the record can travel as is and be rendered by the listener.
+    """
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id, route and any extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "route": getattr(record, "route", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s %(route)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+_output: Optional[logging.Handler] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_sampler: Optional[SamplingFilter] = None
+
+
+def configure_logging(stream=None, force: bool = False) -> bool:
+    """
+    Route every logger of the process through the queue and writer thread.
+    Later calls do nothing unless `force`, so any module may call it.
+    :param stream: where records are written, stdout by default
+    :param force: replace a previous configuration
+    :return whether this call configured logging:
+    """
+    global _listener, _output, _queue_handler, _sampler
+    if _output is not None and not force:
+        return False
+    stop_logging()
+
+    _output = logging.StreamHandler(stream or sys.stdout)
+    if settings.LOG_FORMAT == "text":
+        _output.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        _output.setFormatter(JsonFormatter())
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    _sampler = SamplingFilter(settings.LOG_SUCCESS_SAMPLE_RATE)
+    # Filters run on the caller's side: the request context lives there.
+    _queue_handler.addFilter(_sampler)
+    _queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(_queue_handler.queue, _output, respect_handler_level=True)
+    _listener.start()
+    return True
+
+
+def stop_logging():
+    """
+    Write what is still queued and stop the writer thread. Records logged
+    afterwards, such as the server's shutdown messages, are written directly.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    for record_filter in _queue_handler.filters:
+        _output.addFilter(record_filter)
+    root.addHandler(_output)
+
+
+atexit.register(stop_logging)
+
+
+def logging_stats() -> dict:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        "dropped_total": _queue_handler.dropped if _queue_handler is not None else 0,
+        "sampled_out_total": _sampler.sampled_out if _sampler is not None else 0,
+    }
+
+
+REGISTRY.add_collector("logging", logging_stats)
+
+
+class RequestContextMiddleware:
+    """Gives each HTTP request an id for its log records and echoes it in the X-Request-ID response header."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id or len(request_id) > MAX_REQUEST_ID_LENGTH:
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        token = _request.set((request_id, scope))
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request.reset(token)
@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+"""
+Request timing and Prometheus-text metrics, without extra dependencies.
+
+TimingMiddleware opens a timing record per request; the database engine
+events and the Supabase call sites add to it through `record` and
+`track_supabase`.
+The totals go out in the Server-Timing header and every duration also
+lands in a histogram that /metrics renders. Values are per worker process.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, seconds: float, *labelvalues: str):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, (counts, total) in sorted(self._series.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+            cumulative = 0
+            for bound, count in zip([*map(repr, self.buckets), "+Inf"], counts):
+                cumulative += count
+                bucket_labels = ",".join([*labels, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f'{{{",".join(labels)}}}' if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self.histograms: List[Histogram] = []
+        # prefix -> callable returning {name: number}, rendered as gauges
+        self.collectors: Dict[str, Callable[[], dict]] = {}
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        histogram = Histogram(*args, **kwargs)
+        self.histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, prefix: str, collect: Callable[[], dict]):
+        self.collectors[prefix] = collect
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+        for prefix, collect in self.collectors.items():
+            for name, value in collect().items():
+                if isinstance(value, (bool, int, float)):
+                    lines.append(f"# TYPE {prefix}_{name} gauge")
+                    lines.append(f"{prefix}_{name} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to the end of the response body, by route template.",
+    ("method", "route", "status"),
+)
+db_query_duration = REGISTRY.histogram(
+    "db_query_duration_seconds", "Time spent executing one SQL statement on the async engine.",
+)
+supabase_request_duration = REGISTRY.histogram(
+    "supabase_request_duration_seconds", "Time spent in one Supabase (GoTrue) call.",
+    ("operation", "outcome"),
+)
+
+# component -> [seconds, calls] for the request being served
+_request_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar("request_timings", default=None)
+
+
+def record(component: str, seconds: float):
+    """Add `seconds` to the current request's Server-Timing entry for `component`."""
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(component, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def track_supabase(operation: str):
+    """Time a Supabase call into the request timings and the supabase histogram."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - start
+        supabase_request_duration.observe(elapsed, operation, outcome)
+        record("supabase", elapsed)
+
+
+def server_timing(total: float, timings: Dict[str, list]) -> str:
+    entries = [f"app;dur={total * 1000:.1f}"]
+    for component, (seconds, calls) in timings.items():
+        entries.append(f'{component};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"')
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """Times every HTTP request and adds a Server-Timing header to its response."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, list] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(time.perf_counter() - start, timings))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # Routing stores the matched route in the scope, its template keeps label cardinality bounded.
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], route, str(status_code))
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+"""
+Statistical profiler for the event loop, written as folded stacks.
+
+A sampler thread reads the stack of the event loop thread at a fixed
+interval. Samples taken while a profiled request's task is on the loop are
+counted for that request; with PROFILING_ALWAYS_ON_HZ set, the whole loop
+is also sampled at that low rate and flushed to disk periodically.
+
+Output files hold one `frame;frame;frame count` line per stack, the format
+read by flamegraph.pl, speedscope and inferno. Only the newest
+PROFILING_MAX_FILES are kept in PROFILING_DIR. Only time on the loop thread
+is seen, and while the loop is busy the sampler waits for the GIL, so the
+effective resolution is no finer than sys.getswitchinterval() (5ms).
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .security import ADMIN_ROLE, decode_access_token, role_from_claims
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in (os.getcwd() + os.sep, sys.prefix + os.sep):
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def fold(frame) -> str:
+    """The stack ending in `frame` as `root;...;leaf`."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def prune(directory: str, max_files: int):
+    """Delete the oldest .folded files in `directory` beyond the newest `max_files`."""
+    with os.scandir(directory) as entries:
+        names = [entry.path for entry in entries if entry.name.endswith(".folded")]
+    if len(names) <= max_files:
+        return
+    profiles = []
+    for name in names:
+        # Another worker sharing the directory may be pruning it too
+        try:
+            profiles.append((os.stat(name).st_mtime_ns, name))
+        except FileNotFoundError:
+            pass
+    profiles.sort()
+    for _, name in profiles[:len(profiles) - max_files]:
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+
+def write_folded(path: str, samples: Counter):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as output:
+        for stack, count in samples.most_common():
+            output.write(f"{stack} {count}\n")
+    prune(directory, settings.PROFILING_MAX_FILES)
+
+
+class LoopSampler(threading.Thread):
+    """Samples one event loop's thread; runs as a daemon for the life of the worker."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float, always_on_hz: float, output_dir: str):
+        super().__init__(name="loop-sampler", daemon=True)
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.always_on_interval = 1.0 / always_on_hz if always_on_hz > 0 else None
+        self.output_dir = output_dir
+        self.requests: Dict[asyncio.Task, Counter] = {}
+        self.continuous: Counter = Counter()
+        self._wake = threading.Event()
+
+    def profile(self, task: asyncio.Task) -> Counter:
+        samples = self.requests[task] = Counter()
+        self._wake.set()
+        return samples
+
+    def finish(self, task: asyncio.Task) -> Optional[Counter]:
+        return self.requests.pop(task, None)
+
+    def run(self):
+        next_continuous = time.monotonic()
+        flush_at = next_continuous + settings.PROFILING_FLUSH_SECONDS
+        while True:
+            if self.requests:
+                time.sleep(self.interval)
+            elif self.always_on_interval is not None:
+                time.sleep(self.always_on_interval)
+            else:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = None
+            task = asyncio.current_task(self.loop)
+            samples = self.requests.get(task)
+            if samples is not None:
+                stack = fold(frame)
+                samples[stack] += 1
+
+            now = time.monotonic()
+            if self.always_on_interval is not None and now >= next_continuous:
+                next_continuous = now + self.always_on_interval
+                self.continuous[stack or fold(frame)] += 1
+                if now >= flush_at:
+                    flush_at = now + settings.PROFILING_FLUSH_SECONDS
+                    samples, self.continuous = self.continuous, Counter()
+                    path = os.path.join(self.output_dir, f"continuous-{os.getpid()}-{int(time.time())}.folded")
+                    write_folded(path, samples)
+
+
+def _is_admin(headers: Headers) -> bool:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        claims = decode_access_token(token)
+    except HTTPException:
+        return False
+    return role_from_claims(claims) == ADMIN_ROLE
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry PROFILING_HEADER from an admin, plus a random
+    PROFILING_REQUEST_RATE share of all requests, when PROFILING_ENABLED is set.
+    The profile id comes back in X-Profile-Id and names the file in PROFILING_DIR.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.sampler: Optional[LoopSampler] = None
+
+    def _get_sampler(self) -> LoopSampler:
+        # Started from inside the loop, so it knows which thread to sample.
+        if self.sampler is None:
+            self.sampler = LoopSampler(
+                asyncio.get_running_loop(),
+                interval=settings.PROFILING_INTERVAL_MS / 1000,
+                always_on_hz=settings.PROFILING_ALWAYS_ON_HZ,
+                output_dir=settings.PROFILING_DIR,
+            )
+            self.sampler.start()
+        return self.sampler
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        return bool(headers.get(settings.PROFILING_HEADER)) and _is_admin(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan" and settings.PROFILING_ALWAYS_ON_HZ > 0:
+            self._get_sampler()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        if not requested and random.random() >= settings.PROFILING_REQUEST_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        sampler = self._get_sampler()
+        task = asyncio.current_task()
+        profile_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        sampler.profile(task)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            samples = sampler.finish(task)
+            # An admin who asked gets a file even when the request never showed up on cpu.
+            if samples or requested:
+                route = re.sub(r"[^A-Za-z0-9-]+", "_", getattr(scope.get("route"), "path", scope["path"])).strip("_")
+                path = os.path.join(settings.PROFILING_DIR, f"{profile_id}-{scope['method']}-{route or 'index'}.folded")
+                await asyncio.to_thread(write_folded, path, samples)
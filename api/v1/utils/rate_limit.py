@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""
+Token-bucket rate limiting for the unauthenticated auth routes.
+
+Each limited route owns a RateLimiter with one bucket per client IP and
+one per email address, so a credential-stuffing burst is cut off at the
+source address and a slow spray across many addresses still cannot hammer
+one account. Limits are "count/period" strings from settings, e.g.
+"5/minute" or "5/min"; a bucket holds `count` tokens and refills at
+count/period.
+
+A request takes a token from each of its buckets or from none of them, so
+attempts rejected by the email limit do not also drain the IP bucket.
+
+Buckets live in a RateLimitBackend. MemoryRateLimitBackend keeps them per
+worker; a shared store (e.g. Redis, running the same refill arithmetic
+over all the keys in one Lua script so a take is atomic across workers)
+can be plugged in by implementing `take` and assigning it to
+`rate_limit_backend`.
+"""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .config import settings
+from .metrics import REGISTRY
+
+PERIODS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hr": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+
+# (key, capacity, refill per second)
+Bucket = Tuple[str, int, float]
+
+
+def parse_limit(limit: str) -> Optional[Tuple[int, float]]:
+    """
+    "5/minute" -> (5, 60.0); units may be abbreviated or plural ("5/min",
+    "5/s", "5/hours"). An empty string means no limit.
+    :raise ValueError naming the limit when it cannot be parsed:
+    """
+    if not limit:
+        return None
+    count, _, period = limit.partition("/")
+    unit = period.strip().lower()
+    # Plurals, but not "ms", which is not minutes
+    if unit not in PERIODS and len(unit) > 2:
+        unit = unit.removesuffix("s")
+    seconds = PERIODS.get(unit)
+    if seconds is None or not count.strip().isdigit() or int(count) < 1:
+        raise ValueError(
+            f"Invalid rate limit {limit!r}, expected count/period with a period of {', '.join(PERIODS)}"
+        )
+    return int(count), float(seconds)
+
+
+class RateLimitBackend(ABC):
+    """Storage interface for token buckets."""
+
+    @abstractmethod
+    async def take(self, buckets: Sequence[Bucket], cost: float = 1) -> float:
+        """
+        Takes `cost` tokens from each of `buckets`, created full, and returns 0.
+        When any of them holds fewer, nothing is taken from any bucket and the
+        seconds until they will all hold enough are returned instead.
+        """
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process buckets bounded by key count, least recently used first out.
+    An evicted bucket starts full again, so max_keys should cover the keys
+    seen within one refill period.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time of the last refill); tuples of floats are
+        # left out of the cyclic gc, which a table this size would otherwise slow down
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def take(self, buckets: Sequence[Bucket], cost: float = 1) -> float:
+        now = time.monotonic()
+        levels: List[float] = []
+        retry_after = 0.0
+        for key, capacity, refill_per_second in buckets:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(capacity)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+            if tokens < cost:
+                retry_after = max(retry_after, (cost - tokens) / refill_per_second)
+            levels.append(tokens)
+        for (key, _, _), tokens in zip(buckets, levels):
+            new = key not in self._buckets
+            # Refilled either way, so a rejected request leaves the level where it was
+            self._buckets[key] = (tokens if retry_after else tokens - cost, now)
+            if new and len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+            elif not new:
+                self._buckets.move_to_end(key)
+        return retry_after
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+rate_limit_backend: RateLimitBackend = MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+class RateLimiter:
+    """Per-route limits; `check` raises 429 with Retry-After once a bucket is empty."""
+
+    def __init__(self, name: str, per_ip: str = "", per_email: str = ""):
+        self.name = name
+        self.per_ip = parse_limit(per_ip)
+        self.per_email = parse_limit(per_email)
+        self.allowed = 0
+        self.limited = 0
+
+    def _bucket(self, scope: str, value: str, limit: Tuple[int, float]) -> Bucket:
+        count, period = limit
+        return f"{self.name}:{scope}:{value}", count, count / period
+
+    async def check(self, request: Request, email: Optional[str] = None):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        buckets = []
+        if self.per_ip and request.client is not None:
+            buckets.append(self._bucket("ip", request.client.host, self.per_ip))
+        if self.per_email and email:
+            buckets.append(self._bucket("email", email.strip().lower(), self.per_email))
+        retry_after = await rate_limit_backend.take(buckets) if buckets else 0.0
+        if retry_after:
+            self.limited += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {f"{self.name}_allowed_total": self.allowed, f"{self.name}_limited_total": self.limited}
+
+
+sign_in_limiter = RateLimiter("sign_in", settings.RATE_LIMIT_SIGN_IN_PER_IP, settings.RATE_LIMIT_SIGN_IN_PER_EMAIL)
+sign_up_limiter = RateLimiter("sign_up", settings.RATE_LIMIT_SIGN_UP_PER_IP, settings.RATE_LIMIT_SIGN_UP_PER_EMAIL)
+reset_password_limiter = RateLimiter(
+    "reset_password", settings.RATE_LIMIT_RESET_PASSWORD_PER_IP, settings.RATE_LIMIT_RESET_PASSWORD_PER_EMAIL,
+)
+
+
+def _snapshot() -> dict:
+    return {
+        **rate_limit_backend.stats(),
+        **sign_in_limiter.stats(),
+        **sign_up_limiter.stats(),
+        **reset_password_limiter.stats(),
+    }
+
+
+REGISTRY.add_collector("rate_limit", _snapshot)
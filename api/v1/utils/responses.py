@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+JSON response class used as the app's default_response_class.
+
+Off by default; set FAST_JSON_RESPONSES to opt in.
+
+orjson serializes natively what FastAPI hands a response class (dicts,
+lists, str, numbers) several times faster than the stdlib encoder, and the
+fallbacks below cover values returned straight from managers in a Response,
+encoded the way pydantic would encode them for a response_model.
+"""
+
+from decimal import Decimal
+from typing import Any, Type
+
+from fastapi.responses import JSONResponse
+
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+def _default(value: Any):
+    # UUID, datetime and the str enums in models/enums.py are encoded natively.
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def default_response_class() -> Type[JSONResponse]:
+    """ORJSONResponse when enabled and orjson is installed, FastAPI's JSONResponse otherwise."""
+    if settings.FAST_JSON_RESPONSES and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+
+import hashlib
+import heapq
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import jwt
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel
+
+from .config import settings
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# sha256(token) -> (exp, claims). Entries live until the token itself expires.
+_claims_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+# (exp, sha256(token)) of the cached entries, soonest to expire first
+_expiry_heap: List[Tuple[float, str]] = []
+
+# Claims a user may change on their own auth record, and so may be refreshed in the cache
+PROFILE_CLAIMS = ("email", "phone", "user_metadata")
+# RoleType.admin, the role get_admin_context lets through
+ADMIN_ROLE = "admin"
+
+
+class AuthContext(BaseModel):
+    """The verified caller of the current request."""
+    user_id: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    role: Optional[str] = None
+    user_metadata: Dict[str, Any] = {}
+    expires_at: float
+    access_token: str
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _evict_expired(now: float) -> None:
+    """Drop expired entries, then, while still full, the ones closest to expiry; O(log n) each."""
+    while _expiry_heap and (_expiry_heap[0][0] <= now or len(_claims_cache) >= settings.JWT_CLAIMS_CACHE_SIZE):
+        exp, key = heapq.heappop(_expiry_heap)
+        cached = _claims_cache.get(key)
+        # Entries dropped after a failed check leave their heap item behind.
+        if cached is not None and cached[0] == exp:
+            del _claims_cache[key]
+
+
+def role_from_claims(claims: Dict[str, Any]) -> Optional[str]:
+    """
+    The caller's role, from `app_metadata`, which only the service role can
+    write. `user_metadata` is editable by the user and is never trusted for it.
+    """
+    return (claims.get("app_metadata") or {}).get("role")
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a Supabase access token locally and return its claims.
+    Verified claims are cached by token hash until the token's `exp`,
+    so repeat calls with the same token skip the signature check.
+    :param token: the raw bearer JWT
+    :return the token claims:
+    """
+    now = time.time()
+    key = _token_key(token)
+    cached = _claims_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    try:
+        claims = jwt.decode(
+            token,
+            settings.JWT_SECRET,
+            algorithms=[settings.ALGORITHM],
+            audience=settings.JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.PyJWTError as e:
+        _claims_cache.pop(key, None)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid access token: {str(e)}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    _evict_expired(now)
+    _claims_cache[key] = (float(claims["exp"]), claims)
+    heapq.heappush(_expiry_heap, (float(claims["exp"]), key))
+    return claims
+
+
+def update_cached_claims(token: str, **changes: Any) -> None:
+    """
+    Overlay fresh profile data on a cached token's claims, so the caller
+    sees their own update before the token is refreshed. Only PROFILE_CLAIMS
+    are taken; the role and anything else in the token stay as signed.
+    """
+    cached = _claims_cache.get(_token_key(token))
+    if cached is not None:
+        cached[1].update({
+            key: value for key, value in changes.items() if key in PROFILE_CLAIMS and value is not None
+        })
+
+
+async def get_auth_context(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> AuthContext:
+    """
+    FastAPI dependency resolving the caller from the `Authorization` header.
+    The context is also kept on `request.state.auth` for the rest of the request.
+    """
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    claims = decode_access_token(credentials.credentials)
+    auth = AuthContext(
+        user_id=claims["sub"],
+        email=claims.get("email"),
+        phone=claims.get("phone"),
+        role=role_from_claims(claims),
+        user_metadata=claims.get("user_metadata") or {},
+        expires_at=claims["exp"],
+        access_token=credentials.credentials,
+    )
+    request.state.auth = auth
+    return auth
+
+
+async def get_admin_context(auth: AuthContext = Depends(get_auth_context)) -> AuthContext:
+    """
+    FastAPI dependency for admin-only routes: the caller, who must hold the
+    admin role in app_metadata; 403 for anyone else.
+    """
+    if auth.role != ADMIN_ROLE:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can do this.")
+    return auth
+
+
+async def get_metrics_access(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[AuthContext]:
+    """
+    FastAPI dependency for the metrics routes: admins only, like
+    get_admin_context, unless METRICS_PUBLIC opens them to anyone.
+    """
+    if settings.METRICS_PUBLIC:
+        return None
+    return await get_admin_context(await get_auth_context(request, credentials))
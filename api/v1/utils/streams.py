@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""
+Incremental CSV and NDJSON readers and writers for catalog imports and exports.
+
+The readers consume an async iterator of byte chunks, such as
+`request.stream()`, and yield one batch of parsed records per chunk, so an
+upload of any size is held in memory one chunk (plus one partial line) at
+a time. Each record is a (line number, row) pair where the row is a dict
+of field values, or a string describing why the record could not be
+parsed; only a stream that is not text at all raises StreamFormatError.
+
+The writers do the reverse for a batch of row dicts at a time, so a
+streamed response holds one encoded batch in memory.
+"""
+
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+# (line number, parsed row or the reason it could not be parsed)
+Record = Tuple[int, Union[Dict[str, Any], str]]
+
+# Content types of the supported formats, by format name
+FORMAT_CONTENT_TYPES = {
+    "csv": ("text/csv", "application/csv"),
+    "ndjson": ("application/x-ndjson", "application/ndjson", "application/jsonl"),
+}
+
+
+class StreamFormatError(ValueError):
+    """The stream cannot be read as lines of UTF-8 text."""
+
+
+def format_for(content_type: Optional[str]) -> Optional[str]:
+    """"text/csv; charset=utf-8" -> "csv"; None when the type is not supported."""
+    media_type = (content_type or "").partition(";")[0].strip().lower()
+    for name, content_types in FORMAT_CONTENT_TYPES.items():
+        if media_type in content_types:
+            return name
+    return None
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = settings.PRODUCT_IMPORT_MAX_LINE_BYTES
+) -> AsyncIterator[List[str]]:
+    """
+    Split a byte stream into lines, yielding the complete lines of each chunk.
+    A UTF-8 byte order mark is skipped and CRLF line ends are accepted.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_count = 0
+    try:
+        async for chunk in chunks:
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            pending = lines.pop()
+            if len(pending) > max_line_bytes:
+                raise StreamFormatError(f"Line {line_count + len(lines) + 1} is longer than {max_line_bytes} bytes.")
+            if lines:
+                line_count += len(lines)
+                yield [line[:-1] if line.endswith("\r") else line for line in lines]
+        pending += decoder.decode(b"", True)
+    except UnicodeDecodeError:
+        raise StreamFormatError(f"The upload is not valid UTF-8 after line {line_count}.") from None
+    if pending:
+        yield [pending[:-1] if pending.endswith("\r") else pending]
+
+
+async def read_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Record]]:
+    """One JSON object per line; blank lines are skipped."""
+    line_number = 0
+    async for lines in iter_lines(chunks):
+        records = []
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                records.append((line_number, f"Invalid JSON: {error}"))
+                continue
+            records.append((line_number, row if isinstance(row, dict) else "Expected a JSON object."))
+        if records:
+            yield records
+
+
+async def read_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Record]]:
+    """
+    A header row naming the fields, then one record per row. Empty cells are
+    left out of the row, so optional fields fall back to their defaults.
+    A quoted cell may span lines; the record is numbered by its first line.
+    """
+    header: Optional[List[str]] = None
+    line_number = 0
+    # physical lines of a record whose quoted cell continues on the next line
+    partial: List[str] = []
+    partial_start = quotes = 0
+    async for lines in iter_lines(chunks):
+        texts, starts = [], []
+        for line in lines:
+            line_number += 1
+            # a record is complete once its quotes are balanced
+            if partial:
+                partial.append(line)
+                quotes += line.count('"')
+                if quotes % 2:
+                    if sum(len(part) for part in partial) > settings.PRODUCT_IMPORT_MAX_LINE_BYTES:
+                        raise StreamFormatError(f"The quoted field opened on line {partial_start} is never closed.")
+                    continue
+                texts.append("\n".join(partial))
+                starts.append(partial_start)
+                partial = []
+            elif line and not line.isspace():
+                quotes = line.count('"')
+                if quotes % 2:
+                    partial, partial_start = [line], line_number
+                    continue
+                texts.append(line)
+                starts.append(line_number)
+
+        records = []
+        for start, values in zip(starts, csv.reader(texts)):
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                records.append((start, f"Expected {len(header)} fields, got {len(values)}."))
+                continue
+            records.append((start, {name: value for name, value in zip(header, values) if value != ""}))
+        if records:
+            yield records
+    if partial:
+        yield [(partial_start, "Unterminated quoted field.")]
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Written as they are by csv.writer (None as an empty cell)
+_CSV_NATIVE = frozenset({str, int, float, bool, type(None), Decimal, UUID})
+
+
+def _csv_value(value: Any):
+    if value.__class__ in _CSV_NATIVE:
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class NdjsonWriter:
+    """Encodes batches of rows as one JSON object per line."""
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = fields
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        if orjson is not None:
+            dumps, option = orjson.dumps, orjson.OPT_NON_STR_KEYS
+            return b"".join([dumps(row, default=_json_default, option=option) + b"\n" for row in rows])
+        return "".join([json.dumps(row, default=_json_default) + "\n" for row in rows]).encode()
+
+
+class CsvWriter:
+    """Encodes batches of rows as CSV, after a header row naming `fields`."""
+
+    media_type = "text/csv"
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = fields
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._write([self.fields])
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return self._write([[_csv_value(row[field]) for field in self.fields] for row in rows])
+
+
+WRITERS = {"csv": CsvWriter, "ndjson": NdjsonWriter}
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Copy user roles into app_metadata, where the API now reads them from.
+
+    python backfill_roles.py --dry-run
+    python backfill_roles.py --admin ops@example.com --admin 5f0c...-uuid
+
+Accounts created before the role moved out of user_metadata have no role
+in app_metadata and are treated as roleless (403 on merchant and admin
+routes). This walks every Supabase user with the service role and, for
+accounts without an app_metadata role:
+  - copies a buyer or merchant role from user_metadata;
+  - gives buyer to accounts with no or an unknown role there;
+  - never copies admin, which anyone could have set on themselves.
+Admins are named explicitly with --admin (email or user id) and are set
+to admin whatever their current role. Prints a summary as JSON and exits
+1 when any update failed or an --admin account was not found. Safe to
+run more than once.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import List
+
+from api.supabase.http_client import close_http_clients
+from api.supabase.supabase_admin import get_async_admin_client
+from api.v1.app.admin.managers.auth import AdminAuthManager
+from api.v1.app.models.enums import RoleType
+
+SELF_ASSIGNABLE_ROLES = {RoleType.buyer.value, RoleType.merchant.value}
+
+
+def target_role(user, admins: set) -> str:
+    """The role `user` should hold, or None when app_metadata already has the right one."""
+    current = (user.app_metadata or {}).get("role")
+    if user.id in admins or (user.email or "").lower() in admins:
+        return None if current == RoleType.admin.value else RoleType.admin.value
+    if current:
+        return None
+    claimed = (user.user_metadata or {}).get("role")
+    return claimed if claimed in SELF_ASSIGNABLE_ROLES else RoleType.buyer.value
+
+
+async def run(admins: List[str], dry_run: bool) -> dict:
+    admins = {admin.lower() for admin in admins}
+    summary = {"seen": 0, "updated": {}, "failed": [], "admins_not_found": []}
+    found = set()
+    admin_api = await get_async_admin_client()
+    try:
+        async for users in AdminAuthManager.iter_users():
+            for user in users:
+                summary["seen"] += 1
+                found.update({user.id, (user.email or "").lower()} & admins)
+                role = target_role(user, admins)
+                if role is None:
+                    continue
+                if not dry_run:
+                    try:
+                        await admin_api.update_user_by_id(user.id, {"app_metadata": {"role": role}})
+                    except Exception as e:
+                        summary["failed"].append({"user_id": user.id, "error": str(e)})
+                        continue
+                summary["updated"][role] = summary["updated"].get(role, 0) + 1
+    finally:
+        await close_http_clients()
+    summary["admins_not_found"] = sorted(admins - found)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--admin", action="append", default=[], help="email or user id to make admin, repeatable")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+    summary = asyncio.run(run(args.admin, args.dry_run))
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary["failed"] or summary["admins_not_found"] else 0)
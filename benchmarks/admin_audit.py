@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Admin audit log cost per admin call: buffered batch writes vs an insert per action.
+
+Reports microseconds added to each audited call and entries written per second:
+  - record: AuditLog.record alone, what an admin call pays, no database;
+  - batched: --entries records drained by the background writer into the
+    database in DATABASE_URL (migrations applied), AUDIT_LOG_BATCH_SIZE per insert;
+  - inline: the same entries inserted and committed one by one, as writing
+    the audit row inside each admin call would.
+
+    python -m benchmarks.admin_audit --entries 20000
+    python -m benchmarks.admin_audit --record-only
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from api.v1.app.admin.managers.audit import AuditLog
+from api.v1.app.admin.models.audit_model import admin_audit_log
+from api.v1.app.admin.models.enums import AuditAction
+from api.v1.database.db import AsyncSessionLocal
+from api.v1.utils.config import settings
+
+
+def report(label, entries, seconds):
+    print(f"{label:<8} {entries:>8} entries {seconds:>8.3f}s {seconds / entries * 1e6:>10.2f} us/entry "
+          f"{entries / seconds:>12,.0f} entries/s")
+
+
+def record_only(entries):
+    # Never started: entries pile up in memory and nothing is written.
+    log = AuditLog(entries + 1, 3600, entries)
+    actor = str(uuid.uuid4())
+    start = time.perf_counter()
+    for n in range(entries):
+        log.record(AuditAction.update_user, actor, f"user-{n}", details={"role": "buyer"})
+    report("record", entries, time.perf_counter() - start)
+
+
+async def batched(entries):
+    log = AuditLog(settings.AUDIT_LOG_BATCH_SIZE, settings.AUDIT_LOG_FLUSH_SECONDS, entries)
+    log.start(AsyncSessionLocal)
+    actor = str(uuid.uuid4())
+    start = time.perf_counter()
+    for n in range(entries):
+        log.record(AuditAction.update_user, actor, f"user-{n}", details={"role": "buyer"})
+        if n % settings.AUDIT_LOG_BATCH_SIZE == 0:
+            # Let the writer run, as it would between requests.
+            await asyncio.sleep(0)
+    await log.stop()
+    report("batched", log.written, time.perf_counter() - start)
+
+
+async def inline(entries):
+    actor = str(uuid.uuid4())
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for n in range(entries):
+            await db.execute(admin_audit_log.insert().values(
+                actor_id=actor, action=AuditAction.update_user.value, target=f"user-{n}",
+                succeeded=True, details={"role": "buyer"},
+            ))
+            await db.commit()
+    report("inline", entries, time.perf_counter() - start)
+
+
+async def main(entries, run_database):
+    record_only(entries)
+    if not run_database:
+        return
+    await batched(entries)
+    await inline(entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--record-only", action="store_true", help="skip the database runs")
+    args = parser.parse_args()
+    asyncio.run(main(args.entries, not args.record_only))
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Bulk admin operations against a local stub GoTrue admin API.
+
+Runs bulk invite, delete and metadata update for `--items` users at
+concurrency 1, 16 and 64 and reports ops/sec for each.
+
+    python -m benchmarks.admin_bulk --items 500 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from .stub_gotrue import StubGoTrue, STUB_ANON_KEY, STUB_JWT_SECRET
+
+
+async def main(items, latency, levels):
+    with StubGoTrue(latency=latency) as stub:
+        os.environ["SUPABASE_URL"] = stub.url
+        os.environ["SUPABASE_KEY"] = STUB_ANON_KEY
+        os.environ["SUPABASE_SERVICE_KEY"] = STUB_ANON_KEY
+        os.environ.setdefault("JWT_SECRET", STUB_JWT_SECRET)
+
+        from api.v1.app.admin.managers.auth import AdminAuthManager
+        from api.v1.app.admin.schemas.requests.admin import AdminBulkUpdateItem
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        emails = [f"invitee{i}@example.com" for i in range(items)]
+        user_ids = [str(uuid.uuid4()) for _ in range(items)]
+        updates = [
+            AdminBulkUpdateItem(user_id=user_id, user_data={
+                "first_name": "Bulk", "last_name": "User", "email": f"bulk{i}@example.com",
+                "phone": "+2348000000000", "role": "buyer", "location": "Lagos",
+            })
+            for i, user_id in enumerate(user_ids)
+        ]
+        actor_id = str(uuid.uuid4())
+        operations = {
+            "invite": lambda c: AdminAuthManager.bulk_invite_users(emails, actor_id, concurrency=c),
+            "delete": lambda c: AdminAuthManager.bulk_delete_users(user_ids, actor_id, concurrency=c),
+            "update": lambda c: AdminAuthManager.bulk_update_users(updates, actor_id, concurrency=c),
+        }
+
+        await operations["invite"](4)  # warm the client and connection pool
+        print(f"{items} items per call, stub latency {latency * 1000:.0f}ms")
+        print(f"{'operation':<10} " + " ".join(f"{'c=' + str(level):>12}" for level in levels) + "   (ops/sec)")
+        for name, run in operations.items():
+            rates = []
+            for level in levels:
+                start = time.perf_counter()
+                summary = await run(level)
+                elapsed = time.perf_counter() - start
+                assert summary["failed"] == 0, summary["results"][:3]
+                rates.append(items / elapsed)
+            print(f"{name:<10} " + " ".join(f"{rate:>12.1f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub round trip in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.latency, args.concurrency))
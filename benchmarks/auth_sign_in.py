@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Concurrent sign-in benchmark against a local stub GoTrue server.
+
+Compares the old behaviour (the sync Supabase client called from a
+coroutine, which blocks the event loop) with AuthManager's async path.
+
+    python -m benchmarks.auth_sign_in --concurrency 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from .stub_gotrue import StubGoTrue, STUB_ANON_KEY, STUB_JWT_SECRET
+
+
+def _configure_env(stub_url):
+    os.environ["SUPABASE_URL"] = stub_url
+    os.environ["SUPABASE_KEY"] = STUB_ANON_KEY
+    os.environ["SUPABASE_SERVICE_KEY"] = STUB_ANON_KEY
+    os.environ.setdefault("JWT_SECRET", STUB_JWT_SECRET)
+
+
+async def _run(label, sign_in, concurrency):
+    credentials = [
+        {"email": f"user{i}@example.com", "hashed_password": "Password1!"}
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(sign_in(c) for c in credentials))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {concurrency:>5} sign-ins in {elapsed:7.3f}s  -> {concurrency / elapsed:9.1f} req/s")
+
+
+async def main(concurrency, latency):
+    with StubGoTrue(latency=latency) as stub:
+        _configure_env(stub.url)
+
+        from supabase import create_client
+        from supabase.lib.client_options import ClientOptions
+        from api.v1.app.managers.auth import AuthManager
+        logging.getLogger("api").setLevel(logging.WARNING)
+
+        sync_client = create_client(
+            stub.url, STUB_ANON_KEY, options=ClientOptions(auto_refresh_token=False, persist_session=False)
+        )
+
+        async def blocking_sign_in(credentials):
+            return sync_client.auth.sign_in_with_password(
+                {"email": credentials["email"], "password": credentials["hashed_password"]}
+            )
+
+        # Warm both clients so connection setup is not part of the measurement.
+        await blocking_sign_in({"email": "warm@example.com", "hashed_password": "x"})
+        await AuthManager.sign_in_user_with_passwd_and_email({"email": "warm@example.com", "hashed_password": "x"})
+
+        print(f"stub GoTrue latency: {latency * 1000:.0f}ms")
+        await _run("sync client (blocking)", blocking_sign_in, concurrency)
+        await _run("AuthManager (async)", AuthManager.sign_in_user_with_passwd_and_email, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub round trip in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.latency))
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Bytes on the wire and CPU per request of product pages through CompressionMiddleware.
+
+Encodes product pages of several sizes the way the app does, sends them
+through the middleware at each gzip level and reports the body size, the
+compression ratio and the process CPU time spent per response.
+
+    python -m benchmarks.compression --items 20 100 1000 --levels 1 6 9
+"""
+
+import argparse
+import asyncio
+import time
+
+from api.v1.utils.compression import CompressionMiddleware
+from api.v1.utils.responses import ORJSONResponse
+
+from .json_responses import product_page
+
+
+async def _send_through(app, accept_encoding):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/products", "headers": [(b"accept-encoding", accept_encoding)]}
+    await app(scope, receive, send)
+    return sum(len(message.get("body", b"")) for message in sent if message["type"] == "http.response.body")
+
+
+async def main(sizes, levels, rounds):
+    print(f"mean of {rounds} responses, cpu is process time per response")
+    print(f"{'items':>6} {'level':>6} {'bytes':>9} {'ratio':>7} {'cpu us':>9}")
+    for items in sizes:
+        body = ORJSONResponse(product_page(items)).body
+
+        async def endpoint(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+
+        for level in ["off", *levels]:
+            app = CompressionMiddleware(endpoint, level=level) if level != "off" else endpoint
+            encoding = b"gzip" if level != "off" else b"identity"
+            start = time.process_time()
+            for _ in range(rounds):
+                size = await _send_through(app, encoding)
+            cpu = (time.process_time() - start) / rounds * 1_000_000
+            print(f"{items:>6} {level:>6} {size:>9} {len(body) / size:>6.1f}x {cpu:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.levels, args.rounds))
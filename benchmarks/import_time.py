@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Cold-start import cost of the app, the part every worker and test process pays.
+
+Imports `main` in fresh interpreters under `python -X importtime`, reports
+the median total and the modules with the most self time. With --baseline
+the same is measured on another revision, checked out into a temporary
+git worktree, for a before/after comparison.
+
+    python -m benchmarks.import_time --runs 5 --baseline HEAD~1
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from .stub_gotrue import STUB_ANON_KEY, STUB_JWT_SECRET
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def _env():
+    env = dict(os.environ)
+    # Older revisions build Supabase clients at import, which needs a url and a well-formed key.
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    env.setdefault("SUPABASE_KEY", STUB_ANON_KEY)
+    env.setdefault("SUPABASE_SERVICE_KEY", STUB_ANON_KEY)
+    env.setdefault("JWT_SECRET", STUB_JWT_SECRET)
+    env.setdefault("DB_HOST", "127.0.0.1")
+    env.setdefault("DB_PORT", "5432")
+    return env
+
+
+def measure(cwd, runs):
+    """Median total and per-module self time in ms over `runs` cold imports."""
+    totals, self_times = [], {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=cwd, env=_env(), capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise SystemExit(result.stderr.strip().splitlines()[-1])
+        for line in result.stderr.splitlines():
+            match = LINE.match(line)
+            if not match:
+                continue
+            own, cumulative, _, module = match.groups()
+            self_times.setdefault(module, []).append(int(own) / 1000)
+            if module == "main":
+                totals.append(int(cumulative) / 1000)
+    return statistics.median(totals), {module: statistics.median(times) for module, times in self_times.items()}
+
+
+def _report(label, total, self_times, top):
+    print(f"{label}: import main {total:8.1f} ms")
+    for module, ms in sorted(self_times.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {ms:8.1f} ms  {module}")
+
+
+def main(runs, baseline, top):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    total, self_times = measure(root, runs)
+    _report("working tree", total, self_times, top)
+    if baseline:
+        with tempfile.TemporaryDirectory() as scratch:
+            worktree = os.path.join(scratch, "baseline")
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, baseline], cwd=root, check=True, capture_output=True)
+            try:
+                base_total, base_self_times = measure(worktree, runs)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=root, capture_output=True)
+        _report(baseline, base_total, base_self_times, top)
+        print(f"saved per worker: {base_total - total:.1f} ms ({(base_total - total) / base_total:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--top", type=int, default=10, help="modules listed by self time")
+    args = parser.parse_args()
+    main(args.runs, args.baseline, args.top)
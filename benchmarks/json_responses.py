@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Response encoding cost of a 1k-item product page: JSONResponse vs ORJSONResponse.
+
+Runs the same steps FastAPI takes after a handler returns (response_model
+validation and serialization, or jsonable_encoder without one) followed by
+the response class render, and reports the mean time per response.
+
+    python -m benchmarks.json_responses --items 1000 --rounds 50
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from api.v1.app.models.enums import ProductStatus
+from api.v1.app.schemas.responses.product import ProductPage
+from api.v1.utils.responses import ORJSONResponse
+
+
+def product_page(items):
+    now = datetime(2026, 1, 1)
+    seller = uuid.uuid4()
+    return {
+        "items": [
+            {
+                "id": i, "name": f"Product {i}", "description": f"leather wireless item {i} " * 4,
+                "price": Decimal(i % 1000) / 100, "quantity": i % 100, "category": "phones",
+                "photo_url": "https://example.com/p.png", "user_id": seller, "user_store_id": 1,
+                "status": ProductStatus.available, "created_at": now - timedelta(seconds=i),
+                "updated_at": None,
+            }
+            for i in range(items)
+        ],
+        "next_cursor": "eyJjIjoiMjAyNi0wMS0wMVQwMDowMDowMCIsImkiOjF9",
+    }
+
+
+async def _mean_ms(rounds, encode):
+    await encode()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = await encode()
+    return (time.perf_counter() - start) / rounds * 1000, len(body)
+
+
+async def main(items, rounds):
+    page = product_page(items)
+    field = create_model_field(name="Response_list_products", type_=ProductPage, mode="serialization")
+
+    async def with_model(response_class):
+        content = await serialize_response(field=field, response_content=page, is_coroutine=True)
+        return response_class(content).body
+
+    async def without_model(response_class):
+        return response_class(jsonable_encoder(page)).body
+
+    print(f"{items} products per response, mean of {rounds} rounds")
+    print(f"{'path':<22} {'JSONResponse':>14} {'ORJSONResponse':>16} {'bytes':>9}")
+    for name, encode in (("response_model", with_model), ("jsonable_encoder", without_model)):
+        stdlib, size = await _mean_ms(rounds, lambda: encode(JSONResponse))
+        fast, _ = await _mean_ms(rounds, lambda: encode(ORJSONResponse))
+        print(f"{name:<22} {stdlib:>11.2f} ms {fast:>13.2f} ms {size:>9}")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = ORJSONResponse(page).body
+    direct = (time.perf_counter() - start) / rounds * 1000
+    print(f"{'ORJSONResponse(dict)':<22} {'':>14} {direct:>13.2f} ms {len(body):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.rounds))
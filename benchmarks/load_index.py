@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""
+wrk-style load test of GET / against server.py with one worker and with several.
+
+Starts server.py on a free port for each worker count, then keeps
+`--connections` keep-alive connections busy for `--duration` seconds from
+`--clients` load generator processes and reports requests/sec and latency
+percentiles for each run.
+
+    python -m benchmarks.load_index --workers 1 4 --connections 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from .stub_gotrue import STUB_ANON_KEY, STUB_JWT_SECRET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUEST = b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(server, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(REQUEST)
+                if sock.recv(64).startswith(b"HTTP/1.1 200"):
+                    return
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"server on port {port} did not come up:\n{server.stderr.read().decode()}")
+
+
+async def _connection(port, stop_at, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    errors = 0
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        writer.write(REQUEST)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        await reader.readexactly(length)
+        if not head.startswith(b"HTTP/1.1 200"):
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    return errors
+
+
+def _client(port, connections, duration, queue):
+    latencies = []
+
+    async def run():
+        stop_at = time.perf_counter() + duration
+        return sum(await asyncio.gather(*(_connection(port, stop_at, latencies) for _ in range(connections))))
+
+    errors = asyncio.run(run())
+    queue.put((latencies, errors))
+
+
+def load(port, connections, duration, clients):
+    queue = multiprocessing.Queue()
+    per_client = [connections // clients + (i < connections % clients) for i in range(clients)]
+    procs = [
+        multiprocessing.Process(target=_client, args=(port, count, duration, queue))
+        for count in per_client if count
+    ]
+    for proc in procs:
+        proc.start()
+    latencies, errors = [], 0
+    for _ in procs:
+        part, part_errors = queue.get()
+        latencies.extend(part)
+        errors += part_errors
+    for proc in procs:
+        proc.join()
+    latencies.sort()
+    return latencies, errors
+
+
+def main(worker_counts, connections, duration, clients):
+    # GET / touches neither the database nor Supabase, the settings only need to parse.
+    env = dict(
+        os.environ,
+        DB_HOST=os.environ.get("DB_HOST", "127.0.0.1"),
+        DB_PORT=os.environ.get("DB_PORT", "5432"),
+        SUPABASE_URL="http://127.0.0.1:9",
+        SUPABASE_KEY=STUB_ANON_KEY,
+        SUPABASE_SERVICE_KEY=STUB_ANON_KEY,
+        JWT_SECRET=os.environ.get("JWT_SECRET", STUB_JWT_SECRET),
+    )
+    print(f"GET /  {connections} connections, {clients} client processes, {duration}s per run, cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in worker_counts:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        try:
+            _wait_until_up(server, port)
+            load(port, min(connections, 8), 1, 1)  # warm every worker
+            latencies, errors = load(port, connections, duration, clients)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"{workers:>8} {len(latencies) / duration:>10.0f} {p50:>8.2f} {p99:>8.2f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    args = parser.parse_args()
+    main(args.workers, args.connections, args.duration, args.clients)
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Logging overhead per request: the queued JSON pipeline vs synchronous basicConfig logging.
+
+Serves --requests requests, --concurrency at a time, in-process (httpx
+ASGITransport, no network), from a route that logs one success message
+and --records more per request, and prints per-request p50/p99 latency for:
+  - off: log level WARNING, nothing is written;
+  - sync: logging.basicConfig on the sink with f-string messages, as the
+    auth modules used to do;
+  - queued: configure_logging on the sink, %-style messages, the success
+    message sampled at LOG_SUCCESS_SAMPLE_RATE.
+The sink sleeps --write-latency-us per write, standing in for a stdout
+pipe that is slow to drain (a log shipper, a busy terminal).
+
+    python -m benchmarks.logging_overhead --requests 5000 --write-latency-us 100
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from api.v1.utils import logs
+
+logger = logging.getLogger("api.benchmark")
+
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return len(text)
+
+
+def build_app(records, eager):
+    app = FastAPI()
+    app.add_middleware(logs.RequestContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        for n in range(records):
+            if eager:
+                logger.info(f"Loaded part {n} of item {item_id}")
+            else:
+                logger.info("Loaded part %d of item %d", n, item_id)
+        if eager:
+            logger.info("AuthManager.get_item successful.")
+        else:
+            logger.info("AuthManager.%s successful.", "get_item", extra={"sampled": True})
+        return {"id": item_id}
+
+    return app
+
+
+def configure(mode, sink):
+    logs.stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    if mode == "queued":
+        logs.configure_logging(stream=sink, force=True)
+        return
+    logging.basicConfig(stream=sink, level=logging.WARNING if mode == "off" else logging.INFO, force=True)
+
+
+async def run(mode, requests, concurrency, records, write_latency):
+    sink = SlowSink(write_latency)
+    configure(mode, sink)
+    app = build_app(records, eager=mode != "queued")
+    timings = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/items/0")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(n):
+            async with semaphore:
+                start = time.perf_counter()
+                await client.get(f"/items/{n}")
+                timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(requests)))
+        elapsed = time.perf_counter() - start
+    logs.stop_logging()
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{mode:<7} {requests / elapsed:>9,.0f} req/s  p50 {statistics.median(ordered) * 1000:>7.2f}ms  "
+          f"p99 {p99 * 1000:>7.2f}ms  {sink.writes:>7} lines written")
+
+
+async def main(requests, concurrency, records, write_latency):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    print(f"{records + 1} records per request, {write_latency * 1e6:.0f}us per write")
+    for mode in ("off", "sync", "queued"):
+        await run(mode, requests, concurrency, records, write_latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--records", type=int, default=2, help="unsampled records per request, besides the success one")
+    parser.add_argument("--write-latency-us", type=float, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.records, args.write_latency_us / 1e6))
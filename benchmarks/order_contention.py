@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Flash-sale contention: N concurrent buyers ordering one hot SKU.
+
+Creates a product with `--stock` units in the database from DATABASE_URL
+(migrations applied), fires `--buyers` concurrent OrderManager.create_order
+calls for one unit each, then checks that exactly `--stock` orders went
+through and the product never went below zero.
+
+    python -m benchmarks.order_contention --buyers 2000 --stock 500
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+import sqlalchemy
+from fastapi import HTTPException
+
+from api.v1.app.managers.order_manager import OrderManager
+from api.v1.app.models.order_model import order, order_item
+from api.v1.app.models.product_model import product
+from api.v1.app.schemas.requests.order import OrderCreate
+from api.v1.database.db import AsyncSessionLocal, async_engine
+from api.v1.utils.security import AuthContext
+
+
+async def seed(stock):
+    """Create a seller, a store, a hot product and a buyer; return (product_id, buyer_id)."""
+    seller_id, buyer_id = uuid.uuid4(), uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        for user_id, role in ((seller_id, "merchant"), (buyer_id, "buyer")):
+            await db.execute(sqlalchemy.text(
+                "INSERT INTO users (id, first_name, last_name, email, hashed_password, location, role, is_active) "
+                "VALUES (:id, 'Bench', 'User', :email, 'x', 'Lagos', :role, true)"
+            ), {"id": user_id, "email": f"bench-{user_id}@example.com", "role": role})
+        store_id = (await db.execute(sqlalchemy.text(
+            "INSERT INTO stores (photo_url, amount, status, owner_id) "
+            "VALUES ('https://example.com/s.png', 0, 'active', :owner) RETURNING id"
+        ), {"owner": seller_id})).scalar()
+        product_id = (await db.execute(
+            product.insert().values(
+                name="Flash sale sneakers", photo_url="https://example.com/p.png", quantity=stock,
+                amount=49.99, category="shoes", user_id=seller_id, user_store_id=store_id,
+            ).returning(product.c.id)
+        )).scalar()
+        await db.commit()
+    return product_id, buyer_id
+
+
+async def buy(product_id, auth, outcomes):
+    async with AsyncSessionLocal() as db:
+        try:
+            await OrderManager.create_order(
+                db, auth, OrderCreate(items=[{"product_id": product_id, "quantity": 1}])
+            )
+            outcomes["ordered"] += 1
+        except HTTPException as e:
+            outcomes[f"http {e.status_code}"] += 1
+
+
+async def main(buyers, stock):
+    product_id, buyer_id = await seed(stock)
+    auth = AuthContext(user_id=str(buyer_id), role="buyer", expires_at=time.time() + 3600, access_token="")
+    outcomes = Counter()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(buy(product_id, auth, outcomes) for _ in range(buyers)))
+    elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as db:
+        remaining = await db.scalar(sqlalchemy.select(product.c.quantity).where(product.c.id == product_id))
+        sold = await db.scalar(
+            sqlalchemy.select(sqlalchemy.func.coalesce(sqlalchemy.func.sum(order_item.c.quantity), 0))
+            .where(order_item.c.product_id == product_id)
+        )
+        orders = await db.scalar(
+            sqlalchemy.select(sqlalchemy.func.count()).select_from(order).where(order.c.buyer_id == buyer_id)
+        )
+    await async_engine.dispose()
+
+    print(f"buyers={buyers} stock={stock} pool={async_engine.pool.size()} elapsed={elapsed:.2f}s")
+    print(f"throughput: {buyers / elapsed:.1f} attempts/s, {outcomes['ordered'] / elapsed:.1f} orders/s")
+    print(f"outcomes: {dict(outcomes)}")
+    print(f"orders={orders} units sold={sold} remaining stock={remaining}")
+    oversold = sold > stock or remaining < 0 or sold + remaining != stock
+    print("oversell: NONE" if not oversold else "oversell: DETECTED")
+    return 1 if oversold else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--buyers", type=int, default=2000)
+    parser.add_argument("--stock", type=int, default=500)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.buyers, args.stock)))
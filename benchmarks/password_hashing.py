@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Password verification throughput: inline bcrypt vs the hashing process pool.
+
+Runs `--logins` verifications at the configured BCRYPT_ROUNDS, first inline
+on the event loop (what a sync call from an async route does), then through
+averify_password, and reports logins/sec overall and per core. Also checks
+that a hash with an outdated cost is upgraded on login.
+
+    python -m benchmarks.password_hashing --logins 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from passlib.context import CryptContext
+
+from api.v1.utils.config import settings
+from api.v1.utils.hashing import averify_password, get_password_hash, shutdown_hash_pool, verify_password
+
+PASSWORD = "Benchmark1!"
+
+
+async def main(logins):
+    workers = settings.HASH_WORKERS
+    stored = get_password_hash(PASSWORD)
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS} pool workers={workers} cpu_count={os.cpu_count()}")
+
+    start = time.perf_counter()
+    for _ in range(logins):
+        verify_password(PASSWORD, stored)
+    inline = logins / (time.perf_counter() - start)
+    print(f"inline on the loop : {inline:8.1f} logins/s  ({inline:.1f} per core, loop blocked throughout)")
+
+    # Warm the pool so process start-up is not measured.
+    await asyncio.gather(*(averify_password(PASSWORD, stored) for _ in range(workers)))
+    batch = min(logins, settings.HASH_QUEUE_LIMIT)
+    start = time.perf_counter()
+    for done in range(0, logins, batch):
+        await asyncio.gather(*(averify_password(PASSWORD, stored) for _ in range(min(batch, logins - done))))
+    pooled = logins / (time.perf_counter() - start)
+    print(f"process pool       : {pooled:8.1f} logins/s  ({pooled / workers:.1f} per core)")
+
+    outdated = CryptContext(schemes=["bcrypt"], bcrypt__rounds=max(4, settings.BCRYPT_ROUNDS - 2)).hash(PASSWORD)
+    upgraded = []
+
+    async def store(new_hash):
+        upgraded.append(new_hash)
+
+    await averify_password(PASSWORD, outdated, on_rehash=store)
+    print(f"rehash on login    : {'upgraded to ' + upgraded[0][:7] if upgraded else 'NOT upgraded'}")
+    shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Product read latency: cache hit vs a database round trip.
+
+Uses the products seeded by benchmarks.product_listing in the database in
+DATABASE_URL. Times get_product and the first catalog page with the product
+cache disabled and then on the hit path, prints p50/p99 for each, and checks
+that concurrent misses on one key are served by a single load.
+
+    python -m benchmarks.product_cache --samples 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import sqlalchemy
+
+from api.v1.app.managers.product_manager import ProductManager, product_cache
+from api.v1.app.models.product_model import product
+from api.v1.database.db import AsyncSessionLocal
+
+
+async def _timed(samples, call):
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+async def main(samples, concurrency):
+    async with AsyncSessionLocal() as db:
+        product_id = await db.scalar(sqlalchemy.select(sqlalchemy.func.max(product.c.id)))
+        if product_id is None:
+            raise SystemExit("products is empty, seed it with benchmarks.product_listing first")
+
+        reads = {
+            "get_product": lambda: ProductManager.get_product(db, product_id),
+            "list_products": lambda: ProductManager.list_products(db, limit=20),
+        }
+        print(f"{samples} samples per row")
+        print(f"{'read':<14} {'path':<10} {'p50 ms':>9} {'p99 ms':>9}")
+        for name, read in reads.items():
+            product_cache.enabled = False
+            p50, p99 = await _timed(samples, read)
+            print(f"{name:<14} {'database':<10} {p50:>9.3f} {p99:>9.3f}")
+            product_cache.enabled = True
+            await read()
+            p50, p99 = await _timed(samples, read)
+            print(f"{name:<14} {'cache hit':<10} {p50:>9.3f} {p99:>9.3f}")
+
+        await product_cache.invalidate(product_cache.key("item", product_id))
+        misses = product_cache.misses
+        await asyncio.gather(*(ProductManager.get_product(db, product_id) for _ in range(concurrency)))
+        print(f"{concurrency} concurrent misses on one key -> {product_cache.misses - misses} database load(s)")
+        print(product_cache.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.samples, args.concurrency))
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+"""
+Catalog export throughput and memory: streamed cursor batches vs one materialized result.
+
+Encoding alone (no database) is measured on synthetic rows. With a
+database in DATABASE_URL (seed it with benchmarks.product_listing first),
+the whole catalog is then exported twice and rows/sec and peak Python
+memory (tracemalloc) are printed for each:
+  - streamed: ProductManager.export_products, encoding batch by batch as
+    GET /products/export does;
+  - materialized: the same query fetched with .all() and encoded at once,
+    as building the export on list_products pages would end up doing.
+
+    python -m benchmarks.product_export --format ndjson
+    python -m benchmarks.product_export --format csv --encode-only
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+import tracemalloc
+import uuid
+
+import sqlalchemy
+
+from api.v1.app.managers.product_manager import EXPORT_COLUMNS, ProductManager
+from api.v1.app.models.enums import ProductStatus, StoreStatus
+from api.v1.app.models.product_model import product
+from api.v1.app.models.store import store
+from api.v1.database.db import AsyncSessionLocal
+from api.v1.utils.streams import WRITERS
+
+FIELDS = [column.name for column in EXPORT_COLUMNS]
+
+
+def synthetic_rows(count):
+    now = datetime.datetime.utcnow()
+    owner = uuid.uuid4()
+    return [{
+        "id": n, "name": f"Product {n}", "description": f"item number {n}, in stock",
+        "photo_url": "https://example.com/p.png", "quantity": n % 100, "category": "shoes",
+        "created_at": now, "updated_at": None, "status": ProductStatus.available, "user_id": owner,
+        "user_store_id": 1, "sku": f"SKU-{n}", "price": (n % 100000) / 100,
+        "store_description": "Store", "store_photo_url": "https://example.com/s.png",
+        "store_speciality": "general", "store_status": StoreStatus.active, "store_owner_id": owner,
+    } for n in range(count)]
+
+
+def encode_only(export_format, batch_size, batches):
+    writer = WRITERS[export_format](FIELDS)
+    rows = synthetic_rows(batch_size)
+    start = time.perf_counter()
+    size = sum(len(writer.encode(rows)) for _ in range(batches))
+    elapsed = time.perf_counter() - start
+    print(f"encode {export_format}: {batch_size * batches / elapsed:,.0f} rows/s, {size / elapsed / 1e6:.1f} MB/s")
+
+
+async def measure(label, export):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows, size = await export()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<13} {rows:>9} rows {elapsed:>7.2f}s {rows / elapsed:>10,.0f} rows/s "
+          f"{size / 1e6:>8.1f} MB out, peak {peak / 1e6:>8.1f} MB")
+
+
+async def main(export_format, batch_size, run_database):
+    encode_only(export_format, batch_size, 50)
+    if not run_database:
+        return
+
+    async def streamed():
+        writer = WRITERS[export_format](FIELDS)
+        rows = size = 0
+        async with AsyncSessionLocal() as db:
+            async for batch in ProductManager.export_products(db, batch_size=batch_size):
+                rows += len(batch)
+                size += len(writer.encode(batch))
+        return rows, size
+
+    async def materialized():
+        writer = WRITERS[export_format](FIELDS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(sqlalchemy.select(*EXPORT_COLUMNS).select_from(
+                product.join(store, product.c.user_store_id == store.c.id)
+            ))
+            batch = [dict(row) for row in result.mappings().all()]
+        return len(batch), len(writer.encode(batch))
+
+    await measure("streamed", streamed)
+    await measure("materialized", materialized)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--format", choices=list(WRITERS), default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--encode-only", action="store_true", help="skip the database runs")
+    args = parser.parse_args()
+    asyncio.run(main(args.format, args.batch_size, not args.encode_only))
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Bulk product import throughput: COPY and a set-based upsert vs row-by-row inserts.
+
+Generates a CSV catalog of --rows products on the fly (every other row
+carries a sku), then reports rows/sec for:
+  - parse: read_csv and ProductCreate validation alone, no database;
+  - import: ProductManager.import_products into a fresh store of the
+    database in DATABASE_URL (run the Alembic migrations first), once as
+    a load and once again as an update of the same skus;
+  - row by row: ProductManager.create_product for the first --row-sample
+    rows, one statement and commit each, as POST /products does.
+
+    python -m benchmarks.product_import --rows 100000
+    python -m benchmarks.product_import --rows 1000000 --row-sample 10000
+    python -m benchmarks.product_import --rows 1000000 --parse-only
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import sqlalchemy
+
+from api.v1.app.managers.product_manager import ProductManager, product_cache
+from api.v1.app.schemas.requests.product import ProductCreate
+from api.v1.database.db import AsyncSessionLocal, SessionLocal
+from api.v1.utils.security import AuthContext
+from api.v1.utils.streams import read_csv
+
+CHUNK_SIZE = 1 << 16
+CATEGORIES = ["shoes", "bags", "phones", "books", "groceries", "fashion", "beauty", "home"]
+HEADER = "name,description,price,quantity,category,photo_url,user_store_id,sku,status\n"
+
+
+def catalog_rows(rows, store_id, start=1):
+    for n in range(start, start + rows):
+        sku = f"SKU-{n}" if n % 2 else ""
+        yield (f"Product {n},\"{CATEGORIES[n % 8]} item, number {n}\",{(n % 100000) / 100:.2f},{n % 100},"
+               f"{CATEGORIES[n % 8]},https://example.com/p.png,{store_id},{sku},available\n")
+
+
+async def catalog_chunks(rows, store_id):
+    """The catalog as upload-sized byte chunks, built as it is read."""
+    buffer = [HEADER]
+    size = len(HEADER)
+    for line in catalog_rows(rows, store_id):
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def report(label, rows, seconds):
+    print(f"{label:<28} {rows:>9} rows {seconds:>8.2f}s {rows / seconds:>12,.0f} rows/s")
+
+
+async def parse_only(rows):
+    start = time.perf_counter()
+    valid = 0
+    async for records in read_csv(catalog_chunks(rows, 1)):
+        for _, row in records:
+            ProductCreate.model_validate(row)
+            valid += 1
+    report("parse + validate", valid, time.perf_counter() - start)
+
+
+def seed_store():
+    """A benchmark merchant with one empty store."""
+    db = SessionLocal()
+    try:
+        user_id = uuid.uuid4()
+        db.execute(sqlalchemy.text(
+            "INSERT INTO users (id, first_name, last_name, email, hashed_password, location, role, is_active) "
+            "VALUES (:id, 'Bench', 'Seller', :email, 'x', 'Lagos', 'merchant', true)"
+        ), {"id": user_id, "email": f"bench-{user_id}@example.com"})
+        store_id = db.execute(sqlalchemy.text(
+            "INSERT INTO stores (photo_url, amount, status, owner_id) "
+            "VALUES ('https://example.com/s.png', 0, 'active', :owner) RETURNING id"
+        ), {"owner": user_id}).scalar()
+        db.commit()
+        return str(user_id), store_id
+    finally:
+        db.close()
+
+
+async def main(rows, row_sample, parse_only_run):
+    await parse_only(rows)
+    if parse_only_run:
+        return
+
+    product_cache.enabled = False
+    user_id, store_id = seed_store()
+    auth = AuthContext(user_id=user_id, role="merchant", expires_at=0, access_token="")
+    async with AsyncSessionLocal() as session:
+        for label in ("COPY + upsert, new rows", "COPY + upsert, updates"):
+            start = time.perf_counter()
+            result = await ProductManager.import_products(session, auth, read_csv(catalog_chunks(rows, store_id)))
+            report(label, rows, time.perf_counter() - start)
+            print(f"{'':<28} inserted {result['inserted']} updated {result['updated']} failed {result['failed']}")
+
+    user_id, store_id = seed_store()
+    auth = AuthContext(user_id=user_id, role="merchant", expires_at=0, access_token="")
+    sample = min(rows, row_sample)
+    async with AsyncSessionLocal() as session:
+        start = time.perf_counter()
+        async for records in read_csv(catalog_chunks(sample, store_id)):
+            for _, row in records:
+                await ProductManager.create_product(session, auth, ProductCreate.model_validate(row))
+        report("create_product row by row", sample, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--row-sample", type=int, default=5000,
+                        help="rows inserted one by one; rows/s extrapolates to the full catalog")
+    parser.add_argument("--parse-only", action="store_true", help="skip the database runs")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.row_sample, args.parse_only))
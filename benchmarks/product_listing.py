@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+"""
+Catalog listing latency by page depth: keyset cursor vs OFFSET.
+
+Seeds the `products` table of the database in DATABASE_URL (run the
+Alembic migrations first), then times ProductManager.list_products on the
+async engine at increasing page depths and prints p50/p99 per depth.
+OFFSET timings use the sync engine and are only there for comparison.
+
+    python -m benchmarks.product_listing --rows 1000000 --samples 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import sqlalchemy
+
+from api.v1.app.managers.product_manager import PRODUCT_COLUMNS, ProductManager
+from api.v1.app.models.product_model import product
+from api.v1.database.db import AsyncSessionLocal, SessionLocal
+from api.v1.utils.pagination import encode_cursor
+
+SEED_BATCH = 100_000
+CATEGORIES = "array['shoes','bags','phones','books','groceries','fashion','beauty','home']"
+WORDS = "array['red','blue','green','leather','cotton','wireless','organic','vintage']"
+
+
+def seed(db, rows):
+    """Insert `rows` products for one benchmark seller and store, in server-side batches."""
+    existing = db.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(product)).scalar()
+    if existing >= rows:
+        print(f"products already holds {existing} rows, skipping seed")
+        return
+
+    user_id = uuid.uuid4()
+    db.execute(sqlalchemy.text(
+        "INSERT INTO users (id, first_name, last_name, email, hashed_password, location, role, is_active) "
+        "VALUES (:id, 'Bench', 'Seller', :email, 'x', 'Lagos', 'merchant', true)"
+    ), {"id": user_id, "email": f"bench-{user_id}@example.com"})
+    store_id = db.execute(sqlalchemy.text(
+        "INSERT INTO stores (photo_url, amount, status, owner_id) "
+        "VALUES ('https://example.com/s.png', 0, 'active', :owner) RETURNING id"
+    ), {"owner": user_id}).scalar()
+
+    start = time.perf_counter()
+    for offset in range(existing, rows, SEED_BATCH):
+        db.execute(sqlalchemy.text(f"""
+            INSERT INTO products (name, description, photo_url, quantity, amount, category,
+                                  status, user_id, user_store_id, created_at)
+            SELECT 'Product ' || g,
+                   ({WORDS})[1 + g % 8] || ' ' || ({WORDS})[1 + (g / 8) % 8] || ' item ' || g,
+                   'https://example.com/p.png', g % 100, (g % 100000) / 100.0,
+                   ({CATEGORIES})[1 + g % 8], 'available', :user_id, :store_id,
+                   timezone('UTC', now()) - g * interval '1 second'
+            FROM generate_series(:first, :last) AS g
+        """), {"user_id": user_id, "store_id": store_id,
+               "first": offset + 1, "last": min(offset + SEED_BATCH, rows)})
+        db.commit()
+    db.execute(sqlalchemy.text("ANALYZE products"))
+    db.commit()
+    print(f"seeded {rows - existing} products in {time.perf_counter() - start:.1f}s")
+
+
+def cursor_at(db, depth, limit, **filters):
+    """Cursor that starts page `depth` (1-based), found once with OFFSET."""
+    if depth == 1:
+        return None
+    query = ProductManager._list_query(limit=limit, **filters).limit(1).offset((depth - 1) * limit - 1)
+    row = db.execute(query).mappings().first()
+    return encode_cursor(row["created_at"], row["id"]) if row else None
+
+
+def offset_query(depth, limit):
+    return (
+        sqlalchemy.select(*PRODUCT_COLUMNS)
+        .order_by(product.c.created_at.desc(), product.c.id.desc())
+        .limit(limit)
+        .offset((depth - 1) * limit)
+    )
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered) * 1000, p99 * 1000
+
+
+async def time_keyset(db, depth, limit, samples, **filters):
+    cursor = cursor_at(db, depth, limit, **filters)
+    timings = []
+    async with AsyncSessionLocal() as session:
+        for _ in range(samples):
+            start = time.perf_counter()
+            await ProductManager.list_products(session, limit=limit, cursor=cursor, **filters)
+            timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+def time_offset(db, depth, limit, samples):
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        db.execute(offset_query(depth, limit)).all()
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+async def main(rows, limit, samples, depths):
+    db = SessionLocal()
+    try:
+        seed(db, rows)
+        print(f"\n{'depth':>7} | {'keyset p50':>10} {'p99':>8} | {'OFFSET p50':>10} {'p99':>8} | {'search p50':>10} {'p99':>8}  (ms)")
+        for depth in depths:
+            if (depth - 1) * limit >= rows:
+                break
+            keyset = await time_keyset(db, depth, limit, samples)
+            offset = time_offset(db, depth, limit, samples)
+            search = await time_keyset(db, depth, limit, samples, q="leather")
+            print(f"{depth:>7} | {keyset[0]:>10.2f} {keyset[1]:>8.2f} | {offset[0]:>10.2f} {offset[1]:>8.2f}"
+                  f" | {search[0]:>10.2f} {search[1]:>8.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 100, 1000, 10000, 40000])
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.limit, args.samples, args.depths))
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+"""
+Seller dashboard latency: daily aggregates vs aggregating orders on every load.
+
+Seeds one seller with --products products and --orders orders spread over
+--days days (plus a share of completed and canceled ones) in the database
+from DATABASE_URL (migrations applied), rebuilds the aggregates with
+SalesManager.reconcile, checks that orders placed through OrderManager keep
+them exact, then times for ranges of 7, 30 and 365 days:
+  - SalesManager.seller_dashboard, reading seller_sales and seller_product_sales;
+  - the same totals and top products computed from orders and order_items.
+
+    python -m benchmarks.seller_dashboard --orders 1000000 --days 365 --samples 30
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import sqlalchemy
+
+from api.v1.app.managers.order_manager import OrderManager
+from api.v1.app.managers.sales_manager import SalesManager
+from api.v1.app.models.order_model import order, order_item
+from api.v1.app.models.product_model import product
+from api.v1.app.schemas.requests.order import OrderCreate
+from api.v1.database.db import AsyncSessionLocal
+from api.v1.utils.security import AuthContext
+
+SEED_BATCH = 50_000
+
+
+async def seed(products, orders, days):
+    """A seller with a store of products and a buyer with `orders` two-item orders; return (seller, buyer)."""
+    seller_id, buyer_id = uuid.uuid4(), uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        for user_id, role in ((seller_id, "merchant"), (buyer_id, "buyer")):
+            await db.execute(sqlalchemy.text(
+                "INSERT INTO users (id, first_name, last_name, email, hashed_password, location, role, is_active) "
+                "VALUES (:id, 'Bench', 'User', :email, 'x', 'Lagos', :role, true)"
+            ), {"id": user_id, "email": f"bench-{user_id}@example.com", "role": role})
+        store_id = (await db.execute(sqlalchemy.text(
+            "INSERT INTO stores (photo_url, amount, status, owner_id) "
+            "VALUES ('https://example.com/s.png', 0, 'active', :owner) RETURNING id"
+        ), {"owner": seller_id})).scalar()
+        first_product = (await db.execute(sqlalchemy.text("""
+            WITH created AS (
+                INSERT INTO products (name, photo_url, quantity, amount, category, status, user_id, user_store_id)
+                SELECT 'Product ' || g, 'https://example.com/p.png', 1000000, 1 + g % 50, 'general', 'available',
+                       :seller, :store
+                FROM generate_series(1, :products) AS g
+                RETURNING id
+            )
+            SELECT min(id) FROM created
+        """), {"seller": seller_id, "store": store_id, "products": products})).scalar()
+        start = time.perf_counter()
+        for offset in range(0, orders, SEED_BATCH):
+            await db.execute(sqlalchemy.text("""
+                WITH placed AS (
+                    INSERT INTO orders (amount, status, buyer_id, created_at)
+                    SELECT 0, (array['pending','processing','completed','completed','cancel']::orderstatus[])[1 + g % 5],
+                           :buyer, timezone('UTC', now()) - (g % :days) * interval '1 day'
+                    FROM generate_series(:first, :last) AS g
+                    RETURNING id
+                )
+                INSERT INTO order_items (order_id, product_id, quantity, unit_price)
+                SELECT placed.id, products.id, 1 + placed.id % 3, products.amount
+                FROM placed
+                CROSS JOIN generate_series(0, 1) AS k
+                JOIN products ON products.id = :first_product + (placed.id * 7 + k) % :products
+            """), {"buyer": buyer_id, "first_product": first_product, "days": days, "products": products,
+                   "first": offset + 1, "last": min(offset + SEED_BATCH, orders)})
+            await db.commit()
+        print(f"seeded {orders} orders in {time.perf_counter() - start:.1f}s")
+        await SalesManager.reconcile(db)
+    return seller_id, buyer_id
+
+
+async def on_the_fly(db, seller_id, start, end):
+    lines = order.join(order_item, order_item.c.order_id == order.c.id).join(
+        product, product.c.id == order_item.c.product_id
+    )
+    window = (
+        product.c.user_id == seller_id,
+        order.c.created_at >= datetime.combine(start, datetime.min.time()),
+        order.c.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        order.c.status.is_distinct_from("cancel"),
+    )
+    revenue = sqlalchemy.func.sum(order_item.c.quantity * order_item.c.unit_price)
+    await db.execute(
+        sqlalchemy.select(
+            sqlalchemy.cast(order.c.created_at, sqlalchemy.Date), sqlalchemy.func.count(sqlalchemy.distinct(order.c.id)),
+            sqlalchemy.func.sum(order_item.c.quantity), revenue,
+        ).select_from(lines).where(*window).group_by(sqlalchemy.cast(order.c.created_at, sqlalchemy.Date))
+    )
+    await db.execute(
+        sqlalchemy.select(order_item.c.product_id, revenue).select_from(lines).where(*window)
+        .group_by(order_item.c.product_id).order_by(revenue.desc()).limit(5)
+    )
+
+
+async def check_incremental(seller_id, buyer_id):
+    """Place, complete and cancel orders through OrderManager, then compare with a rebuild."""
+    buyer = AuthContext(user_id=str(buyer_id), role="buyer", expires_at=time.time() + 3600, access_token="")
+    seller = AuthContext(user_id=str(seller_id), role="merchant", expires_at=time.time() + 3600, access_token="")
+    async with AsyncSessionLocal() as db:
+        product_ids = (await db.scalars(
+            sqlalchemy.select(product.c.id).where(product.c.user_id == seller_id).limit(3)
+        )).all()
+        for n in range(30):
+            placed = await OrderManager.create_order(db, buyer, OrderCreate(items=[
+                {"product_id": product_ids[n % 3], "quantity": 1 + n % 2},
+                {"product_id": product_ids[(n + 1) % 3], "quantity": 1},
+            ]))
+            if n % 3 == 1:
+                await OrderManager.complete_order(db, buyer, placed["id"])
+            elif n % 3 == 2:
+                await OrderManager.cancel_order(db, buyer, placed["id"])
+        today = datetime.utcnow().date()
+        incremental = await SalesManager.seller_dashboard(db, seller, start=today, end=today)
+        await SalesManager.reconcile(db, since=today)
+        rebuilt = await SalesManager.seller_dashboard(db, seller, start=today, end=today)
+    same = incremental["totals"] == rebuilt["totals"] and incremental["top_products"] == rebuilt["top_products"]
+    print(f"incremental aggregates match a rebuild: {same}")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered) * 1000, p99 * 1000
+
+
+async def timed(samples, call):
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+async def main(products, orders, days, samples):
+    seller_id, buyer_id = await seed(products, orders, days)
+    await check_incremental(seller_id, buyer_id)
+    auth = AuthContext(user_id=str(seller_id), role="merchant", expires_at=time.time() + 3600, access_token="")
+    end = datetime.utcnow().date()
+    async with AsyncSessionLocal() as db:
+        print(f"{'days':>5} | {'aggregates p50':>14} {'p99':>8} | {'from orders p50':>15} {'p99':>8}  (ms)")
+        for span in (7, 30, 365):
+            start = end - timedelta(days=span - 1)
+            aggregates = await timed(samples, lambda: SalesManager.seller_dashboard(db, auth, start=start, end=end))
+            scanned = await timed(samples, lambda: on_the_fly(db, seller_id, start, end))
+            print(f"{span:>5} | {aggregates[0]:>14.2f} {aggregates[1]:>8.2f} | {scanned[0]:>15.2f} {scanned[1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--samples", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.orders, args.days, args.samples))
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""
+Store directory and store page latency, against the per-store query patterns they replace.
+
+Seeds `stores` and `products` of the database in DATABASE_URL (run the
+Alembic migrations first) with 10k active stores of 100 products each,
+then times, with the product cache off:
+  - a directory page from StoreManager.list_stores at several depths, vs
+    fetching the page and then counting each store's products one by one;
+  - a store page from StoreManager.get_store (one statement), vs fetching
+    the store and then its products in a second round trip.
+
+    python -m benchmarks.store_listing --stores 10000 --products-per-store 100 --samples 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import sqlalchemy
+
+from api.v1.app.managers.product_manager import PRODUCT_COLUMNS, product_cache
+from api.v1.app.managers.store_manager import StoreManager
+from api.v1.app.models.product_model import product
+from api.v1.app.models.store import store
+from api.v1.database.db import AsyncSessionLocal, SessionLocal
+from api.v1.utils.pagination import decode_id_cursor, encode_id_cursor
+
+SEED_BATCH_STORES = 1000
+STATUSES = "array['available','available','available','limited','unavailable']::productstatus[]"
+
+
+def seed(db, stores, per_store):
+    """Insert `stores` active stores with `per_store` products each, for one benchmark seller."""
+    existing = db.execute(
+        sqlalchemy.select(sqlalchemy.func.count()).select_from(store).where(store.c.status == "active")
+    ).scalar()
+    if existing >= stores:
+        print(f"stores already holds {existing} active stores, skipping seed")
+        return
+
+    user_id = uuid.uuid4()
+    db.execute(sqlalchemy.text(
+        "INSERT INTO users (id, first_name, last_name, email, hashed_password, location, role, is_active) "
+        "VALUES (:id, 'Bench', 'Seller', :email, 'x', 'Lagos', 'merchant', true)"
+    ), {"id": user_id, "email": f"bench-{user_id}@example.com"})
+
+    start = time.perf_counter()
+    for offset in range(existing, stores, SEED_BATCH_STORES):
+        count = min(SEED_BATCH_STORES, stores - offset)
+        db.execute(sqlalchemy.text(f"""
+            WITH new_stores AS (
+                INSERT INTO stores (description, photo_url, amount, speciality, status, owner_id, created_at)
+                SELECT 'Store ' || g, 'https://example.com/s.png', 0, 'general', 'active', :user_id,
+                       timezone('UTC', now()) - g * interval '1 minute'
+                FROM generate_series(1, :count) AS g
+                RETURNING id
+            )
+            INSERT INTO products (name, description, photo_url, quantity, amount, category,
+                                  status, user_id, user_store_id, created_at)
+            SELECT 'Product ' || s.id || '-' || g, 'item ' || g, 'https://example.com/p.png', g % 100,
+                   (g % 1000) / 10.0, 'general', ({STATUSES})[1 + g % 5], :user_id, s.id,
+                   timezone('UTC', now()) - g * interval '1 second'
+            FROM new_stores s CROSS JOIN generate_series(1, :per_store) AS g
+        """), {"user_id": user_id, "count": count, "per_store": per_store})
+        db.commit()
+    db.execute(sqlalchemy.text("ANALYZE stores"))
+    db.execute(sqlalchemy.text("ANALYZE products"))
+    db.commit()
+    print(f"seeded {stores - existing} stores in {time.perf_counter() - start:.1f}s")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return statistics.median(ordered) * 1000, p99 * 1000
+
+
+def cursor_at(db, depth, limit):
+    """Cursor that starts directory page `depth` (1-based), found once with OFFSET."""
+    if depth == 1:
+        return None
+    store_id = db.execute(
+        sqlalchemy.select(store.c.id).where(store.c.status == "active")
+        .order_by(store.c.id.desc()).offset((depth - 1) * limit - 1).limit(1)
+    ).scalar()
+    return encode_id_cursor(store_id) if store_id else None
+
+
+async def timed(samples, call):
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+async def directory_per_store_counts(session, cursor_id, limit):
+    query = sqlalchemy.select(*store.c).where(store.c.status == "active")
+    if cursor_id is not None:
+        query = query.where(store.c.id < cursor_id)
+    rows = (await session.execute(query.order_by(store.c.id.desc()).limit(limit + 1))).mappings().all()
+    for row in rows[:limit]:
+        await session.scalar(
+            sqlalchemy.select(sqlalchemy.func.count()).where(product.c.user_store_id == row["id"])
+        )
+
+
+async def store_then_products(session, store_id, limit):
+    await session.execute(sqlalchemy.select(*store.c).where(store.c.id == store_id, store.c.status == "active"))
+    await session.execute(
+        sqlalchemy.select(*PRODUCT_COLUMNS).where(product.c.user_store_id == store_id)
+        .order_by(product.c.created_at.desc(), product.c.id.desc()).limit(limit + 1)
+    )
+
+
+async def main(stores, per_store, limit, samples, depths):
+    product_cache.enabled = False
+    db = SessionLocal()
+    try:
+        seed(db, stores, per_store)
+        store_ids = db.execute(
+            sqlalchemy.select(store.c.id).where(store.c.status == "active").order_by(store.c.id.desc()).limit(samples)
+        ).scalars().all()
+        async with AsyncSessionLocal() as session:
+            print(f"\ndirectory, {limit} stores per page")
+            print(f"{'depth':>7} | {'one statement p50':>17} {'p99':>8} | {'count per store p50':>19} {'p99':>8}  (ms)")
+            for depth in depths:
+                if (depth - 1) * limit >= stores:
+                    break
+                cursor = cursor_at(db, depth, limit)
+                cursor_id = decode_id_cursor(cursor) if cursor else None
+                single = await timed(samples, lambda: StoreManager.list_stores(session, cursor=cursor, limit=limit))
+                per_store_counts = await timed(samples, lambda: directory_per_store_counts(session, cursor_id, limit))
+                print(f"{depth:>7} | {single[0]:>17.2f} {single[1]:>8.2f} | {per_store_counts[0]:>19.2f} {per_store_counts[1]:>8.2f}")
+
+            print(f"\nstore page, {limit} products")
+            ids = iter(store_ids * 2)
+            for status_filter in (None, "available"):
+                lateral = await timed(samples, lambda: StoreManager.get_store(
+                    session, next(ids), limit=limit, product_status=status_filter))
+                print(f"status={status_filter or 'any':<10} one statement p50 {lateral[0]:.2f} p99 {lateral[1]:.2f} ms")
+            ids = iter(store_ids)
+            two = await timed(samples, lambda: store_then_products(session, next(ids), limit))
+            print(f"{'status=any':<17} two round trips p50 {two[0]:.2f} p99 {two[1]:.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=10_000)
+    parser.add_argument("--products-per-store", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 100, 400])
+    args = parser.parse_args()
+    asyncio.run(main(args.stores, args.products_per_store, args.limit, args.samples, args.depths))
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+"""
+A tiny in-process stand-in for the Supabase GoTrue API, used by the
+benchmarks so they never touch a real project.
+
+It runs on its own thread and event loop, which keeps it responsive even
+when the code under test blocks the caller's loop.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import jwt
+from aiohttp import web
+
+STUB_JWT_SECRET = "benchmark-jwt-secret"
+STUB_ANON_KEY = jwt.encode({"role": "anon", "iss": "stub"}, STUB_JWT_SECRET, algorithm="HS256")
+
+
+def _user(email, user_id=None, metadata=None):
+    return {
+        "id": user_id or str(uuid.uuid4()),
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": email,
+        "app_metadata": {"provider": "email", "role": "buyer"},
+        "user_metadata": metadata or {"first_name": "Bench", "last_name": "User"},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _session(user, ttl=3600):
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": user["id"],
+            "email": user["email"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "app_metadata": user["app_metadata"],
+            "user_metadata": user["user_metadata"],
+            "iat": now,
+            "exp": now + ttl,
+        },
+        STUB_JWT_SECRET,
+        algorithm="HS256",
+    )
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_in": ttl,
+        "expires_at": now + ttl,
+        "refresh_token": uuid.uuid4().hex,
+        "user": user,
+    }
+
+
+class StubGoTrue:
+    """
+    Serves the handful of GoTrue routes the app calls, each delayed by
+    `latency` seconds to imitate a network round trip.
+    """
+
+    def __init__(self, latency=0.05, users=0):
+        self.latency = latency
+        self.users = [_user(f"user{i}@example.com") for i in range(users)]
+        self.requests = 0
+        self.url = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    async def _delay(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def token(self, request):
+        await self._delay()
+        body = await request.json()
+        return web.json_response(_session(_user(body.get("email", "bench@example.com"))))
+
+    async def signup(self, request):
+        await self._delay()
+        body = await request.json()
+        return web.json_response(_session(_user(body.get("email"), metadata=body.get("data"))))
+
+    async def get_user(self, request):
+        await self._delay()
+        claims = jwt.decode(
+            request.headers["Authorization"].split(" ", 1)[1],
+            STUB_JWT_SECRET,
+            algorithms=["HS256"],
+            audience="authenticated",
+        )
+        return web.json_response(_user(claims["email"], claims["sub"], claims.get("user_metadata")))
+
+    async def recover(self, request):
+        await self._delay()
+        return web.json_response({})
+
+    async def admin_list_users(self, request):
+        await self._delay()
+        page = int(request.query.get("page", 1))
+        per_page = int(request.query.get("per_page", 50))
+        start = (page - 1) * per_page
+        return web.json_response(
+            {"users": self.users[start:start + per_page], "aud": "authenticated"},
+            headers={"x-total-count": str(len(self.users))},
+        )
+
+    async def admin_user(self, request):
+        await self._delay()
+        return web.json_response(_user("admin-target@example.com", request.match_info["user_id"]))
+
+    async def admin_invite(self, request):
+        await self._delay()
+        body = await request.json()
+        return web.json_response(_user(body["email"]))
+
+    def _app(self):
+        app = web.Application()
+        app.router.add_post("/auth/v1/token", self.token)
+        app.router.add_post("/auth/v1/signup", self.signup)
+        app.router.add_get("/auth/v1/user", self.get_user)
+        app.router.add_put("/auth/v1/user", self.get_user)
+        app.router.add_post("/auth/v1/recover", self.recover)
+        app.router.add_get("/auth/v1/admin/users", self.admin_list_users)
+        app.router.add_get("/auth/v1/admin/users/{user_id}", self.admin_user)
+        app.router.add_put("/auth/v1/admin/users/{user_id}", self.admin_user)
+        app.router.add_delete("/auth/v1/admin/users/{user_id}", self.admin_user)
+        app.router.add_post("/auth/v1/invite", self.admin_invite)
+        return app
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, backlog=4096)
+        self._loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Connections opened by the Supabase clients under bursts, per-client pools vs the shared pool.
+
+Sends bursts of auth calls through the anon and the service-role async
+clients, pausing between bursts like a worker between traffic spikes, and
+counts the TCP connections and TLS handshakes each setup opens. The default
+httpx pools drop idle connections after 5s, the shared pool keeps them for
+SUPABASE_HTTP_KEEPALIVE_EXPIRY. Runs against the local stub unless --url
+and --key point at a real project, which is where handshakes cost a round
+trip or two. The stub shares the benchmark's cpu, so its latencies mostly
+measure that contention; the connection counts are what carries over.
+
+    python -m benchmarks.supabase_http --bursts 5 --concurrency 50 --idle 6
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from .stub_gotrue import StubGoTrue, STUB_ANON_KEY, STUB_JWT_SECRET, _session, _user
+
+
+async def _bursts(label, anon, admin, stats, bursts, concurrency, idle):
+    token = _session(_user("bench@example.com"))["access_token"]
+    latencies = []
+    for burst in range(bursts):
+        if burst:
+            await asyncio.sleep(idle)
+
+        async def call(i):
+            start = time.perf_counter()
+            if i % 2:
+                await admin.auth.admin.get_user_by_id("00000000-0000-0000-0000-000000000000")
+            else:
+                await anon.auth.get_user(token)
+            latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(call(i) for i in range(concurrency)))
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{label:<18} {stats.requests:>8} {stats.connects:>9} {stats.tls_handshakes:>11} {p50:>8.1f} {p99:>8.1f}")
+
+
+async def main(url, key, bursts, concurrency, idle):
+    from supabase import acreate_client, AsyncClientOptions
+    from api.supabase.http_client import TransportStats, async_stats, get_async_http_client, share_http_client
+
+    def options():
+        return AsyncClientOptions(auto_refresh_token=False, persist_session=False)
+
+    print(f"{bursts} bursts of {concurrency} calls, {idle}s idle between bursts")
+    print(f"{'pools':<18} {'requests':>8} {'connects':>9} {'handshakes':>11} {'p50 ms':>8} {'p99 ms':>8}")
+
+    separate = TransportStats()
+    anon = await acreate_client(url, key, options=options())
+    admin = await acreate_client(url, key, options=options())
+    for client in (anon, admin):
+        client.auth._http_client.event_hooks["request"].append(separate.aon_request)
+    await _bursts("per client", anon, admin, separate, bursts, concurrency, idle)
+    await anon.auth.close()
+    await admin.auth.close()
+
+    anon = share_http_client(await acreate_client(url, key, options=options()), get_async_http_client())
+    admin = share_http_client(await acreate_client(url, key, options=options()), get_async_http_client())
+    await _bursts("shared", anon, admin, async_stats, bursts, concurrency, idle)
+    await get_async_http_client().aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Supabase project url, the local stub when omitted")
+    parser.add_argument("--key", help="anon key for --url")
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--idle", type=float, default=6)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub round trip in seconds")
+    args = parser.parse_args()
+    os.environ.setdefault("JWT_SECRET", STUB_JWT_SECRET)
+    if args.url:
+        asyncio.run(main(args.url, args.key, args.bursts, args.concurrency, args.idle))
+    else:
+        with StubGoTrue(latency=args.latency) as stub:
+            asyncio.run(main(stub.url, STUB_ANON_KEY, args.bursts, args.concurrency, args.idle))
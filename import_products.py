@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Bulk import a product catalog from a CSV or NDJSON file.
+
+    python import_products.py --owner <user id> catalog.csv
+    python import_products.py --owner <user id> --format ndjson - < catalog.jsonl
+
+Runs the same pipeline as POST /products/import against DATABASE_URL: the
+file is streamed, validated row by row, COPYed to a staging table and
+merged into the stores the owner owns. Prints the import report as JSON
+and exits 1 when any row was rejected.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from api.v1.app.managers.product_manager import ProductManager
+from api.v1.app.models.enums import RoleType
+from api.v1.database.db import AsyncSessionLocal, async_engine
+from api.v1.utils.security import AuthContext
+from api.v1.utils.streams import FORMAT_CONTENT_TYPES, READERS
+
+CHUNK_SIZE = 1 << 16
+
+
+async def read_chunks(stream):
+    while True:
+        chunk = await asyncio.to_thread(stream.read, CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def run(owner: str, path: str, import_format: str) -> dict:
+    auth = AuthContext(user_id=owner, role=RoleType.merchant.value, expires_at=0, access_token="")
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        async with AsyncSessionLocal() as db:
+            return await ProductManager.import_products(db, auth, READERS[import_format](read_chunks(stream)))
+    finally:
+        stream.close()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="catalog file, or - for stdin")
+    parser.add_argument("--owner", required=True, help="user id of the merchant who owns the stores")
+    parser.add_argument("--format", choices=list(FORMAT_CONTENT_TYPES), help="defaults to the file extension")
+    args = parser.parse_args()
+    extension = os.path.splitext(args.path)[1].lower().lstrip(".")
+    import_format = args.format or {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}.get(extension)
+    if import_format is None:
+        parser.error("cannot tell the format from the file name, pass --format")
+    report = asyncio.run(run(args.owner, args.path, import_format))
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["failed"] else 0)
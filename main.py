@@ -1,17 +1,63 @@
 #!/usr/bin/python3
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 import uvicorn
 from starlette.middleware.cors import CORSMiddleware
 
+from api.supabase.http_client import close_http_clients
+from api.supabase.supabase_admin import close_async_admin_client
+from api.supabase.supabase_client import close_async_supabase
+from api.v1.app.admin.managers.audit import audit_log
+from api.v1.app.managers.product_manager import product_cache
+from api.v1.app.managers.sales_manager import reconcile_sales_periodically
 from api.v1.app.router.routers import api_router
+from api.v1.database.db import AsyncSessionLocal, async_engine, pool_metrics
+from api.v1.utils.compression import CompressionMiddleware
+from api.v1.utils.config import settings
+from api.v1.utils.hashing import shutdown_hash_pool
+from api.v1.utils.logs import RequestContextMiddleware, configure_logging, stop_logging
+from api.v1.utils.metrics import REGISTRY, TimingMiddleware
+from api.v1.utils.profiling import ProfilingMiddleware
+from api.v1.utils.responses import default_response_class
+from api.v1.utils.security import get_metrics_access
+
+# Once per worker process; takes over uvicorn's log handlers as well.
+configure_logging()
+
 ORIGINS = [
     "http://localhost",
     "http://localhost:8000"
 ]
 
 
-app = FastAPI(title="MartPlaza Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    audit_log.start(AsyncSessionLocal)
+    reconciler = None
+    if settings.SELLER_SALES_RECONCILE_SECONDS:
+        reconciler = asyncio.create_task(reconcile_sales_periodically(
+            AsyncSessionLocal, settings.SELLER_SALES_RECONCILE_SECONDS, settings.SELLER_SALES_RECONCILE_DAYS,
+        ))
+    yield
+    if reconciler is not None:
+        reconciler.cancel()
+    # Write the audit entries still buffered before the engine goes away.
+    await audit_log.stop()
+    # Runs once in-flight requests have drained: release pooled connections
+    # and worker processes so a restart does not leave them half open.
+    await close_async_supabase()
+    await close_async_admin_client()
+    await close_http_clients()
+    await async_engine.dispose()
+    shutdown_hash_pool()
+    stop_logging()
+
+
+app = FastAPI(title="MartPlaza Backend", lifespan=lifespan, default_response_class=default_response_class())
 app.include_router(api_router)
 
 
@@ -21,6 +67,33 @@ async def index():
         "message": "MartPlaza, is a work in progress, give us some time."
     }
 
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(get_metrics_access)])
+async def metrics():
+    """
+    Latency histograms, pool and cache counters of this worker, in Prometheus text format.
+    Admins only, unless METRICS_PUBLIC is set.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/db-pool", dependencies=[Depends(get_metrics_access)])
+async def db_pool_metrics():
+    """Connection pool usage of the async database engine."""
+    return pool_metrics.snapshot()
+
+
+@app.get("/metrics/product-cache", dependencies=[Depends(get_metrics_access)])
+async def product_cache_metrics():
+    """Hit, miss and eviction counters of this worker's product cache."""
+    return product_cache.stats()
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    level=settings.COMPRESSION_LEVEL,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ORIGINS,
@@ -29,7 +102,17 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Request ids for the log records of everything below, including the profiler
+app.add_middleware(RequestContextMiddleware)
+
+# Outermost, so the timings cover every other middleware as well
+app.add_middleware(TimingMiddleware)
+
 if __name__ == "__main__":
     # added the app as "main:app" to be able to reload automatically on any changes.
+    # Use server.py to run with several workers in production.
     uvicorn.run("main:app", reload=True)
 
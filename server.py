@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Production entry point for the MartPlaza backend.
+
+    python server.py                  # one worker per cpu, or WEB_CONCURRENCY
+    python server.py --workers 4
+    python server.py --reload         # single worker that restarts on code changes
+
+uvloop and httptools are used when they are installed, otherwise uvicorn
+falls back to asyncio and h11. On SIGTERM each worker stops accepting
+connections, waits up to SERVER_GRACEFUL_TIMEOUT seconds for in-flight
+requests, then runs the app's lifespan shutdown (DB pool, Supabase clients).
+"""
+
+import argparse
+import importlib.util
+import os
+
+import uvicorn
+
+from api.v1.utils.config import settings
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def worker_count(requested: int = 0) -> int:
+    """Workers from the argument, else WEB_CONCURRENCY, else the cpu count."""
+    return requested or int(settings.WEB_CONCURRENCY) or os.cpu_count() or 1
+
+
+def run(
+    host: str = settings.SERVER_HOST,
+    port: int = settings.SERVER_PORT,
+    workers: int = 0,
+    reload: bool = False,
+):
+    # The reloader watches files from a single process, so it never forks workers.
+    workers = 1 if reload else worker_count(workers)
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        reload=reload,
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        backlog=settings.SERVER_BACKLOG,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        server_header=False,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=0, help="defaults to WEB_CONCURRENCY or the cpu count")
+    parser.add_argument("--reload", action="store_true", help="development mode, implies a single worker")
+    args = parser.parse_args()
+    run(args.host, args.port, args.workers, args.reload)